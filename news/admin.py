@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from news.models import NewsModel, NewsSourceModel
+from news.models import FetchStateModel, NewsModel, NewsSourceModel
 
 admin.site.register(NewsModel)
 admin.site.register(NewsSourceModel)
+admin.site.register(FetchStateModel)
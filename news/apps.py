@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class NewsConfig(AppConfig):
     name = 'news'
+
+    def ready(self):
+        from news_project.sqlite import configure_sqlite
+        connection_created.connect(configure_sqlite, dispatch_uid='news_project.sqlite.configure_sqlite')
@@ -0,0 +1,7 @@
+"""
+Performance benchmarks, run them with benchmark management command
+
+Every benchmark module has run function, that receives command options and
+returns dict with measured values, other modules are helpers of benchmarks and tests,
+like fake newsapi.org server
+"""
@@ -0,0 +1,48 @@
+import math
+from http import HTTPStatus
+
+from django.urls import reverse
+
+from news.benchmarks.base import benchmark_client, benchmark_database, measure
+from news.benchmarks.data import populate_news
+from news.models import NewsModel
+from news.pagination import encode_cursor
+from news.views_api import NewsAPIView
+
+
+def run(count: int=10000, repeat: int=20, **options) -> dict:
+    """Measure the first and the last pages of news api with page and cursor pagination
+
+    Response cache is disabled, so every request makes the page
+
+    Parameters
+    ----------
+    count : int
+        Number of news in database
+    repeat : int
+        Number of requests of every page
+    """
+    page_size = NewsAPIView.paginate_by
+    last_page = math.ceil(count / page_size)
+
+    with benchmark_database():
+        populate_news(count)
+        border = NewsModel.objects.order_by('-published_at', '-id')[max(count - page_size - 1, 0)]
+        deep_cursor = encode_cursor('n', [border.published_at, border.id])
+
+        url = reverse('api:news')
+        requests = {
+            'page_first': {'page': 1},
+            'page_last': {'page': last_page},
+            'cursor_first': {'cursor': ''},
+            'cursor_last': {'cursor': deep_cursor},
+        }
+
+        results = {'news': count, 'page_size': page_size}
+        with benchmark_client() as client:
+            for name, params in requests.items():
+                resp = client.get(url, params)
+                assert resp.status_code == HTTPStatus.OK, f'{name} returned {resp.status_code}'
+                results.update(measure(name, lambda: client.get(url, params), repeat))
+
+    return results
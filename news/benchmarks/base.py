@@ -0,0 +1,57 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+
+@contextmanager
+def benchmark_database():
+    """Create empty test database for benchmark and destroy it after
+
+    Benchmarks never touch working database
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@contextmanager
+def benchmark_client():
+    """Return test client which requests are not throttled and not answered from response cache"""
+    with override_settings(RESPONSE_CACHE_TIMEOUT=0, THROTTLING_POLICIES=[], ALLOWED_HOSTS=['testserver']):
+        yield Client()
+
+
+class Timer:
+    """Context manager measuring spent time in seconds"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.seconds = time.perf_counter() - self._start
+
+
+def measure(name: str, func: Callable[[], object], repeat: int=10) -> Dict[str, float]:
+    """Call func repeat times and return mean milliseconds and number of db queries per call
+
+    Returns
+    -------
+    Dict[str, float]
+        name_ms and name_queries values
+    """
+    with CaptureQueriesContext(connection) as queries, Timer() as timer:
+        for _ in range(repeat):
+            func()
+    return {f'{name}_ms': timer.seconds / repeat * 1000, f'{name}_queries': len(queries) / repeat}
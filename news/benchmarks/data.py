@@ -0,0 +1,88 @@
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from django.utils.timezone import utc
+
+from news.models import NewsModel, NewsSourceModel
+
+# standard database sizes of benchmarks
+SIZES = {'10k': 10000, '100k': 100000, '1m': 1000000}
+
+WORDS = ['python', 'django', 'release', 'security', 'database', 'performance', 'cloud', 'startup', 'market',
+         'science', 'football', 'election', 'weather', 'music', 'travel', 'health']
+
+
+def generate_articles(count: int, sources: int=100, seed: int=0, start: int=0) -> List[Dict[str, Any]]:
+    """Generate articles in newsapi.org response format
+
+    Parameters
+    ----------
+    count : int
+        Number of articles
+    sources : int
+        Number of different sources domains
+    seed : int
+        Random seed, the same seed always give the same articles
+    start : int
+        Number of the first article, articles with different numbers have different urls and titles
+
+    Returns
+    -------
+    list
+        List of articles dicts
+    """
+    rnd = random.Random(seed)
+    first_date = datetime(2018, 10, 1)
+
+    articles = []
+    for i in range(start, start + count):
+        source = i % sources
+        published_at = first_date + timedelta(seconds=rnd.randrange(3600 * 24 * 365))
+        articles.append({
+            'source': {'id': None, 'name': f'Source {source}'},
+            'author': f'Author {rnd.randrange(1000)}',
+            'title': f'Synthetic news title number {i}',
+            'description': 'Synthetic news description ' * rnd.randrange(1, 10),
+            'url': f'https://www.source{source}.com/news/{i}/synthetic-news-title/',
+            'urlToImage': f'https://static.source{source}.com/images/{i}.jpg',
+            'publishedAt': published_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'content': 'Synthetic news content ' * rnd.randrange(10, 50),
+        })
+    return articles
+
+
+def populate_news(count: int, sources: int=100, chunk_size: int=10000):
+    """Save count synthetic news of sources to db
+
+    News are created by chunks straight from models without validation, so 1M news don't need 1M articles in memory.
+    Every news title has two of WORDS and number of news, description and content have other WORDS.
+    Publish dates go back from now with interval 31 seconds, so the newest news has number 0.
+
+    Parameters
+    ----------
+    count : int
+        Number of news
+    sources : int
+        Number of sources
+    chunk_size : int
+        Number of news in one insert
+    """
+    sources = NewsSourceModel.objects.bulk_create([
+        NewsSourceModel(domain=f'source{i}.com', name=f'Source {i}') for i in range(sources)
+    ])
+    newest = datetime(2018, 10, 1, tzinfo=utc)
+
+    for first in range(0, count, chunk_size):
+        NewsModel.objects.bulk_create([
+            NewsModel(
+                source=sources[i % len(sources)],
+                url=f'https://{sources[i % len(sources)].domain}/news/{i}/',
+                normalized_path=f'/news/{i}/',
+                title=f'Synthetic {WORDS[i % len(WORDS)]} {WORDS[i * 7 % len(WORDS)]} news number {i}',
+                description=f'Description of {WORDS[i * 3 % len(WORDS)]} news ' * 3,
+                content=f'Content about {WORDS[i * 5 % len(WORDS)]} ' * 30,
+                published_at=newest - timedelta(seconds=i * 31),
+            )
+            for i in range(first, min(first + chunk_size, count))
+        ])
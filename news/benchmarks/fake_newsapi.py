@@ -0,0 +1,205 @@
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger()
+
+
+class FakeNewsApiConfig(NamedTuple):
+    """
+    Behaviour of FakeNewsApiServer
+
+    Attributes
+    ----------
+    total_results : int
+        totalResults of generated responses
+    page_size : int
+        Number of articles in generated page, if request has no pageSize
+    latency : float
+        Seconds before every response
+    error_every : int
+        Requests are answered in cycles of error_every requests, 0 disables errors
+    error_burst : int
+        Number of errors at the end of every cycle
+    error_status : int
+        Status of errors, 429 responses have Retry-After header, 5xx responses have not json body
+    retry_after : int
+        Retry-After of 429 responses
+    malformed_rate : float
+        Part of generated articles with wrong publish date or without url
+    seed : int
+        Random seed of malformed articles
+    """
+
+    total_results: int = 1000
+    page_size: int = 20
+    latency: float = 0.0
+    error_every: int = 0
+    error_burst: int = 1
+    error_status: int = HTTPStatus.TOO_MANY_REQUESTS
+    retry_after: int = 1
+    malformed_rate: float = 0.0
+    seed: int = 0
+
+
+def get_replay_key(path: str, params: Dict[str, str]) -> Tuple[str, str, int]:
+    """Return key of recorded response: end point, q and page"""
+    return path.rstrip('/').rsplit('/', 1)[-1], params.get('q', ''), int(params.get('page', 1))
+
+
+def load_recorded_responses(paths: Iterable[str]) -> Dict[Tuple[str, str, int], dict]:
+    """Load responses recorded by BaseScraper with record_to, the last response of every request is used"""
+    responses = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    response = json.loads(line)
+                    request = response.pop('_request')
+                    responses[get_replay_key(request['path'], request['params'])] = response
+    return responses
+
+
+class FakeNewsApiHandler(BaseHTTPRequestHandler):
+    """Answer newsapi.org requests by server config or recorded responses"""
+
+    server: 'FakeNewsApiServer'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        server = self.server
+
+        status = server.next_status()
+        if server.config.latency:
+            time.sleep(server.config.latency)
+
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            self.send_json(status, {'status': 'error', 'code': 'rateLimited',
+                                    'message': 'You have made too many requests recently.'},
+                           {'Retry-After': str(server.config.retry_after)})
+        elif status != HTTPStatus.OK:
+            # proxies answer with html pages, not json
+            self.send(status, b'<html><body><h1>Server error</h1></body></html>', 'text/html')
+        elif server.recorded is not None:
+            response = server.recorded.get(get_replay_key(url.path, params))
+            if response is None:
+                self.send_json(HTTPStatus.NOT_FOUND, {'status': 'error', 'code': 'notRecorded',
+                                                      'message': f'Request {self.path} is not recorded'})
+            else:
+                self.send_json(HTTPStatus.OK, response)
+        else:
+            self.send_json(HTTPStatus.OK, server.generate_page(params))
+
+    def send_json(self, status: int, data: dict, headers: Optional[Dict[str, str]]=None):
+        self.send(status, json.dumps(data).encode(), 'application/json', headers)
+
+    def send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]]=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f'Fake newsapi: {format % args}')
+
+
+class FakeNewsApiServer(ThreadingMixIn, HTTPServer):
+    """
+    Local stand-in for newsapi.org, every request is handled in own thread
+
+    Pages are generated from config or, if recorded responses are given, replayed.
+    Use base_url as scraper main_url. Server can be used as context manager,
+    that serves requests in background thread.
+
+    Attributes
+    ----------
+    config : FakeNewsApiConfig
+    recorded : Optional[dict]
+        Responses loaded by load_recorded_responses
+    requests_count : int
+        Number of received requests
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int]=('127.0.0.1', 0), config: FakeNewsApiConfig=FakeNewsApiConfig(),
+                 recorded: Optional[dict]=None):
+        super().__init__(address, FakeNewsApiHandler)
+        self.config = config
+        self.recorded = recorded
+        self.requests_count = 0
+
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/v2/'
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def next_status(self) -> int:
+        """Count request and return its status by error bursts config"""
+        with self._lock:
+            self.requests_count += 1
+            number = self.requests_count
+
+        config = self.config
+        if config.error_every and (number - 1) % config.error_every >= config.error_every - config.error_burst:
+            return config.error_status
+        return HTTPStatus.OK
+
+    def generate_page(self, params: Dict[str, str]) -> dict:
+        """Return newsapi.org like response for page of request params
+
+        The same params always give the same page
+        """
+        config = self.config
+        q = params.get('q', '')
+        page = int(params.get('page', 1))
+        page_size = int(params.get('pageSize', config.page_size))
+        rnd = random.Random(f'{config.seed}:{q}:{page}')
+        newest = datetime(2018, 10, 1)
+
+        articles = []
+        first = (page - 1) * page_size
+        for i in range(first, min(first + page_size, config.total_results)):
+            article = {
+                'source': {'id': None, 'name': f'Source {i % 100}'},
+                'author': f'Author {i % 1000}',
+                'title': f'Fake {q} news number {i}',
+                'description': f'Description of fake {q} news {i}',
+                'url': f'https://www.source{i % 100}.com/{q}/news/{i}/',
+                'urlToImage': f'https://static.source{i % 100}.com/images/{i}.jpg',
+                'publishedAt': (newest - timedelta(minutes=i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'content': f'Content of fake {q} news {i}',
+            }
+            if rnd.random() < config.malformed_rate:
+                if rnd.random() < 0.5:
+                    article['publishedAt'] = 'yesterday'
+                else:
+                    article['url'] = None
+            articles.append(article)
+
+        return {'status': 'ok', 'totalResults': config.total_results, 'articles': articles}
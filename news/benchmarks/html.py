@@ -0,0 +1,44 @@
+import math
+from http import HTTPStatus
+
+from django.urls import reverse
+
+from news.benchmarks.base import benchmark_client, benchmark_database, measure
+from news.benchmarks.data import populate_news
+from news.models import NewsModel
+from news.pagination import encode_cursor
+from news.views import NewsListView
+
+
+def run(count: int=10000, repeat: int=20, **options) -> dict:
+    """Measure rendering of the first and the last pages of html news list
+
+    Parameters
+    ----------
+    count : int
+        Number of news in database
+    repeat : int
+        Number of requests of every page
+    """
+    page_size = NewsListView.paginate_by
+    last_page = math.ceil(count / page_size)
+
+    with benchmark_database():
+        populate_news(count)
+        border = NewsModel.objects.order_by('-published_at', '-id')[max(count - page_size - 1, 0)]
+
+        requests = {
+            'page_first': (reverse('news:news-list'), {}),
+            'page_last': (reverse('news:news-list', kwargs={'page': last_page}), {}),
+            'cursor_last': (reverse('news:news-list'), {'cursor': encode_cursor('n', [border.published_at,
+                                                                                      border.id])}),
+        }
+
+        results = {'news': count, 'page_size': page_size}
+        with benchmark_client() as client:
+            for name, (url, params) in requests.items():
+                resp = client.get(url, params)
+                assert resp.status_code == HTTPStatus.OK, f'{name} returned {resp.status_code}'
+                results.update(measure(name, lambda: client.get(url, params), repeat))
+
+    return results
@@ -0,0 +1,34 @@
+from news.benchmarks.base import benchmark_database, measure
+from news.benchmarks.data import generate_articles, populate_news
+from news.scrapers.newsapi_org import NewsApiOrgScraper
+
+
+def run(count: int=10000, pages: int=20, page_size: int=100, **options) -> dict:
+    """Measure BaseScraper._save_data of one page in database with count news
+
+    Parameters
+    ----------
+    count : int
+        Number of news in database
+    pages : int
+        Number of saved pages
+    page_size : int
+        Number of articles in page
+    """
+    articles = generate_articles(pages * page_size, start=count)
+    responses = [{'status': 'ok', 'totalResults': len(articles), 'articles': articles[i:i + page_size]}
+                 for i in range(0, len(articles), page_size)]
+
+    with benchmark_database():
+        populate_news(count)
+        scraper = NewsApiOrgScraper()
+
+        results = {'news': count, 'page_size': page_size}
+        new_pages = iter(responses)
+        results.update(measure('new_page', lambda: scraper._save_data(next(new_pages)), pages))
+        # pages that were already saved, every news conflicts with existing one
+        old_pages = iter(responses)
+        results.update(measure('saved_page', lambda: scraper._save_data(next(old_pages)), pages))
+
+    results['new_page_articles_per_second'] = page_size / results['new_page_ms'] * 1000
+    return results
@@ -0,0 +1,33 @@
+from news.benchmarks.base import Timer, benchmark_database
+from news.benchmarks.fake_newsapi import FakeNewsApiConfig, FakeNewsApiServer
+from news.models import NewsModel
+from news.scrapers.newsapi_org import NewsApiOrgScraper
+
+
+def run(count: int=2000, page_size: int=100, latency: float=0.05, **options) -> dict:
+    """Measure BaseScraper.start throughput with different concurrency against local fake newsapi.org
+
+    Parameters
+    ----------
+    count : int
+        Number of downloaded news
+    page_size : int
+        Number of articles in page
+    latency : float
+        Seconds of every fake site response
+    """
+    results = {'news': count, 'page_size': page_size, 'latency_ms': latency * 1000}
+    config = FakeNewsApiConfig(total_results=count, page_size=page_size, latency=latency)
+
+    with benchmark_database(), FakeNewsApiServer(config=config) as server:
+        for concurrency in (1, 4, 8):
+            NewsModel.objects.all().delete()
+            scraper = NewsApiOrgScraper(base_url=server.base_url)
+            with Timer() as timer:
+                downloaded_news = scraper.start(count, path='everything', concurrency=concurrency)
+            assert downloaded_news == count, f'downloaded {downloaded_news} news instead of {count}'
+
+            results[f'concurrency_{concurrency}_seconds'] = timer.seconds
+            results[f'concurrency_{concurrency}_news_per_second'] = count / timer.seconds
+
+    return results
@@ -0,0 +1,58 @@
+from django.db.models import Q
+
+from news.benchmarks.base import Timer, benchmark_database
+from news.benchmarks.data import WORDS, populate_news
+from news.models import NewsModel
+from news.serializers import NewsSerializer
+from news.utils.search import search_news
+
+
+def run(count: int=100000, page_size: int=100, repeat: int=20, **options) -> dict:
+    """Measure latency of the first page of full text search for rare, common and very common words
+
+    Parameters
+    ----------
+    count : int
+        Number of news in database
+    page_size : int
+        Number of news in page
+    repeat : int
+        Number of searches for every query
+    """
+    queries = {
+        # one news has this number in title
+        'rare': str(count // 2),
+        # every news has two of words in title and others in description and content
+        'common': WORDS[1],
+        'common_pair': f'{WORDS[1]} {WORDS[7]}',
+        # all news match
+        'all': 'synthetic',
+    }
+
+    with benchmark_database():
+        with Timer() as insert_timer:
+            populate_news(count)
+
+        serializer = NewsSerializer()
+        results = {'news': count, 'insert_with_index_s': insert_timer.seconds}
+        for name, query in queries.items():
+            qs = search_news(NewsModel.objects.all(), query)
+            with Timer() as count_timer:
+                for _ in range(repeat):
+                    matches = qs.count()
+            with Timer() as page_timer:
+                for _ in range(repeat):
+                    serializer.serialize_queryset(qs[:page_size], serializer.default_fields)
+
+            results[f'{name}_matches'] = matches
+            results[f'{name}_count_ms'] = count_timer.seconds / repeat * 1000
+            results[f'{name}_page_ms'] = page_timer.seconds / repeat * 1000
+
+        # full scan is what search would cost without index
+        with Timer() as scan_timer:
+            word = queries['rare']
+            NewsModel.objects.filter(Q(title__icontains=word) | Q(description__icontains=word)
+                                     | Q(content__icontains=word)).count()
+        results['rare_full_scan_ms'] = scan_timer.seconds * 1000
+
+    return results
@@ -0,0 +1,46 @@
+from django.utils.timezone import now
+
+from news.benchmarks.base import Timer, benchmark_database
+from news.models import NewsModel, NewsSourceModel
+from news.serializers import NewsSerializer
+
+
+def run(count: int=1000, page_size: int=100, **options) -> dict:
+    """Compare serializing of page of news from model instances and from values_list rows
+
+    Parameters
+    ----------
+    count : int
+        Number of serialized pages
+    page_size : int
+        Number of news in page
+    """
+    with benchmark_database():
+        source = NewsSourceModel.objects.create(domain='news.com', name='News')
+        NewsModel.objects.bulk_create([
+            NewsModel(source=source, url=f'https://news.com/path/{i}', title=f'Title {i}', published_at=now(),
+                      description='Description ' * 20, content='Content ' * 100)
+            for i in range(page_size)
+        ])
+
+        serializer = NewsSerializer()
+        qs = NewsModel.objects.order_by('-published_at')
+
+        # every page is fetched by new queryset, because queryset caches results
+        with Timer() as instances_timer:
+            for _ in range(count):
+                instances_page = [serializer.serialize(o) for o in qs[:page_size]]
+
+        with Timer() as values_timer:
+            for _ in range(count):
+                values_page = serializer.serialize_queryset(qs[:page_size], serializer.fields)
+
+    assert instances_page == values_page, 'serialized pages are different'
+
+    return {
+        'pages': count,
+        'page_size': page_size,
+        'instances_ms_per_page': instances_timer.seconds / count * 1000,
+        'values_ms_per_page': values_timer.seconds / count * 1000,
+        'speedup': instances_timer.seconds / values_timer.seconds,
+    }
@@ -0,0 +1,40 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from news.benchmarks.base import Timer
+from news_project.throttling_middleware import ThrottlingMiddleware
+
+
+def run(count: int=10000, **options) -> dict:
+    """Measure time that ThrottlingMiddleware adds to allowed, rejected and exempt requests
+
+    View is replaced by function returning ready response, so only middleware is measured
+
+    Parameters
+    ----------
+    count : int
+        Number of requests of every kind
+    """
+    response = HttpResponse()
+    factory = RequestFactory()
+    requests = {
+        'allowed': (factory.get('/api/v1/news/'), {'IP_REQUESTS_IN_HOUR_LIMIT': count * 10}),
+        'allowed_local_batch': (factory.get('/api/v1/news/'), {'IP_REQUESTS_IN_HOUR_LIMIT': count * 10,
+                                                               'THROTTLING_LOCAL_BATCH': 100}),
+        'rejected': (factory.get('/api/v1/news/'), {'IP_REQUESTS_IN_HOUR_LIMIT': 0}),
+        'exempt': (factory.get('/static/style.css'), {}),
+    }
+
+    results = {'requests': count}
+    for name, (request, settings) in requests.items():
+        with override_settings(**settings):
+            middleware = ThrottlingMiddleware(lambda r: response)
+        # every kind of requests has own client address, so counters don't mix
+        request.META['REMOTE_ADDR'] = f'10.0.0.{len(results)}'
+
+        with Timer() as timer:
+            for _ in range(count):
+                middleware(request)
+        results[f'{name}_us'] = timer.seconds / count * 1000000
+
+    return results
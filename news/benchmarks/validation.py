@@ -0,0 +1,56 @@
+import os
+
+from news.benchmarks.base import Timer, benchmark_database
+from news.benchmarks.data import generate_articles
+from news.models import NewsSourceModel
+from news.scrapers.newsapi_org import NewsApiOrgScraper
+
+
+def validate(scraper: NewsApiOrgScraper, articles: list) -> int:
+    """Validate articles the same way as BaseScraper._save_data does and return number of valid news"""
+    sources_dict = {}
+    for data in articles:
+        source = scraper.create_source(data)
+        if source:
+            sources_dict[source.pk] = source
+
+    return sum(1 for data in articles if scraper.create_news(sources_dict, data))
+
+
+def run(count: int=100000, **options) -> dict:
+    """Compare model forms, compiled validator and validator in all cpu processes on count synthetic articles
+
+    Sources are saved to db before, because form validation looks for them in db
+    """
+    articles = generate_articles(count)
+
+    with benchmark_database():
+        sources = {s.pk: s for s in map(NewsApiOrgScraper().create_source, articles)}
+        NewsSourceModel.objects.bulk_create(sources.values())
+
+        results = {'articles': count}
+        for name, use_forms in (('forms', True), ('validator', False)):
+            with Timer() as timer:
+                valid = validate(NewsApiOrgScraper(use_forms=use_forms), articles)
+            assert valid == count, f'{name} rejected {count - valid} articles'
+
+            results[f'{name}_seconds'] = timer.seconds
+            results[f'{name}_articles_per_second'] = count / timer.seconds
+
+    results['speedup'] = results['forms_seconds'] / results['validator_seconds']
+
+    # validator sharded across processes, the same way as validation_workers of big imports
+    workers = os.cpu_count() or 1
+    if workers > 1:
+        scraper = NewsApiOrgScraper(validation_workers=workers)
+        try:
+            with Timer() as timer:
+                news_dict = scraper._create_news_dict(scraper._create_sources_dict(articles), articles)
+        finally:
+            scraper.close()
+        assert len(news_dict) == count, f'processes rejected {count - len(news_dict)} articles'
+
+        results['processes'] = workers
+        results['processes_seconds'] = timer.seconds
+        results['processes_articles_per_second'] = count / timer.seconds
+    return results
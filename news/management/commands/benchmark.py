@@ -0,0 +1,79 @@
+import json
+import subprocess
+from importlib import import_module
+
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+
+from news.benchmarks.data import SIZES
+from news_project.test_runner import temporary_cache
+
+BENCHMARKS = ['validation', 'serializer', 'search', 'ingestion', 'api', 'html', 'throttling', 'scraper']
+
+
+class Command(BaseCommand):
+    help = 'Run performance benchmarks in separate test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'benchmarks',
+            nargs='*',
+            help=f'Benchmarks to run, all by default, available: {", ".join(BENCHMARKS)}'
+        )
+
+        parser.add_argument(
+            '-c', '--count',
+            dest='count', type=int,
+            help='Number of synthetic items, every benchmark has its own default'
+        )
+
+        parser.add_argument(
+            '-s', '--size',
+            dest='size', choices=list(SIZES),
+            help='Standard number of synthetic items, the same as --count'
+        )
+
+        parser.add_argument(
+            '--json',
+            dest='json', type=str,
+            help='Save results to file in json format, - for stdout'
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['benchmarks']) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f'Unknown benchmarks: {", ".join(sorted(unknown))}')
+        if options['size'] and options['count'] is not None:
+            raise CommandError('--size and --count can not be used together')
+
+        if options['size']:
+            options['count'] = SIZES[options['size']]
+        run_options = {k: options[k] for k in ('count',) if options[k] is not None}
+        # human readable results go to stderr, when stdout has json
+        out = self.stderr if options['json'] == '-' else self.stdout
+
+        report = {'commit': get_commit(), 'created_at': timezone.now().isoformat(), 'benchmarks': {}}
+        for name in options['benchmarks'] or BENCHMARKS:
+            out.write(self.style.NOTICE(f'Running {name} benchmark'))
+
+            # cached counts, versions and throttling counters of working cache don't leak into benchmarks
+            with temporary_cache():
+                results = import_module(f'news.benchmarks.{name}').run(**run_options)
+            report['benchmarks'][name] = results
+            for key, value in results.items():
+                value = f'{value:.3f}' if isinstance(value, float) else value
+                out.write(f'{key}: {value}')
+
+        if options['json'] == '-':
+            self.stdout.write(json.dumps(report, indent=2))
+        elif options['json']:
+            with open(options['json'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+
+def get_commit() -> str:
+    """Return current git commit of project or empty string, if it isn't available"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
@@ -0,0 +1,57 @@
+from django.core.management import BaseCommand, CommandError
+
+from news.serializers import NewsSerializer
+from news.utils.export import get_export_queryset, iter_ndjson, parse_since
+
+
+class Command(BaseCommand):
+    help = 'Export news in NDJSON format from the newest to the oldest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-o', '--output',
+            dest='output', type=str, default='-',
+            help='Output file, stdout by default'
+        )
+
+        parser.add_argument(
+            '--since',
+            dest='since', type=str,
+            help='Export news published since date or datetime in ISO 8601'
+        )
+
+        parser.add_argument(
+            '--source',
+            dest='sources', type=str, nargs='+', default=[],
+            help='Export news only from sources domains'
+        )
+
+        parser.add_argument(
+            '--fields',
+            dest='fields', type=str,
+            help='Comma separated exported fields, all fields by default'
+        )
+
+        parser.add_argument(
+            '--chunk-size',
+            dest='chunk_size', type=int, default=2000,
+            help='Number of news in one db request'
+        )
+
+    def handle(self, *args, **options):
+        serializer = NewsSerializer()
+        try:
+            fields = serializer.get_fields(options['fields'] or ','.join(serializer.fields))
+            since = parse_since(options['since']) if options['since'] else None
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        qs = get_export_queryset(since, options['sources'])
+        chunks = iter_ndjson(qs, serializer, fields, options['chunk_size'])
+
+        if options['output'] == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.writelines(chunks)
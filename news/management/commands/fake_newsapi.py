@@ -0,0 +1,87 @@
+from django.core.management import BaseCommand
+
+from news.benchmarks.fake_newsapi import FakeNewsApiConfig, FakeNewsApiServer, load_recorded_responses
+
+
+class Command(BaseCommand):
+    help = 'Run local stand-in of apinews.org, use its url as fetch_news --base-url'
+
+    def add_arguments(self, parser):
+        defaults = FakeNewsApiConfig()
+
+        parser.add_argument(
+            '--host',
+            dest='host', type=str, default='127.0.0.1',
+        )
+
+        parser.add_argument(
+            '-p', '--port',
+            dest='port', type=int, default=8001,
+        )
+
+        parser.add_argument(
+            '--total-results',
+            dest='total_results', type=int, default=defaults.total_results,
+            help='totalResults of generated responses'
+        )
+
+        parser.add_argument(
+            '--page-size',
+            dest='page_size', type=int, default=defaults.page_size,
+            help='Number of articles in page, if request has no pageSize'
+        )
+
+        parser.add_argument(
+            '--latency',
+            dest='latency', type=float, default=defaults.latency,
+            help='Seconds before every response'
+        )
+
+        parser.add_argument(
+            '--error-every',
+            dest='error_every', type=int, default=defaults.error_every,
+            help='Cycle of requests ending with burst of errors, 0 disables errors'
+        )
+
+        parser.add_argument(
+            '--error-burst',
+            dest='error_burst', type=int, default=defaults.error_burst,
+            help='Number of errors at the end of every cycle'
+        )
+
+        parser.add_argument(
+            '--error-status',
+            dest='error_status', type=int, default=defaults.error_status,
+            help='Status of errors, 429 or 5xx'
+        )
+
+        parser.add_argument(
+            '--retry-after',
+            dest='retry_after', type=int, default=defaults.retry_after,
+            help='Retry-After of 429 responses'
+        )
+
+        parser.add_argument(
+            '--malformed-rate',
+            dest='malformed_rate', type=float, default=defaults.malformed_rate,
+            help='Part of articles with wrong data'
+        )
+
+        parser.add_argument(
+            '--replay',
+            dest='replay', type=str, nargs='+',
+            help='Serve responses recorded by fetch_news --record instead of generated ones'
+        )
+
+    def handle(self, *args, **options):
+        config = FakeNewsApiConfig(**{name: options[name] for name in FakeNewsApiConfig._fields if name in options})
+        recorded = load_recorded_responses(options['replay']) if options['replay'] else None
+
+        server = FakeNewsApiServer((options['host'], options['port']), config, recorded)
+        self.stdout.write(self.style.SUCCESS(f'Serving fake apinews.org at {server.base_url}'))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
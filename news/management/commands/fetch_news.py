@@ -1,16 +1,24 @@
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
 
-from news.scrapers.newsapi_org import NewsApiOrgScraper
+from news.scrapers.async_base import AsyncScraperEngine, ScrapeJob
+from news.scrapers.limits import RetryPolicy, ScraperError
+from news.scrapers.registry import get_scraper_class, get_scraper_names
 
 
 class Command(BaseCommand):
-    help = f'Download news from apinews.org'
+    help = f'Download news from apinews.org or another registered provider'
 
     def add_arguments(self, parser):
+        parser.add_argument(
+            '-p', '--provider',
+            dest='provider', type=str, default='newsapi_org', choices=get_scraper_names(),
+            help='Name of scraper'
+        )
+
         parser.add_argument(
             '-k', '--apikey',
             dest='apikey', type=str, required=True,
-            help=f'Apikey for apinews.org site'
+            help=f'Apikey for provider site'
         )
 
         parser.add_argument(
@@ -27,14 +35,109 @@ class Command(BaseCommand):
 
         parser.add_argument(
             '-q',
-            dest='q', type=str, default=f'python',
-            help='q parameter for requests'
+            dest='q', type=str, nargs='+', default=[f'python'],
+            help='q parameter for requests, every value is downloaded as separate query'
+        )
+
+        parser.add_argument(
+            '--concurrency',
+            dest='concurrency', type=int, default=1,
+            help='Number of pages downloading at the same time'
+        )
+
+        parser.add_argument(
+            '--overwrite',
+            dest='overwrite', nargs='+', default=[], choices=['author', 'description', 'image_url', 'content'],
+            help='Fields that will be overwritten in already saved news if site changed them'
+        )
+
+        parser.add_argument(
+            '--incremental',
+            dest='incremental', action='store_true',
+            help='Download only news published after the newest news of previous runs'
+        )
+
+        parser.add_argument(
+            '--batch-pages',
+            dest='batch_pages', type=int, default=1,
+            help='Number of pages saved in one transaction'
+        )
+
+        parser.add_argument(
+            '--base-url',
+            dest='base_url', type=str,
+            help='Url used instead of provider site, for example of fake_newsapi server'
+        )
+
+        parser.add_argument(
+            '--record',
+            dest='record', type=str,
+            help='Append received responses to NDJSON file, fake_newsapi --replay serves them later'
+        )
+
+        parser.add_argument(
+            '--resume',
+            dest='resume', action='store_true',
+            help='Continue not finished previous run of the same query from its last saved page'
+        )
+
+        parser.add_argument(
+            '--retries',
+            dest='retries', type=int, default=RetryPolicy().retries,
+            help='Number of retries of failed request, 0 to fail on the first error'
+        )
+
+        parser.add_argument(
+            '--daily-quota',
+            dest='daily_quota', type=int,
+            help='Max number of requests to provider in day, SCRAPER_DAILY_QUOTAS setting by default'
+        )
+
+        parser.add_argument(
+            '--stream',
+            dest='stream', action='store_true',
+            help='Parse responses while they are received and save articles in chunks, memory doesn\'t depend '
+                 'on page size'
+        )
+
+        parser.add_argument(
+            '--async',
+            dest='use_async', action='store_true',
+            help='Download all queries at the same time in one event loop'
         )
 
     def handle(self, *args, **options):
-        self.stdout.write(self.style.NOTICE(f'Starting task for downloading {options["count"]} news from apinews.org'))
+        self.stdout.write(self.style.NOTICE(f'Starting task for downloading {options["count"]} news '
+                                            f'from {options["provider"]}'))
+
+        if options['use_async'] and (options['incremental'] or options['resume'] or options['stream']):
+            raise CommandError('--incremental, --resume and --stream are not supported with --async')
+        if options['stream'] and options['record']:
+            raise CommandError('--record is not supported with --stream')
 
-        scrapper = NewsApiOrgScraper(api_key=options['apikey'])
-        downloaded_news = scrapper.start(options['count'], params={'q': options['q']}, path=options['theme'])
+        scraper_class = get_scraper_class(options['provider'])
+        scrapper = scraper_class(api_key=options['apikey'], update_fields=options['overwrite'],
+                                 base_url=options['base_url'], record_to=options['record'],
+                                 retry_policy=RetryPolicy(retries=options['retries']),
+                                 daily_quota=options['daily_quota'], stream=options['stream'])
+        try:
+            if options['use_async']:
+                jobs = [ScrapeJob(scrapper, options['count'], params={'q': q}, path=options['theme'])
+                        for q in options['q']]
+                engine = AsyncScraperEngine(concurrency=options['concurrency'], batch_pages=options['batch_pages'])
+                downloaded_news = sum(engine.run(jobs))
+            else:
+                downloaded_news = 0
+                for q in options['q']:
+                    downloaded_news += scrapper.start(options['count'], params={'q': q}, path=options['theme'],
+                                                      concurrency=options['concurrency'],
+                                                      incremental=options['incremental'],
+                                                      batch_pages=options['batch_pages'],
+                                                      resume=options['resume'])
+        except ScraperError as e:
+            hint = ', run again with --resume to continue from the last saved page' if options['resume'] else ''
+            raise CommandError(f'{e}{hint}')
 
         self.stdout.write(self.style.SUCCESS(f'Task completed, downloaded {downloaded_news} news'))
+        if scrapper.budget.remaining is not None:
+            self.stdout.write(f'{scrapper.budget.remaining} requests of daily quota left')
@@ -0,0 +1,100 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from news.models import NewsModel
+from news.scrapers.registry import get_scraper_class, get_scraper_names
+from news.utils.cached_count import invalidate_cached_count
+from news.utils.importer import iter_dump_articles
+from news.utils.response_cache import bump_news_version
+
+
+class Command(BaseCommand):
+    help = 'Import saved responses of apinews.org or another registered provider from JSON or NDJSON files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            type=str, nargs='+',
+            help='Files with site responses, .ndjson and .jsonl files have one response per line, '
+                 'other files have one response or list of them'
+        )
+
+        parser.add_argument(
+            '-p', '--provider',
+            dest='provider', type=str, default='newsapi_org', choices=get_scraper_names(),
+            help='Name of scraper, that saves articles of responses'
+        )
+
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size', type=int, default=5000,
+            help='Number of articles saved in one transaction'
+        )
+
+        parser.add_argument(
+            '--workers',
+            dest='workers', type=int, default=1,
+            help='Number of processes parsing files'
+        )
+
+        parser.add_argument(
+            '--validation-workers',
+            dest='validation_workers', type=int, default=1,
+            help='Number of processes validating articles of every batch'
+        )
+
+        parser.add_argument(
+            '--overwrite',
+            dest='overwrite', nargs='+', default=[], choices=['author', 'description', 'image_url', 'content'],
+            help='Fields that will be overwritten in already saved news if dump changed them'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        try:
+            scraper_class = get_scraper_class(options['provider'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        scrapper = scraper_class(update_fields=options['overwrite'], validation_workers=options['validation_workers'])
+        started = time.monotonic()
+        received = created = 0
+        batch = []
+
+        def save_batch():
+            nonlocal received, created
+            try:
+                with transaction.atomic():
+                    result = scrapper._save_articles(batch)
+            except Exception:
+                # cached count was incremented before rollback
+                invalidate_cached_count(NewsModel)
+                raise
+            # responses cached before commit have new version, but old data
+            bump_news_version()
+
+            received += len(batch)
+            created += result.created
+            batch.clear()
+            self.stdout.write(f'Imported {received} articles, created {created} news, '
+                              f'{received / (time.monotonic() - started):.0f} articles/s')
+
+        try:
+            for articles in iter_dump_articles(options['paths'], options['workers']):
+                batch.extend(articles)
+                if len(batch) >= options['batch_size']:
+                    save_batch()
+            if batch:
+                save_batch()
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        finally:
+            scrapper.close()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Import completed, received {received} articles, created {created} news '
+            f'in {elapsed:.1f}s ({received / elapsed:.0f} articles/s)'))
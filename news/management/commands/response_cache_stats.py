@@ -0,0 +1,23 @@
+from django.core.management import BaseCommand
+
+from news.utils.response_cache import response_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hits and misses of api response cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            dest='reset', action='store_true',
+            help='Reset counters after showing'
+        )
+
+    def handle(self, *args, **options):
+        stats = response_cache_stats.get()
+        self.stdout.write(f'hits: {stats["hits"]}')
+        self.stdout.write(f'misses: {stats["misses"]}')
+        self.stdout.write(f'hit ratio: {stats["hit_ratio"]:.3f}')
+
+        if options['reset']:
+            response_cache_stats.reset()
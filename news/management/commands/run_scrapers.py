@@ -0,0 +1,75 @@
+import signal
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from news.scrapers.registry import get_scraper_class
+from news.scrapers.scheduler import QueryStats, ScheduledQuery, ScraperScheduler
+
+
+class Command(BaseCommand):
+    help = 'Download queries of SCRAPER_SCHEDULE setting every their interval until stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            dest='concurrency', type=int, default=4,
+            help='Number of pages downloading at the same time by all providers, '
+                 'concurrency of every provider is limited by SCRAPERS setting'
+        )
+
+        parser.add_argument(
+            '--batch-pages',
+            dest='batch_pages', type=int, default=10,
+            help='Max number of pages saved in one transaction'
+        )
+
+        parser.add_argument(
+            '--queue-size',
+            dest='queue_size', type=int, default=10,
+            help='Max number of downloaded pages waiting for saving, downloading pauses when queue is full'
+        )
+
+        parser.add_argument(
+            '--runs',
+            dest='runs', type=int,
+            help='Stop after number of runs of every query, run until SIGINT or SIGTERM by default'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            queries = [ScheduledQuery(**query) for query in settings.SCRAPER_SCHEDULE]
+            scrapers = {}
+            for provider in sorted({query.provider for query in queries}):
+                scraper_options = settings.SCRAPERS.get(provider, {}).get('options', {})
+                scrapers[provider] = get_scraper_class(provider)(**scraper_options)
+        except (TypeError, ValueError) as e:
+            raise CommandError(f'Wrong scrapers settings: {e}')
+        if not queries:
+            raise CommandError('SCRAPER_SCHEDULE setting has no queries')
+
+        scheduler = ScraperScheduler(
+            queries, scrapers, concurrency=options['concurrency'],
+            provider_concurrency={name: settings.SCRAPERS.get(name, {}).get('concurrency') for name in scrapers},
+            queue_size=options['queue_size'], batch_pages=options['batch_pages'], on_run=self.write_run
+        )
+        self.stdout.write(self.style.NOTICE(f'Running {len(queries)} queries of {", ".join(scrapers)}'))
+        scheduler.run(options['runs'], stop_signals=(signal.SIGINT, signal.SIGTERM))
+
+        for query, stats in scheduler.stats.items():
+            articles_per_second = f'{stats.articles_per_second:.1f}' if stats.articles_per_second else '-'
+            self.stdout.write(f'{self.get_title(query)}: {stats.runs} runs, {stats.failures} failed, '
+                              f'received {stats.received} articles, created {stats.created} news, '
+                              f'{articles_per_second} articles/s')
+        self.stdout.write(self.style.SUCCESS('Scrapers stopped'))
+
+    def write_run(self, query: ScheduledQuery, stats: QueryStats):
+        message = (f'{self.get_title(query)}: run {stats.runs} took {stats.last_latency:.2f}s, '
+                   f'{stats.last_articles_per_second or 0:.1f} articles/s')
+        if stats.last_error:
+            message = f'{message}, failed: {stats.last_error}'
+        self.stdout.write(message)
+
+    @staticmethod
+    def get_title(query: ScheduledQuery) -> str:
+        return ' '.join(filter(None, (query.provider, query.path, query.q)))
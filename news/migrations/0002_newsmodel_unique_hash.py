@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+from news.models import get_unique_hash
+
+
+def fill_unique_hash(apps, schema_editor):
+    NewsModel = apps.get_model('news', 'NewsModel')
+
+    for news in NewsModel.objects.only('id', 'source_id', 'normalized_path', 'title').iterator():
+        unique_hash = get_unique_hash(news.source_id, news.normalized_path, news.title)
+        NewsModel.objects.filter(pk=news.pk).update(unique_hash=unique_hash)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsmodel',
+            name='unique_hash',
+            field=models.CharField(editable=False, max_length=40, null=True, verbose_name='Unique hash'),
+        ),
+        migrations.RunPython(fill_unique_hash, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='newsmodel',
+            name='unique_hash',
+            field=models.CharField(editable=False, max_length=40, unique=True, verbose_name='Unique hash'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.1.2 on 2026-10-18 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_newsmodel_unique_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FetchStateModel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(max_length=64, verbose_name='Provider')),
+                ('theme', models.CharField(max_length=128, verbose_name='Theme')),
+                ('q', models.CharField(blank=True, max_length=512, verbose_name='Query')),
+                ('newest_published_at', models.DateTimeField(blank=True, null=True, verbose_name='Newest published at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+            ],
+            options={
+                'verbose_name': 'Fetch state',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='fetchstatemodel',
+            unique_together={('provider', 'theme', 'q')},
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.1.2 on 2026-10-18 08:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_fetchstatemodel'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newsmodel',
+            index=models.Index(fields=['published_at', 'id'], name='news_published_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,162 @@
+import hashlib
+import re
+from urllib.parse import urlsplit
+
+from django.db import migrations
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat
+
+# Frozen copy of url normalization at the time of this migration, so it doesn't change with news.utils
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+UNRESERVED_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+PERCENT_ENCODED_RE = re.compile('%([0-9A-Fa-f]{2})')
+BATCH_SIZE = 500
+
+
+def get_unique_hash(source_id, normalized_path, title):
+    return hashlib.sha1('\0'.join((source_id, normalized_path, title)).encode()).hexdigest()
+
+
+def normalize_domain(domain):
+    """Lowercase host, remove 'www.', trailing dot, user info and default port of saved source domain
+
+    Saved domain is netloc without lowercase 'www.', so only 'www.' in other case is removed,
+    saved 'www.' was the second one. Scheme of domain is unknown, so both 80 and 443 are default ports.
+    """
+    parsed = urlsplit(f'//{domain}')
+    host = (parsed.hostname or '').rstrip('.')
+    if ':' in host:
+        # ipv6 address
+        host = f'[{host}]'
+    if host.startswith('www.') and not domain.startswith('www.'):
+        host = host[4:]
+    try:
+        port = parsed.port
+    except ValueError:
+        port = None
+    return host if port is None or port in DEFAULT_PORTS.values() else f'{host}:{port}'
+
+
+def normalize_path(url):
+    """Return path of url normalized by RFC 3986 like normalize_url"""
+    parsed = urlsplit(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').rstrip('.')
+    try:
+        port = parsed.port
+    except ValueError:
+        port = None
+    has_netloc = bool(host) or (port is not None and port != DEFAULT_PORTS.get(scheme)) \
+        or parsed.username is not None
+
+    path = remove_dot_segments(normalize_percent_encoding(parsed.path))
+    if not path and has_netloc:
+        path = '/'
+    return path
+
+
+def normalize_percent_encoding(value):
+    if '%' not in value:
+        return value
+
+    def replace(match):
+        char = chr(int(match.group(1), 16))
+        return char if char in UNRESERVED_CHARS else match.group(0).upper()
+
+    return PERCENT_ENCODED_RE.sub(replace, value)
+
+
+def remove_dot_segments(path):
+    if '.' not in path:
+        return path
+
+    output = []
+    while path:
+        if path.startswith('../'):
+            path = path[3:]
+        elif path.startswith('./') or path.startswith('/./'):
+            path = path[2:]
+        elif path == '/.':
+            path = '/'
+        elif path.startswith('/../') or path == '/..':
+            path = '/' + path[4:]
+            if output:
+                output.pop()
+        elif path in ('.', '..'):
+            path = ''
+        else:
+            end = path.find('/', 1)
+            if end == -1:
+                end = len(path)
+            output.append(path[:end])
+            path = path[end:]
+    return ''.join(output)
+
+
+def renormalize_news_urls(apps, schema_editor):
+    """Recalculate source domains, normalized paths and unique hashes with RFC 3986 normalization
+
+    News saved by scrapers had empty normalized path. Sources which become the same after normalization
+    are merged, news which become the same are duplicates, the earliest one is kept.
+    Duplicates are found against final values of all rows and deleted before updates, changed rows
+    get unique temporary path and hash first, so updates never conflict with unique constraints,
+    even if new key of one row is old key of another one.
+    """
+    NewsSourceModel = apps.get_model('news', 'NewsSourceModel')
+    NewsModel = apps.get_model('news', 'NewsModel')
+
+    sources = {source.domain: source for source in NewsSourceModel.objects.order_by('domain')}
+    new_domains = {domain: normalize_domain(domain) for domain in sources}
+
+    seen_hashes = set()
+    to_delete = []
+    to_update = []
+    rows = NewsModel.objects.order_by('id').values_list('id', 'source_id', 'url', 'title',
+                                                        'normalized_path', 'unique_hash')
+    for pk, source_id, url, title, old_path, old_hash in rows.iterator():
+        new_source_id = new_domains[source_id]
+        path = normalize_path(url)
+        unique_hash = get_unique_hash(new_source_id, path, title)
+        if unique_hash in seen_hashes:
+            to_delete.append(pk)
+            continue
+
+        seen_hashes.add(unique_hash)
+        if (new_source_id, path, unique_hash) != (source_id, old_path, old_hash):
+            to_update.append((pk, new_source_id, path, unique_hash))
+
+    for i in range(0, len(to_delete), BATCH_SIZE):
+        NewsModel.objects.filter(pk__in=to_delete[i:i + BATCH_SIZE]).delete()
+
+    # merged source takes name of the first of its old sources
+    to_create = {}
+    for domain, new_domain in new_domains.items():
+        if new_domain not in sources and new_domain not in to_create:
+            to_create[new_domain] = NewsSourceModel(domain=new_domain, name=sources[domain].name)
+    NewsSourceModel.objects.bulk_create(to_create.values())
+
+    # normalized path never has '#', so temporary value never matches real one
+    temporary_value = Concat(Value('#'), Cast('id', CharField()))
+    pks = [pk for pk, *_ in to_update]
+    for i in range(0, len(pks), BATCH_SIZE):
+        NewsModel.objects.filter(pk__in=pks[i:i + BATCH_SIZE]).update(normalized_path=temporary_value,
+                                                                        unique_hash=temporary_value)
+    for pk, source_id, path, unique_hash in to_update:
+        NewsModel.objects.filter(pk=pk).update(source_id=source_id, normalized_path=path, unique_hash=unique_hash)
+
+    targets = set(new_domains.values())
+    old_domains = [domain for domain in new_domains if domain not in targets]
+    for i in range(0, len(old_domains), BATCH_SIZE):
+        NewsSourceModel.objects.filter(domain__in=old_domains[i:i + BATCH_SIZE]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_news_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(renormalize_news_urls, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 2.1.2 on 2026-10-18 09:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_renormalize_news_urls'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProviderQuotaModel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(max_length=64, verbose_name='Provider')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('requests', models.PositiveIntegerField(default=0, verbose_name='Requests')),
+            ],
+            options={
+                'verbose_name': 'Provider quota',
+            },
+        ),
+        migrations.AddField(
+            model_name='fetchstatemodel',
+            name='resume_page',
+            field=models.PositiveIntegerField(default=0, verbose_name='Resume page'),
+        ),
+        migrations.AddField(
+            model_name='fetchstatemodel',
+            name='resume_received',
+            field=models.PositiveIntegerField(default=0, verbose_name='Resume received'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='providerquotamodel',
+            unique_together={('provider', 'day')},
+        ),
+    ]
@@ -1,7 +1,11 @@
+import hashlib
+
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
-from news.utils.url_normalizer import get_normalized_url_path
+from news.utils.cached_count import increment_cached_count, invalidate_cached_count
+from news.utils.response_cache import bump_news_version
+from news.utils.url_normalizer import normalize_url
 
 
 class NewsSourceModel(models.Model):
@@ -27,6 +31,52 @@ class NewsSourceModel(models.Model):
         return f'{self.domain}'
 
 
+def get_unique_hash(source_id: str, normalized_path: str, title: str) -> str:
+    """Return fixed width digest of news unique key
+
+    Parameters
+    ----------
+    source_id
+    normalized_path
+    title
+
+    Returns
+    -------
+    str
+        40 chars hex digest
+    """
+    return hashlib.sha1('\0'.join((source_id, normalized_path, title)).encode()).hexdigest()
+
+
+class NewsQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """Fill unique hash for news that don't have it, because bulk_create doesn't call save
+
+        Cached count and news version are updated too
+        """
+        objs = list(objs)
+        for obj in objs:
+            if not obj.unique_hash:
+                obj.unique_hash = obj.get_unique_hash()
+
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            increment_cached_count(self.model, len(objs))
+            bump_news_version()
+        return objs
+
+    def update(self, **kwargs):
+        result = super().update(**kwargs)
+        bump_news_version()
+        return result
+
+    def delete(self):
+        result = super().delete()
+        invalidate_cached_count(self.model)
+        bump_news_version()
+        return result
+
+
 class NewsModel(models.Model):
     """
     Model for news
@@ -43,11 +93,15 @@ class NewsModel(models.Model):
     description
     image_url
     content
+    unique_hash
+        Digest of unique key, will be set automatic in save and bulk_create
 
     Methods
     -------
     get_unique_key
         Return unique tuple key for instance
+    get_unique_hash
+        Return digest of unique key
     """
 
     source = models.ForeignKey(NewsSourceModel, on_delete=models.CASCADE)
@@ -61,6 +115,11 @@ class NewsModel(models.Model):
     image_url = models.URLField(_('Image url'), blank=True, max_length=1024)
     content = models.TextField(_('Content'), blank=True)
 
+    # Comparing long texts of unique key is expensive, so we look for existing news by short digest
+    unique_hash = models.CharField(_('Unique hash'), max_length=40, unique=True, editable=False)
+
+    objects = NewsQuerySet.as_manager()
+
     class Meta:
         # the most stable and important part of article is url,
         # but after analise newsapi.org responses it became clear that
@@ -71,14 +130,29 @@ class NewsModel(models.Model):
         # because of that we need only path part of url(without domain name)
         unique_together = ('source', 'normalized_path', 'title')
 
+        # for keyset pagination in (published_at, id) order
+        indexes = [models.Index(fields=['published_at', 'id'], name='news_published_at_id_idx')]
+
         verbose_name = _('Source')
 
     def __str__(self):
         return f'{self.title} id{self.id}'
 
     def save(self, *args, **kwargs):
-        self.normalized_path = get_normalized_url_path(self.url)
+        self.normalized_path = normalize_url(self.url).path
+        self.unique_hash = self.get_unique_hash()
+
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if adding:
+            increment_cached_count(NewsModel, 1)
+        bump_news_version()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_cached_count(NewsModel)
+        bump_news_version()
+        return result
 
     def get_unique_key(self):
         """Return unique tuple key
@@ -89,3 +163,79 @@ class NewsModel(models.Model):
             Unique key
         """
         return self.source, self.normalized_path, self.title
+
+    def get_unique_hash(self):
+        """Return digest of unique key
+
+        Returns
+        -------
+        str
+            40 chars hex digest
+        """
+        return get_unique_hash(self.source_id, self.normalized_path, self.title)
+
+
+class FetchStateModel(models.Model):
+    """
+    Model for state of scraper query between runs
+
+    Attributes
+    ----------
+    provider
+        Scraper name
+    theme
+        End point path of query
+    q
+        Query string
+    newest_published_at
+        Publish date of the newest news received by query, used as high-water mark
+        for incremental fetching
+    resume_page
+        Next page of not finished run, 0 if the last run finished
+    resume_received
+        Number of articles received by not finished run in already committed pages
+    updated_at
+    """
+
+    provider = models.CharField(_('Provider'), max_length=64)
+    theme = models.CharField(_('Theme'), max_length=128)
+    q = models.CharField(_('Query'), max_length=512, blank=True)
+    newest_published_at = models.DateTimeField(_('Newest published at'), null=True, blank=True)
+    resume_page = models.PositiveIntegerField(_('Resume page'), default=0)
+    resume_received = models.PositiveIntegerField(_('Resume received'), default=0)
+    updated_at = models.DateTimeField(_('Updated at'), auto_now=True)
+
+    class Meta:
+        unique_together = ('provider', 'theme', 'q')
+
+        verbose_name = _('Fetch state')
+
+    def __str__(self):
+        return f'{self.provider} {self.theme} {self.q}'
+
+
+class ProviderQuotaModel(models.Model):
+    """
+    Number of requests sent to provider in one day, shared by all scraper runs
+
+    Attributes
+    ----------
+    provider
+        Scraper name
+    day
+        UTC date
+    requests
+        Number of sent requests
+    """
+
+    provider = models.CharField(_('Provider'), max_length=64)
+    day = models.DateField(_('Day'))
+    requests = models.PositiveIntegerField(_('Requests'), default=0)
+
+    class Meta:
+        unique_together = ('provider', 'day')
+
+        verbose_name = _('Provider quota')
+
+    def __str__(self):
+        return f'{self.provider} {self.day} {self.requests}'
@@ -0,0 +1,182 @@
+import base64
+import json
+from typing import Any, Callable, Optional, Sequence
+
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(direction: str, values: Sequence[Any]) -> str:
+    """Return opaque url safe cursor
+
+    Parameters
+    ----------
+    direction : str
+        'n' for page after values or 'p' for page before values
+    values
+        Values of cursor fields of the border item
+
+    Returns
+    -------
+    str
+    """
+    data = json.dumps([direction, *(v.isoformat() if hasattr(v, 'isoformat') else v for v in values)])
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Return direction and values from cursor
+
+    Raises
+    ------
+    InvalidCursor
+        If cursor is not created by encode_cursor
+    """
+    try:
+        direction, *values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+
+    if direction not in ('n', 'p'):
+        raise InvalidCursor('Invalid cursor')
+    return direction, values
+
+
+class CursorPage:
+    """
+    One page of CursorPaginator, has the same has_next/has_previous api as django Page
+
+    Attributes
+    ----------
+    object_list : list
+    next_cursor : Optional[str]
+        Cursor of the next page or None for the last page
+    previous_cursor : Optional[str]
+        Cursor of the previous page or None for the first page
+    """
+
+    def __init__(self, object_list: list, next_cursor: Optional[str], previous_cursor: Optional[str]):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class CursorPaginator:
+    """
+    Keyset paginator for queryset in descending order by unique combination of fields
+
+    Unlike offset pagination, every page is found by index seek from cursor,
+    so deep pages are as cheap as the first one and there is no count query.
+    Last of fields must be unique, usually it is primary key.
+
+    Methods
+    -------
+    page(cursor: str='')
+        Return CursorPage for cursor, empty cursor means first page
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int, fields: Sequence[str]=('published_at', 'id'),
+                 transform: Callable[[QuerySet], list]=list):
+        """
+        Parameters
+        ----------
+        queryset
+        per_page
+        fields
+            Fields for ordering, last one must be unique
+        transform
+            Function that makes page object_list from sliced queryset, returned objects
+            must be model instances or dicts with fields
+        """
+        self.queryset = queryset
+        self.per_page = per_page
+        self.fields = tuple(fields)
+        self.transform = transform
+
+    def page(self, cursor: str='') -> CursorPage:
+        """Return page for cursor
+
+        Raises
+        ------
+        InvalidCursor
+            If cursor is not valid
+        """
+        direction, values = decode_cursor(cursor) if cursor else ('n', None)
+        if values is not None:
+            values = self._parse_values(values)
+
+        if direction == 'n':
+            qs = self.queryset.order_by(*(f'-{f}' for f in self.fields))
+            if values is not None:
+                qs = qs.filter(self._seek_filter('lt', values))
+        else:
+            qs = self.queryset.order_by(*self.fields).filter(self._seek_filter('gt', values))
+
+        object_list = self.transform(qs[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+
+        if direction == 'p':
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        next_cursor = previous_cursor = None
+        if object_list and has_next:
+            next_cursor = encode_cursor('n', self._get_values(object_list[-1]))
+        if object_list and has_previous:
+            previous_cursor = encode_cursor('p', self._get_values(object_list[0]))
+        elif has_previous:
+            # page before start of results is empty, so return to the first page
+            previous_cursor = ''
+
+        return CursorPage(object_list, next_cursor, previous_cursor)
+
+    def _seek_filter(self, lookup: str, values: Sequence[Any]) -> Q:
+        """Return row comparision (f1, f2, ...) < (v1, v2, ...) as filter"""
+        result = Q()
+        for i, (field, value) in enumerate(zip(self.fields, values)):
+            equal = {f: v for f, v in zip(self.fields[:i], values[:i])}
+            result |= Q(**equal, **{f'{field}__{lookup}': value})
+        return result
+
+    def _parse_values(self, values: list) -> list:
+        if len(values) != len(self.fields):
+            raise InvalidCursor('Invalid cursor')
+
+        model = self.queryset.model
+        result = []
+        for field_name, value in zip(self.fields, values):
+            field = model._meta.get_field(field_name)
+            if field.get_internal_type() == 'DateTimeField':
+                value = parse_datetime(value) if isinstance(value, str) else None
+            try:
+                value = field.to_python(value)
+            except Exception:
+                raise InvalidCursor('Invalid cursor')
+            if value is None:
+                raise InvalidCursor('Invalid cursor')
+            result.append(value)
+        return result
+
+    def _get_values(self, obj) -> list:
+        if isinstance(obj, dict):
+            return [obj[f] for f in self.fields]
+        return [getattr(obj, f) for f in self.fields]
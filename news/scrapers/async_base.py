@@ -0,0 +1,214 @@
+import asyncio
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional, Sequence
+
+import requests
+from django.db import connection
+
+from news.scrapers.base import BaseScraper, create_session
+from news.scrapers.limits import RequestBudget
+from news.utils.response_cache import bump_news_version
+from news.utils.transactions import TransactionBatch
+
+
+class ScrapeJob(NamedTuple):
+    """One download task for AsyncScraperEngine, has the same meaning as BaseScraper.start arguments"""
+
+    scraper: BaseScraper
+    count: int = 100
+    params: Optional[dict] = None
+    path: str = ''
+
+
+class AsyncScraperEngine:
+    """
+    Run download jobs of several scrapers and queries in one event loop
+
+    Scrapers are used as is: pages are downloaded with BaseScraper._fetch_page and
+    saved with BaseScraper._save_data, so any scraper works under both engines.
+    Http requests are blocking, so they run in thread pool sharing one connection pool.
+    Downloaded pages go through bounded queue to the only writer, that saves them one by one
+    in its own thread, so db never receives concurrent writes and never blocks event loop.
+    Writer saves up to batch_pages pages in one transaction, but commits as soon as queue is empty,
+    so transaction never waits for network. Request budgets of scrapers are synced after every commit.
+
+    Attributes
+    ----------
+    concurrency : int
+        Max number of pages downloading at the same time for all jobs
+    queue_size : int
+        Max number of downloaded pages waiting for saving, downloading pauses when queue is full
+    batch_pages : int
+        Max number of pages saved in one transaction
+
+    Methods
+    -------
+    run(jobs: List[ScrapeJob])
+        Run jobs and return number of received news for each job
+    """
+
+    def __init__(self, concurrency: int=4, queue_size: int=10, batch_pages: int=1):
+        self.concurrency = max(concurrency, 1)
+        self.queue_size = queue_size
+        self.batch_pages = batch_pages
+
+    def run(self, jobs: List[ScrapeJob]) -> List[int]:
+        """Run jobs until all of them end
+
+        Parameters
+        ----------
+        jobs : List[ScrapeJob]
+
+        Returns
+        -------
+        List[int]
+            Number of received news for each job
+
+        Raises
+        ------
+        ScraperError
+            If site response not OK status code after all retries
+        QuotaExceeded
+            If daily request quota of scraper is used up
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.run_jobs(jobs))
+        finally:
+            loop.close()
+
+    async def run_jobs(self, jobs: List[ScrapeJob]) -> List[int]:
+        """Coroutine version of run"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        session = create_session(self.concurrency, hosts=len({job.scraper.main_url for job in jobs}))
+        budgets = list({id(job.scraper.budget): job.scraper.budget for job in jobs}.values())
+        self.sync_budgets(budgets)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor, session:
+            writer = asyncio.ensure_future(self.write(queue, budgets))
+            producers = [asyncio.ensure_future(self.produce(job, queue, executor, session)) for job in jobs]
+            try:
+                # writer can fail only with db error, in that case there is no reason to continue downloading
+                pending = {writer, *producers}
+                while not all(p.done() for p in producers):
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+
+                await queue.put(None)
+                await writer
+            finally:
+                for task in (writer, *producers):
+                    task.cancel()
+                await asyncio.gather(writer, *producers, return_exceptions=True)
+                self.sync_budgets(budgets)
+
+        return [p.result() for p in producers]
+
+    async def produce(self, job: ScrapeJob, queue: asyncio.Queue, executor: ThreadPoolExecutor,
+                      session: requests.Session) -> int:
+        """Download job pages and put them to queue
+
+        Page size and total results are taken from first page, next pages are downloaded
+        concurrently with up to concurrency pages in flight
+
+        Returns
+        -------
+        int
+            Number of received news
+        """
+        def fetch(page):
+            return asyncio.ensure_future(self.fetch(job, executor, session, page))
+
+        data = await fetch(1)
+        await queue.put((job, data))
+
+        total_count, downloaded_news = int(data['totalResults']), len(data['articles'])
+        if downloaded_news == 0 or downloaded_news >= job.count or downloaded_news >= total_count:
+            return downloaded_news
+        if not await self.wants_more_pages(job):
+            return downloaded_news
+
+        # first page size is the page size of the whole result
+        last_page = math.ceil(min(job.count, total_count) / downloaded_news)
+        pages = iter(range(2, last_page + 1))
+        in_flight = deque(fetch(page) for _, page in zip(range(self.concurrency), pages))
+        try:
+            while in_flight:
+                data = await in_flight.popleft()
+                news_count = len(data['articles'])
+                if news_count == 0:
+                    break
+
+                await queue.put((job, data))
+                downloaded_news += news_count
+
+                # received page is saved anyway, only next pages are not requested
+                if not await self.wants_more_pages(job):
+                    break
+                next_page = next(pages, None)
+                if next_page is not None:
+                    in_flight.append(fetch(next_page))
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+        return downloaded_news
+
+    async def wants_more_pages(self, job: ScrapeJob) -> bool:
+        """Check before every next page of job, False stops downloading it"""
+        return True
+
+    async def fetch(self, job: ScrapeJob, executor: ThreadPoolExecutor, session: requests.Session, page: int) -> dict:
+        """Download job page in executor"""
+        scraper = job.scraper
+        return await asyncio.get_event_loop().run_in_executor(
+            executor, scraper._fetch_page, session, f'{scraper.main_url}{job.path}', job.params or {}, page
+        )
+
+    async def write(self, queue: asyncio.Queue, budgets: Sequence[RequestBudget]=()):
+        """Save pages from queue until receive None
+
+        Transaction and every save run in one writer thread with its own db connection,
+        event loop only waits for them
+        """
+        def committed():
+            bump_news_version()
+            self.sync_budgets(budgets)
+
+        def save_step(job, data):
+            self.save(job, data)
+            batch.step()
+
+        loop = asyncio.get_event_loop()
+        batch = TransactionBatch(self.batch_pages, on_commit=committed, on_rollback=BaseScraper._batch_rolled_back)
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            await loop.run_in_executor(writer, batch.__enter__)
+            try:
+                while True:
+                    if queue.empty():
+                        await loop.run_in_executor(writer, batch.commit)
+
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    await loop.run_in_executor(writer, save_step, *item)
+            except BaseException as e:
+                # cancelled or failed writer rolls back after the current save is finished
+                await loop.run_in_executor(writer, batch.__exit__, type(e), e, e.__traceback__)
+                raise
+            else:
+                await loop.run_in_executor(writer, batch.__exit__, None, None, None)
+            finally:
+                writer.submit(connection.close)
+
+    def save(self, job: ScrapeJob, data: dict):
+        """Save downloaded job page, called in writer thread in transaction"""
+        job.scraper._save_data(data)
+
+    @staticmethod
+    def sync_budgets(budgets: Sequence[RequestBudget]):
+        for budget in budgets:
+            budget.sync()
@@ -1,50 +1,241 @@
+import itertools
+import json
 import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime
 from http import HTTPStatus
-from operator import itemgetter
-from typing import Any, Optional, Dict, Tuple
+from typing import Any, Optional, Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple, Union
+from urllib.parse import urlsplit
 
 import requests
-
-from news.models import NewsSourceModel, NewsModel
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from news.models import FetchStateModel, NewsSourceModel, NewsModel
+from news.scrapers.limits import RequestBudget, RetryPolicy, ScraperError, parse_retry_after
+from news.scrapers.registry import register_scraper
+from news.utils.cached_count import increment_cached_count, invalidate_cached_count
+from news.utils.json_stream import StreamedObject
+from news.utils.processes import setup_django_process
+from news.utils.response_cache import bump_news_version
+from news.utils.transactions import TransactionBatch
+from news.utils.upsert import bulk_upsert, supports_upsert
 
 logger = logging.getLogger()
 
+# bytes read from socket at once by streaming parser
+STREAM_READ_SIZE = 64 * 1024
+# articles are validated by process pool only if every process receives at least this number of them
+VALIDATION_MIN_SHARD = 250
+
+
+def create_session(pool_size: int=1, hosts: int=1) -> requests.Session:
+    """Create http session which keeps up to pool_size connections for each of hosts
+
+    Parameters
+    ----------
+    pool_size : int
+        Number of connections to one host that can be used at the same time
+    hosts : int
+        Number of hosts that session will keep connections for
+
+    Returns
+    -------
+    requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_newest_published_at(news: Iterable[NewsModel]) -> Optional[datetime]:
+    """Return publish date of the newest news or None for empty news"""
+    return max((n.published_at for n in news), default=None)
+
+
+class SaveResult(NamedTuple):
+    """Result of saving articles"""
+
+    created: int
+    newest_published_at: Optional[datetime]
+
+
+class PageResult(NamedTuple):
+    """Result of saving one site response
+
+    Attributes
+    ----------
+    total
+        Total available site results
+    received
+        Number of articles in response
+    created
+        Number of created news
+    newest_published_at
+        Publish date of the newest valid news in response
+    """
+
+    total: int
+    received: int
+    created: int
+    newest_published_at: Optional[datetime]
+
 
 class BaseScraper:
     """
     Abstract class for representing Scrapers
 
-    To add new source implement create_source and create_news in subclass
+    To add new source implement create_source and create_news in subclass.
+    Subclasses with name are registered, so commands find them by name, see news.scrapers.registry
 
     Attributes
     ----------
+    name : str
+        unique scraper name
     main_url : str
         main url that will be used for downloading news
+    retry_policy : RetryPolicy
+        Retries of failed requests
+    budget : RequestBudget
+        Daily request quota of provider from SCRAPER_DAILY_QUOTAS setting
+    stream : bool
+        Parse responses while they are received and save articles in chunks of stream_chunk
+    validation_workers : int
+        Number of processes validating articles of big pages and imports
 
     Methods
     -------
-    start(count: int=100, params: dict=None, path: str='')
+    start(count: int=100, params: dict=None, path: str='', concurrency: int=1, incremental: bool=False,
+          batch_pages: int=1, resume: bool=False)
         Download news from main_url
     create_source(data: Dict[str, Any])
         Validate fetched data, create and return NewsSourceModel
     create_news(sources_dict: Dict[str, NewsSourceModel], data: Dict[str, Any])
         Validate fetched data, create and return NewsModel
+    close()
+        Release http session and validation processes
     """
 
+    name: str = ''
     main_url: str = ''
 
-    def __init__(self, api_key: str=''):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.name:
+            register_scraper(cls)
+
+    def __init__(self, api_key: str='', update_fields: Sequence[str]=(), base_url: Optional[str]=None,
+                 record_to: Optional[str]=None, retry_policy: RetryPolicy=RetryPolicy(),
+                 daily_quota: Optional[int]=None, stream: bool=False, stream_chunk: int=200,
+                 validation_workers: int=1):
         """
         Parameters
         ----------
         api_key : str
             Api key for site
+        update_fields : Sequence[str]
+            NewsModel fields that will be overwritten in already saved news if site changed them
+        base_url : Optional[str]
+            Url used instead of main_url, for example of local stand-in of site
+        record_to : Optional[str]
+            NDJSON file, where every received response is appended with its request for later replay
+        retry_policy : RetryPolicy
+            Retries of failed requests
+        daily_quota : Optional[int]
+            Max number of requests to provider in day, SCRAPER_DAILY_QUOTAS setting by default, 0 for unlimited
+        stream : bool
+            Parse responses while they are received, so page is never kept in memory whole,
+            responses can't be recorded in this mode
+        stream_chunk : int
+            Number of articles validated and saved at once in stream mode
+        validation_workers : int
+            Number of processes validating articles, create_source and create_news must not use db with it.
+            Articles are split into contiguous shards and results are merged in articles order,
+            so saved news are the same as with one process
+
+        Raises
+        ------
+        ValueError
+            If stream and record_to are set together
         """
-        self.api_key = api_key
+        if stream and record_to:
+            raise ValueError('Responses can not be recorded in stream mode')
 
-    def start(self, count: int=100, params: dict=None, path: str=''):
+        self.api_key = api_key
+        self.update_fields = tuple(update_fields)
+        if base_url:
+            self.main_url = base_url
+        self.record_to = record_to
+        self._record_lock = threading.Lock()
+
+        self.retry_policy = retry_policy
+        if daily_quota is None:
+            daily_quota = settings.SCRAPER_DAILY_QUOTAS.get(self.name, 0)
+        self.budget = RequestBudget(self.name, daily_quota)
+        self.stream = stream
+        self.stream_chunk = max(stream_chunk, 1)
+        # requests of all threads wait until this time.monotonic() after 429 response
+        self._paused_until = 0.0
+        self._pause_lock = threading.Lock()
+
+        self.validation_workers = max(validation_workers, 1)
+        self._validation_pool = None
+
+        self._session = None
+        self._session_pool_size = 0
+
+    def __getstate__(self):
+        """Scraper is sent to validation processes without session, locks, budget and pool"""
+        state = self.__dict__.copy()
+        for name in ('_record_lock', '_pause_lock', 'budget', '_validation_pool', '_session'):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._record_lock = threading.Lock()
+        self._pause_lock = threading.Lock()
+        self.budget = RequestBudget(self.name)
+        self._validation_pool = None
+        self._session = None
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session, self._session_pool_size = None, 0
+        if self._validation_pool is not None:
+            self._validation_pool.shutdown()
+            self._validation_pool = None
+
+    def start(self, count: int=100, params: dict=None, path: str='', concurrency: int=1, incremental: bool=False,
+              batch_pages: int=1, resume: bool=False):
         """Download news from 'main_url + path?params' while they not end or count
 
+        First page is always fetched alone, because only its response tells us totalResults and page size.
+        With concurrency > 1 remaining pages are downloaded by a thread pool, up to concurrency pages in flight,
+        while already downloaded pages are saved in main thread in page order.
+
+        In incremental mode publish date of the newest received news is stored for (name, path, q),
+        next runs ask site only for news after it and stop on the first page without new news.
+
+        Every batch_pages pages are saved in one transaction, so db commits once per batch.
+        News version is changed again after every commit, so responses cached while transaction
+        was not committed yet are not used.
+
+        In stream mode every page is parsed while it is received and saved in chunks of stream_chunk articles,
+        so memory doesn't depend on page size. With concurrency other pages wait in socket buffers.
+
+        Failed requests are retried by retry_policy. With resume the next page is stored for (name, path, q)
+        in the same transaction as saved pages, so run that failed anyway continues from the first
+        not committed page, when it is started again with resume.
+
         Parameters
         ----------
         count : int
@@ -53,34 +244,284 @@ class BaseScraper:
             Special params that will be send to site
         path: str
             End point for downloading news
+        concurrency: int
+            Max number of pages downloading at the same time
+        incremental: bool
+            Continue from the newest news received by previous runs
+        batch_pages: int
+            Number of pages saved in one transaction
+        resume: bool
+            Continue not finished run of the same query and store progress of this one
+
+        Returns
+        -------
+        int
+            Number of received news, including news of resumed run
 
         Raises
         ------
-        ValueError
-            If site response not OK status code
+        ScraperError
+            If site response not OK status code after all retries
+        QuotaExceeded
+            If daily request quota is used up
         """
         full_url = f'{self.main_url}{path}'
 
         if params is None:
             params = {}
 
-        downloaded_news = 0
-        # we will receive proper value after first request
-        total_count = 1
-        page = 1
-        while downloaded_news < count and downloaded_news < total_count:
-            logger.info(f'Fetching page {page}')
-            resp = requests.get(full_url, {**{'apiKey': self.api_key, 'page': page}, **params})
+        state = None
+        if incremental or resume:
+            state, _ = FetchStateModel.objects.get_or_create(provider=self.name, theme=path, q=params.get('q', ''))
+            if incremental and state.newest_published_at:
+                params = {**params, **self.get_watermark_params(state.newest_published_at)}
+
+        page, downloaded_news = 1, 0
+        if resume and state.resume_page > 1:
+            page, downloaded_news = state.resume_page, state.resume_received
+            logger.info(f'Resuming from page {page}, {downloaded_news} articles are already received')
+
+        session = self.get_session(max(concurrency, 1))
+        self.budget.sync()
+
+        try:
+            with TransactionBatch(batch_pages, on_commit=self._batch_committed,
+                                  on_rollback=self._batch_rolled_back) as batch:
+                result = self._save_page(self._fetch_page(session, full_url, params, page, self.stream))
+                downloaded_news += result.received
+                if resume:
+                    self._save_progress(state, page + 1, downloaded_news)
+                batch.step()
+                total_count = result.total
+                newest_published_at = result.newest_published_at
+
+                if concurrency <= 1:
+                    pages = (self._fetch_page(session, full_url, params, p, self.stream)
+                             for p in itertools.count(page + 1))
+                else:
+                    # all pages before the last one have the same size
+                    page_size = downloaded_news // page
+                    last_page = math.ceil(min(count, total_count) / page_size) if page_size else page
+                    pages = self._fetch_concurrently(session, full_url, params, range(page + 1, last_page + 1),
+                                                     concurrency)
+
+                with closing(pages):
+                    # site has no more results, than it promised, if page is empty
+                    while result.received and downloaded_news < count and downloaded_news < total_count:
+                        if incremental and not result.created:
+                            logger.info('All news of page are already saved, stop fetching')
+                            break
+
+                        data = next(pages, None)
+                        if data is None:
+                            break
+
+                        page += 1
+                        result = self._save_page(data)
+                        total_count = result.total
+                        downloaded_news += result.received
+                        newest_published_at = max(filter(None, (newest_published_at, result.newest_published_at)),
+                                                  default=None)
+                        if resume:
+                            self._save_progress(state, page + 1, downloaded_news)
+                        batch.step()
+        finally:
+            self.budget.sync()
+
+        if state:
+            if newest_published_at and (not state.newest_published_at
+                                        or newest_published_at > state.newest_published_at):
+                state.newest_published_at = newest_published_at
+            state.resume_page = state.resume_received = 0
+            state.save()
+
+        return downloaded_news
+
+    def get_watermark_params(self, newest_published_at: datetime) -> dict:
+        """Return site params for requesting only news published after newest_published_at
+
+        Parameters
+        ----------
+        newest_published_at : datetime
+
+        Returns
+        -------
+        dict
+            Params that will be added to request, without params site will return all news
+        """
+        return {}
+
+    def get_session(self, pool_size: int=1) -> requests.Session:
+        """Return persistent http session with connection pool for at least pool_size connections
+
+        Parameters
+        ----------
+        pool_size : int
+            Number of connections that can be used at the same time
+
+        Returns
+        -------
+        requests.Session
+        """
+        if self._session is None or self._session_pool_size < pool_size:
+            if self._session is not None:
+                self._session.close()
+
+            self._session, self._session_pool_size = create_session(pool_size), pool_size
+
+        return self._session
+
+    def _fetch_page(self, session: requests.Session, full_url: str, params: dict, page: int,
+                    stream: bool=False) -> Union[dict, StreamedObject]:
+        """Download one page and return decoded response or, if stream, response that is decoded while it is read
+
+        Connection errors, not json responses and responses with retry_policy statuses are retried
+        after jittered exponential backoff or Retry-After of response. Retry-After of 429 response
+        pauses requests of all threads, because site limits all of them.
+        Errors in the middle of streamed response are raised while it is read and are not retried.
 
-            if resp.status_code != HTTPStatus.OK:
+        Raises
+        ------
+        ScraperError
+            If site response not OK status code after all retries
+        QuotaExceeded
+            If daily request quota is used up
+        """
+        logger.info(f'Fetching page {page}')
+        request_params = {**{'apiKey': self.api_key, 'page': page}, **params}
+
+        for attempt in itertools.count():
+            self._wait_pause()
+            self.budget.acquire()
+            try:
+                if stream:
+                    data = self._open_response(full_url, session.get(full_url, params=request_params, stream=True))
+                else:
+                    data = self._decode_response(full_url, session.get(full_url, params=request_params))
+            except (requests.ConnectionError, requests.Timeout, ScraperError) as e:
+                retryable = getattr(e, 'retryable', True)
+                retry_after = getattr(e, 'retry_after', None)
+                delay = self.retry_policy.get_delay(attempt, retry_after) if retryable else None
+                if delay is None:
+                    raise
+
+                logger.warning(f'Retrying page {page} in {delay:.1f}s after error: {e}')
+                if getattr(e, 'status', None) == HTTPStatus.TOO_MANY_REQUESTS:
+                    self._pause(delay)
+                else:
+                    time.sleep(delay)
+                continue
+
+            if self.record_to:
+                self._record(full_url, {'page': page, **params}, data)
+            return data
+
+    def _decode_response(self, full_url: str, resp: requests.Response) -> dict:
+        """Return decoded json of OK response
+
+        Raises
+        ------
+        ScraperError
+            If response has not OK status code or it is not json, error responses of proxies are html pages
+        """
+        if resp.status_code != HTTPStatus.OK:
+            retryable = resp.status_code in self.retry_policy.statuses
+            try:
                 message = resp.json().get('message')
-                raise ValueError(f'Error fetching data from {full_url}: {resp.reason} {message}')
+            except ValueError:
+                message = None
+            reason = ' '.join(filter(None, (resp.reason, message)))
+            raise ScraperError(f'Error fetching data from {full_url}: {reason}',
+                               status=resp.status_code, retryable=retryable,
+                               retry_after=parse_retry_after(resp.headers.get('Retry-After')) if retryable else None)
 
-            total_count, news_count = self._save_data(resp.json())
-            downloaded_news += news_count
-            page += 1
+        try:
+            return resp.json()
+        except ValueError:
+            raise ScraperError(f'Not json response from {full_url}', status=resp.status_code, retryable=True)
 
-        return downloaded_news
+    def _open_response(self, full_url: str, resp: requests.Response) -> StreamedObject:
+        """Return OK response, whose articles are decoded while they are read
+
+        Raises
+        ------
+        ScraperError
+            If response has not OK status code
+        """
+        if resp.status_code != HTTPStatus.OK:
+            try:
+                self._decode_response(full_url, resp)
+            finally:
+                resp.close()
+
+        return StreamedObject(resp.iter_content(STREAM_READ_SIZE), 'articles', close=resp.close)
+
+    def _pause(self, delay: float):
+        """Pause requests of all threads for delay seconds"""
+        with self._pause_lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self._wait_pause()
+
+    def _wait_pause(self):
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _batch_committed(self):
+        bump_news_version()
+        self.budget.sync()
+
+    @staticmethod
+    def _batch_rolled_back():
+        # cached count was incremented by pages of rolled back batch
+        invalidate_cached_count(NewsModel)
+
+    def _save_progress(self, state: FetchStateModel, next_page: int, received: int):
+        """Store next page of run in current transaction"""
+        state.resume_page, state.resume_received = next_page, received
+        state.save(update_fields=['resume_page', 'resume_received', 'updated_at'])
+
+    def _record(self, full_url: str, params: dict, data: dict):
+        """Append response with its request to record_to file, api key is never recorded"""
+        request = {'path': urlsplit(full_url).path, 'params': {k: str(v) for k, v in params.items()}}
+        line = json.dumps({**data, '_request': request}, ensure_ascii=False)
+        with self._record_lock, open(self.record_to, 'a', encoding='utf-8') as f:
+            f.write(f'{line}\n')
+
+    def _fetch_concurrently(self, session: requests.Session, full_url: str, params: dict, pages: range,
+                            concurrency: int) -> Iterator[dict]:
+        """Download pages in thread pool and yield them in pages order
+
+        Pool keeps downloading next pages while consumer is busy with yielded one,
+        not yet received pages are cancelled when generator is closed
+
+        Returns
+        -------
+        Iterator[dict]
+            Decoded pages
+        """
+        pages = iter(pages)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            in_flight = deque()
+            for page in itertools.islice(pages, concurrency):
+                in_flight.append(executor.submit(self._fetch_page, session, full_url, params, page, self.stream))
+
+            try:
+                while in_flight:
+                    data = in_flight.popleft().result()
+                    # keep pool busy while we are writing to db
+                    next_page = next(pages, None)
+                    if next_page is not None:
+                        in_flight.append(executor.submit(self._fetch_page, session, full_url, params, next_page,
+                                                         self.stream))
+
+                    yield data
+            finally:
+                for future in in_flight:
+                    # already opened streamed responses keep connections until they are closed
+                    if not future.cancel() and not future.exception() and isinstance(future.result(), StreamedObject):
+                        future.result().close()
 
     def create_source(self, data: Dict[str, Any]) -> Optional[NewsSourceModel]:
         """Create source model from site data"""
@@ -93,8 +534,6 @@ class BaseScraper:
     def _save_data(self, data: dict) -> Tuple[int, int]:
         """Receive one response from site and create sources and news
 
-        Optimized for number of create db queries
-
         Parameters
         ----------
         data
@@ -104,14 +543,145 @@ class BaseScraper:
         tuple[int, int]
             return total available site results and currently receive news
         """
-        # Looking for already existing sources
-        existed_sources_dict, to_create_sources = self._get_existed_and_to_create_sources(data['articles'])
-        NewsSourceModel.objects.bulk_create(to_create_sources)
+        result = self._save_page(data)
+        return result.total, result.received
+
+    def _save_page(self, data: Union[dict, StreamedObject]) -> PageResult:
+        """Receive one response from site and create sources and news
+
+        Parameters
+        ----------
+        data
+            Decoded response or streamed response, whose articles are saved in chunks of stream_chunk
+
+        Returns
+        -------
+        PageResult
+        """
+        if isinstance(data, StreamedObject):
+            return self._save_streamed_page(data)
+
+        result = self._save_articles(data['articles'])
+        return PageResult(int(data['totalResults']), len(data['articles']), *result)
+
+    def _save_streamed_page(self, data: StreamedObject) -> PageResult:
+        """Save articles of streamed response in chunks of stream_chunk articles
+
+        Raises
+        ------
+        ScraperError
+            If response is not valid json or has no totalResults
+        """
+        received, created, newest_published_at = 0, 0, None
+        with closing(data):
+            articles = data.items()
+            while True:
+                try:
+                    chunk = list(itertools.islice(articles, self.stream_chunk))
+                except ValueError as e:
+                    raise ScraperError(f'Not valid streamed response: {e}')
+                if not chunk:
+                    break
+
+                result = self._save_articles(chunk)
+                received += len(chunk)
+                created += result.created
+                newest_published_at = max(filter(None, (newest_published_at, result.newest_published_at)),
+                                          default=None)
+
+        if 'totalResults' not in data.fields:
+            raise ScraperError('Streamed response has no totalResults')
+        return PageResult(int(data.fields['totalResults']), received, created, newest_published_at)
+
+    def _save_articles(self, articles: list) -> SaveResult:
+        """Create sources and news from site articles
+
+        Where database supports it, sources and news are inserted with one upsert statement each,
+        that is safe for concurrent jobs. Otherwise existed sources and news are looked up before insert.
+
+        Parameters
+        ----------
+        articles: list
+            List with news data from site
+
+        Returns
+        -------
+        SaveResult
+        """
+        if not supports_upsert():
+            if self.update_fields:
+                logger.warning(f'Database does not support upsert, {self.update_fields} won\'t be updated')
 
-        to_create_news = self._get_to_create_news(existed_sources_dict, data['articles'])
-        NewsModel.objects.bulk_create(to_create_news)
+            # Looking for already existing sources
+            existed_sources_dict, to_create_sources = self._get_existed_and_to_create_sources(articles)
+            NewsSourceModel.objects.bulk_create(to_create_sources)
 
-        return int(data['totalResults']), len(data['articles'])
+            to_create_news, newest_published_at = self._get_to_create_news(existed_sources_dict, articles)
+            # bulk_create of NewsModel updates cached count and news version itself
+            NewsModel.objects.bulk_create(to_create_news)
+            return SaveResult(len(to_create_news), newest_published_at)
+
+        sources_dict = self._create_sources_dict(articles)
+        bulk_upsert(NewsSourceModel, sources_dict.values(), ['domain'])
+
+        news_dict = self._create_news_dict(sources_dict, articles)
+        result = bulk_upsert(NewsModel, news_dict.values(), ['unique_hash'], self.update_fields)
+        increment_cached_count(NewsModel, result.inserted)
+        if result.inserted or result.updated:
+            bump_news_version()
+        return SaveResult(result.inserted, get_newest_published_at(news_dict.values()))
+
+    def _create_sources_dict(self, articles: list) -> Dict[str, NewsSourceModel]:
+        """Create sources from site articles
+
+        Returns
+        -------
+        dict
+            Dict with source.pk as keys and source as value
+        """
+        key_source_dict = {}
+        for sources in self._map_shards(_create_sources, articles):
+            for source in sources:
+                key_source_dict[source.pk] = source
+        return key_source_dict
+
+    def _create_news_dict(self, sources_dict: Dict[str, NewsSourceModel], articles: list) -> Dict[str, NewsModel]:
+        """Create news from site articles
+
+        Returns
+        -------
+        dict
+            Dict with news unique hash as keys and news as value
+        """
+        key_news_dict = {}
+        for shard_news in self._map_shards(_create_news, articles, sources_dict):
+            for news in shard_news:
+                key_news_dict[news.unique_hash] = news
+
+        if self._get_shards_count(articles) > 1:
+            # news of validation processes refer to copies of sources
+            for news in key_news_dict.values():
+                news.source = sources_dict.get(news.source_id, news.source)
+        return key_news_dict
+
+    def _map_shards(self, func, articles: list, *args) -> Iterable[list]:
+        """Call func(scraper, shard, *args) for contiguous shards of articles and return results in articles order
+
+        Shards are processed by validation_workers processes, if articles are enough for all of them
+        """
+        shards_count = self._get_shards_count(articles)
+        if shards_count <= 1:
+            return [func(self, articles, *args)]
+
+        if self._validation_pool is None:
+            self._validation_pool = ProcessPoolExecutor(self.validation_workers, initializer=setup_django_process)
+
+        shard_size = math.ceil(len(articles) / shards_count)
+        shards = [articles[i:i + shard_size] for i in range(0, len(articles), shard_size)]
+        return self._validation_pool.map(func, itertools.repeat(self), shards, *map(itertools.repeat, args))
+
+    def _get_shards_count(self, articles: list) -> int:
+        return min(self.validation_workers, len(articles) // VALIDATION_MIN_SHARD)
 
     def _get_existed_and_to_create_sources(self, articles: list) -> Tuple[dict, list]:
         """Find existed and new sources
@@ -128,11 +698,7 @@ class BaseScraper:
         dict
             Dict with source.pk as keys and source as value
         """
-        key_source_dict = {}
-        for news_data in articles:
-            source = self.create_source(news_data)
-            if source:
-                key_source_dict[source.pk] = source
+        key_source_dict = self._create_sources_dict(articles)
 
         existed_sources = NewsSourceModel.objects.filter(domain__in=key_source_dict.keys())
         existed_key_dict = {s.pk: s for s in existed_sources}
@@ -141,7 +707,7 @@ class BaseScraper:
         sources_dict = {**key_source_dict, **existed_key_dict}
         return sources_dict, to_create
 
-    def _get_to_create_news(self, sources_dict, articles: dict) -> list:
+    def _get_to_create_news(self, sources_dict, articles: dict) -> Tuple[list, Optional[datetime]]:
         """Find existed news and return list of NewsModel to create
 
         Parameters
@@ -151,21 +717,28 @@ class BaseScraper:
 
         Returns
         -------
-        list
-            List of NewsModel that don't exist
+        tuple[list, Optional[datetime]]
+            List of NewsModel that don't exist and publish date of the newest valid news
         """
-        key_news_dict = {}
-        for news_data in articles:
-            news = self.create_news(sources_dict, news_data)
-            if news:
-                key_news_dict[news.get_unique_key()] = news
-
-        # For simplicity we receive news that have specific sources or paths or titles.
-        # Because we use such union instead of ((source, path, title) or (...)) we can receive extra news
-        # but this is not a big overhead
-        _news_qs = NewsModel.objects.filter(source_id__in=sources_dict.keys())
-        _news_qs = _news_qs.filter(normalized_path__in=map(itemgetter(1), key_news_dict.keys()))
-        existed_news = _news_qs.filter(title__in=map(itemgetter(2), key_news_dict.keys()))
-
-        existed_news_set = {n.get_unique_key() for n in existed_news}
-        return [s for k, s in key_news_dict.items() if k not in existed_news_set]
+        key_news_dict = self._create_news_dict(sources_dict, articles)
+
+        existed_news_set = set(NewsModel.objects.filter(unique_hash__in=key_news_dict.keys())
+                               .values_list('unique_hash', flat=True))
+        to_create = [s for k, s in key_news_dict.items() if k not in existed_news_set]
+        return to_create, get_newest_published_at(key_news_dict.values())
+
+
+def _create_sources(scraper: BaseScraper, articles: list) -> List[NewsSourceModel]:
+    """Create valid sources of articles in articles order"""
+    return [source for source in map(scraper.create_source, articles) if source]
+
+
+def _create_news(scraper: BaseScraper, articles: list, sources_dict: Dict[str, NewsSourceModel]) -> List[NewsModel]:
+    """Create valid news of articles in articles order with their unique hashes"""
+    news_list = []
+    for news_data in articles:
+        news = scraper.create_news(sources_dict, news_data)
+        if news:
+            news.unique_hash = news.get_unique_hash()
+            news_list.append(news)
+    return news_list
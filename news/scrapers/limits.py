@@ -0,0 +1,172 @@
+import random
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import FrozenSet, NamedTuple, Optional
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from news.models import ProviderQuotaModel
+
+RETRY_STATUSES = frozenset([
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+])
+
+
+class ScraperError(ValueError):
+    """
+    Site answered with error or not decodable response
+
+    Attributes
+    ----------
+    status : Optional[int]
+        Response status code
+    retry_after : Optional[float]
+        Seconds from Retry-After header
+    retryable : bool
+        The same request can succeed later
+    """
+
+    def __init__(self, message: str, status: Optional[int]=None, retry_after: Optional[float]=None,
+                 retryable: bool=False):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+
+class QuotaExceeded(ScraperError):
+    """Daily request quota of provider is used up"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return seconds from Retry-After header value in seconds or http date format, None for wrong value"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date is None:
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy(NamedTuple):
+    """
+    Retries of failed site requests
+
+    Delays grow exponentially with full jitter: random between 0 and backoff * 2 ** attempt,
+    so concurrent requests that failed together don't retry together.
+    Retry-After of response is waited as is with small jitter.
+
+    Attributes
+    ----------
+    retries : int
+        Max number of retries of one request, 0 disables retries
+    backoff : float
+        Max delay in seconds before the first retry
+    max_backoff : float
+        Upper limit of delay without Retry-After
+    max_retry_after : float
+        Request is not retried, if site asks to wait longer
+    statuses : FrozenSet[int]
+        Response statuses that are retried, connection errors and not json responses are retried too
+    """
+
+    retries: int = 5
+    backoff: float = 1.0
+    max_backoff: float = 60.0
+    max_retry_after: float = 300.0
+    statuses: FrozenSet[int] = RETRY_STATUSES
+
+    def get_delay(self, attempt: int, retry_after: Optional[float]=None) -> Optional[float]:
+        """Return seconds before retry of failed attempt (0 is the first attempt) or None if it isn't retried"""
+        if attempt >= self.retries:
+            return None
+
+        jitter = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if retry_after is None:
+            return jitter
+        if retry_after > self.max_retry_after:
+            return None
+        return retry_after + min(jitter, self.backoff)
+
+
+class RequestBudget:
+    """
+    Daily request quota of provider shared by all runs and processes
+
+    Requests are counted in process by acquire, that can be called from any thread.
+    sync adds them to ProviderQuotaModel of current UTC day and takes requests of other processes,
+    it must be called from thread with db connection, outside of scraper transaction.
+    Quota can be exceeded by requests of processes made between their syncs.
+
+    Attributes
+    ----------
+    provider : str
+        Scraper name
+    quota : int
+        Max number of requests in day, 0 for unlimited quota
+
+    Methods
+    -------
+    acquire()
+        Count one request, raise QuotaExceeded if quota is used up
+    sync()
+        Save counted requests and load requests of other processes
+    """
+
+    def __init__(self, provider: str, quota: int=0):
+        self.provider = provider
+        self.quota = quota
+        self.used = 0
+
+        self._lock = threading.Lock()
+        self._unsaved = 0
+
+    def acquire(self):
+        if not self.quota:
+            return
+
+        with self._lock:
+            if self.used >= self.quota:
+                raise QuotaExceeded(f'Daily quota of {self.quota} requests to {self.provider} is used up')
+            self.used += 1
+            self._unsaved += 1
+
+    def sync(self):
+        if not self.quota:
+            return
+
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, 0
+
+        with transaction.atomic():
+            state, _ = ProviderQuotaModel.objects.get_or_create(provider=self.provider,
+                                                                day=timezone.now().date())
+            if unsaved:
+                ProviderQuotaModel.objects.filter(pk=state.pk).update(requests=F('requests') + unsaved)
+                state.refresh_from_db(fields=['requests'])
+
+        with self._lock:
+            self.used = state.requests + self._unsaved
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Number of requests left in quota, None for unlimited quota"""
+        return max(self.quota - self.used, 0) if self.quota else None
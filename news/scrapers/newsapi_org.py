@@ -1,11 +1,14 @@
 import logging
+from datetime import datetime
 from typing import Optional, Any, Dict
 
 from django import forms
+from django.utils import timezone
 
 from news.models import NewsSourceModel, NewsModel
 from news.scrapers.base import BaseScraper
-from news.utils.url_normalizer import get_normalized_domain_name
+from news.scrapers.validation import ModelValidator
+from news.utils.url_normalizer import normalize_url
 
 logger = logging.getLogger()
 
@@ -41,33 +44,72 @@ class NewsSourceForm(OptionalValidateUniqueMixin, forms.ModelForm):
 
 
 class NewsApiOrgScraper(BaseScraper):
-    """Subclass for fetching data from newsapi.org"""
+    """Subclass for fetching data from newsapi.org
 
+    By default data is validated with ModelValidator, set use_forms to validate with model forms
+    """
+
+    name = 'newsapi_org'
     main_url = 'https://newsapi.org/v2/'
 
+    news_validator = ModelValidator(NewsModel, form_fields={
+        'published_at': NewsForm.base_fields['published_at']
+    })
+    source_validator = ModelValidator(NewsSourceModel)
+
+    def __init__(self, *args, use_forms: bool=False, **kwargs):
+        """
+        Parameters
+        ----------
+        use_forms : bool
+            Validate data with NewsForm and NewsSourceForm instead of compiled validators,
+            forms look for sources in db, so they can't be used by validation processes
+
+        Raises
+        ------
+        ValueError
+            If use_forms is set with validation_workers
+        """
+        super().__init__(*args, **kwargs)
+        if use_forms and self.validation_workers > 1:
+            raise ValueError('Forms can not be used with validation processes')
+        self.use_forms = use_forms
+
+    def get_watermark_params(self, newest_published_at: datetime) -> dict:
+        return {'from': newest_published_at.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')}
+
     def create_source(self, data: Dict[str, Any]) -> Optional[NewsSourceModel]:
-        domain = get_normalized_domain_name(data['url'])
-        form = NewsSourceForm(data={'domain': domain, 'name': data['source'].get('name')}, validate_unique=False)
+        source_data = {'domain': normalize_url(data['url'] or '').domain, 'name': data['source'].get('name')}
 
-        if form.is_valid():
-            return form.save(commit=False)
+        if self.use_forms:
+            form = NewsSourceForm(data=source_data, validate_unique=False)
+            source, errors = (form.save(commit=False), None) if form.is_valid() else (None, form.errors)
         else:
-            logger.error(f'Not valid source data {form.errors.as_json()}')
-            return None
+            source, errors = self.source_validator.validate(source_data)
+
+        if errors:
+            logger.error(f'Not valid source data {errors.as_json()}')
+        return source
 
     def create_news(self, sources_dict: Dict[str, NewsSourceModel], data: Dict[str, Any]) -> Optional[NewsModel]:
-        source_domain = get_normalized_domain_name(data['url'])
-        source = sources_dict.get(source_domain)
+        # the same url was normalized by create_source, so it is taken from normalize_url cache
+        normalized_url = normalize_url(data['url'] or '')
+        source = sources_dict.get(normalized_url.domain)
 
-        form = NewsForm(data={
+        news_data = {
             'author': data['author'], 'title': data['title'], 'description': data['description'],
             'url': data['url'], 'image_url': data['urlToImage'], 'published_at': data['publishedAt'],
             'content': data['content'], 'source': source
-        }, validate_unique=False)
+        }
 
-        if form.is_valid():
-            return form.save(commit=False)
+        if self.use_forms:
+            form = NewsForm(data=news_data, validate_unique=False)
+            news, errors = (form.save(commit=False), None) if form.is_valid() else (None, form.errors)
         else:
-            logger.error(f'Not valid news data {form.errors.as_json()}')
-            return None
+            news, errors = self.news_validator.validate(news_data)
 
+        if errors:
+            logger.error(f'Not valid news data {errors.as_json()}')
+        else:
+            news.normalized_path = normalized_url.path
+        return news
@@ -0,0 +1,50 @@
+from importlib import import_module
+from typing import Dict, List, Type
+
+from django.conf import settings
+
+_scrapers = {}
+
+
+def register_scraper(scraper_class: Type):
+    """Register BaseScraper subclass by its name, called for every subclass with name
+
+    Raises
+    ------
+    ValueError
+        If name is already used by another class
+    """
+    name = scraper_class.name
+    registered = _scrapers.get(name)
+    if registered is not None and _get_path(registered) != _get_path(scraper_class):
+        raise ValueError(f'Scraper name {name} is already used by {_get_path(registered)}')
+    _scrapers[name] = scraper_class
+
+
+def get_scrapers() -> Dict[str, Type]:
+    """Return scraper classes of SCRAPER_MODULES and already imported modules by their names"""
+    for module in settings.SCRAPER_MODULES:
+        import_module(module)
+    return dict(_scrapers)
+
+
+def get_scraper_names() -> List[str]:
+    return sorted(get_scrapers())
+
+
+def get_scraper_class(name: str) -> Type:
+    """Return scraper class by its name
+
+    Raises
+    ------
+    ValueError
+        If there is no scraper with name
+    """
+    scrapers = get_scrapers()
+    if name not in scrapers:
+        raise ValueError(f'Unknown scraper {name}, available: {", ".join(sorted(scrapers))}')
+    return scrapers[name]
+
+
+def _get_path(scraper_class: Type) -> str:
+    return f'{scraper_class.__module__}.{scraper_class.__qualname__}'
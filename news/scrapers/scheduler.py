@@ -0,0 +1,346 @@
+import asyncio
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Union
+
+import requests
+from django.db import connection, transaction
+
+from news.models import FetchStateModel
+from news.scrapers.async_base import AsyncScraperEngine, ScrapeJob
+from news.scrapers.base import BaseScraper, create_session
+from news.scrapers.limits import ScraperError
+
+logger = logging.getLogger()
+
+
+class ScheduledQuery(NamedTuple):
+    """Query of provider downloaded by ScraperScheduler every interval seconds"""
+
+    provider: str
+    interval: float
+    path: str = ''
+    q: str = ''
+    count: int = 100
+    # ask site only for news after the newest news of previous runs
+    incremental: bool = True
+
+
+class QueryStats:
+    """
+    Statistics of ScheduledQuery runs
+
+    Attributes
+    ----------
+    runs : int
+        Number of finished runs
+    failures : int
+        Number of runs failed by site errors
+    received : int
+        Number of received articles by all runs
+    created : int
+        Number of created news by all runs
+    last_latency : Optional[float]
+        Seconds from start of the last run until its last page is saved
+    last_articles_per_second : Optional[float]
+        Received articles per second of the last run
+    last_error : str
+        Error of the last run, empty if it succeeded
+    seconds : float
+        Duration of all runs
+    """
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.received = 0
+        self.created = 0
+        self.seconds = 0.0
+        self.last_latency = None
+        self.last_articles_per_second = None
+        self.last_error = ''
+
+    @property
+    def articles_per_second(self) -> Optional[float]:
+        """Received articles per second of all runs"""
+        return self.received / self.seconds if self.seconds else None
+
+
+class QueryRun:
+    """Counters of one run of query, updated by writer"""
+
+    def __init__(self, query: ScheduledQuery):
+        self.query = query
+        self.started_at = time.monotonic()
+        self.received = 0
+        self.created = 0
+        self.newest_published_at = None
+        # set by writer after the first page is saved
+        self.first_page_saved = asyncio.Event()
+        # incremental run reached page without new news
+        self.caught_up = False
+        # error of page that can't be saved
+        self.error = ''
+
+
+class RunEnd(NamedTuple):
+    """Marker put to writer queue after the last page of run"""
+
+    error: str = ''
+
+
+class ScraperScheduler(AsyncScraperEngine):
+    """
+    Long running AsyncScraperEngine, that downloads every query again after its interval
+
+    All queries share one thread pool of concurrency workers and one http session,
+    requests of every provider are limited by its own concurrency, so one provider never takes all workers.
+    Downloaded pages go through bounded queue to the only writer, so slow db pauses downloading.
+    Runs with site errors, that are left after retries, or any other error are counted as failures and repeated
+    after interval, pages received before error are saved, but high-water mark is moved only by
+    successful runs, so older pages of failed run are requested again.
+    Like incremental BaseScraper.start, incremental run requests next pages only after its first page
+    is saved and stops at the first page without new news.
+
+    Attributes
+    ----------
+    queries : List[ScheduledQuery]
+    scrapers : Dict[str, BaseScraper]
+        Scrapers by provider name
+    provider_concurrency : Dict[str, int]
+        Max number of requests of provider at the same time, concurrency by default
+    stats : Dict[ScheduledQuery, QueryStats]
+
+    Methods
+    -------
+    run(runs: Optional[int]=None, stop_signals: Sequence[int]=())
+        Run queries until stop or every query runs number of runs
+    stop()
+        Stop running, can be called from signal handler of event loop
+    """
+
+    def __init__(self, queries: List[ScheduledQuery], scrapers: Dict[str, BaseScraper], concurrency: int=4,
+                 provider_concurrency: Optional[Dict[str, int]]=None, queue_size: int=10, batch_pages: int=1,
+                 on_run: Optional[Callable[[ScheduledQuery, QueryStats], None]]=None):
+        """
+        Parameters
+        ----------
+        queries : List[ScheduledQuery]
+        scrapers : Dict[str, BaseScraper]
+            Scrapers of all queries providers by provider name
+        concurrency : int
+            Max number of requests of all providers at the same time
+        provider_concurrency : Optional[Dict[str, int]]
+            Max number of requests of provider at the same time
+        queue_size : int
+            Max number of downloaded pages waiting for saving
+        batch_pages : int
+            Max number of pages saved in one transaction
+        on_run : Optional[Callable[[ScheduledQuery, QueryStats], None]]
+            Called with stats after every run in writer thread
+        """
+        super().__init__(concurrency=concurrency, queue_size=queue_size, batch_pages=batch_pages)
+        self.queries = queries
+        self.scrapers = scrapers
+        self.provider_concurrency = provider_concurrency or {}
+        self.on_run = on_run
+        self.stats = {query: QueryStats() for query in queries}
+
+        self._stopped = None
+        self._loop = None
+        self._limits = {}
+        self._runs = {}
+        # query: high-water mark, loaded from db once and then kept by writer
+        self._watermarks = {}
+
+    def run(self, runs: Optional[int]=None, stop_signals: Sequence[int]=()):
+        """Run queries until stop or every query runs number of runs
+
+        Parameters
+        ----------
+        runs : Optional[int]
+            Number of runs of every query, unlimited by default
+        stop_signals : Sequence[int]
+            Signals that stop running, already received pages are saved before return
+
+        Raises
+        ------
+        DatabaseError
+            If pages can't be saved
+        """
+        loop = asyncio.new_event_loop()
+        for signal_number in stop_signals:
+            loop.add_signal_handler(signal_number, self.stop)
+        try:
+            loop.run_until_complete(self.run_queries(runs))
+        finally:
+            loop.close()
+
+    def stop(self):
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def run_queries(self, runs: Optional[int]=None):
+        """Coroutine version of run"""
+        self._stopped = asyncio.Event()
+        self._loop = asyncio.get_event_loop()
+        self._limits = {name: asyncio.Semaphore(min(self.provider_concurrency.get(name) or self.concurrency,
+                                                    self.concurrency))
+                        for name in self.scrapers}
+        budgets = [scraper.budget for scraper in self.scrapers.values()]
+        self.sync_budgets(budgets)
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        session = create_session(self.concurrency, hosts=len({s.main_url for s in self.scrapers.values()}))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor, session:
+            # db is queried in executor like site, so event loop isn't blocked
+            self._watermarks = await asyncio.get_event_loop().run_in_executor(executor, self.load_watermarks)
+            writer = asyncio.ensure_future(self.write(queue, budgets))
+            schedules = [asyncio.ensure_future(self.schedule(query, queue, executor, session, runs))
+                         for query in self.queries]
+            stopped = asyncio.ensure_future(self._stopped.wait())
+            try:
+                pending = {writer, stopped, *schedules}
+                while not self._stopped.is_set() and not all(s.done() for s in schedules):
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+
+                for task in schedules:
+                    task.cancel()
+                await asyncio.gather(*schedules, return_exceptions=True)
+                await queue.put(None)
+                await writer
+            finally:
+                for task in (writer, stopped, *schedules):
+                    task.cancel()
+                await asyncio.gather(writer, stopped, *schedules, return_exceptions=True)
+                self.sync_budgets(budgets)
+
+    async def schedule(self, query: ScheduledQuery, queue: asyncio.Queue, executor: ThreadPoolExecutor,
+                       session: requests.Session, runs: Optional[int]=None):
+        """Run query every interval seconds until runs number of runs"""
+        for run in itertools.count(1):
+            job = self.get_job(query)
+            # writer finds run of page by its job
+            query_run = self._runs[id(job)] = QueryRun(query)
+
+            error = ''
+            try:
+                await self.produce(job, queue, executor, session)
+            except asyncio.CancelledError:
+                raise
+            except (ScraperError, requests.RequestException) as e:
+                error = str(e)
+                logger.error(f'Run of {query.provider} {query.path} {query.q} failed: {e}')
+            except Exception as e:
+                # unexpected response or bug of scraper must not stop other queries and next runs
+                error = f'{type(e).__name__}: {e}'
+                logger.exception(f'Run of {query.provider} {query.path} {query.q} failed')
+            await queue.put((job, RunEnd(error)))
+
+            if runs is not None and run >= runs:
+                break
+            delay = query_run.started_at + query.interval - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def load_watermarks(self) -> Dict[ScheduledQuery, datetime]:
+        """Return stored high-water marks of incremental queries, called from executor thread"""
+        watermarks = {}
+        try:
+            for query in self.queries:
+                if not query.incremental:
+                    continue
+                state = FetchStateModel.objects.filter(provider=query.provider, theme=query.path, q=query.q).first()
+                if state and state.newest_published_at:
+                    watermarks[query] = state.newest_published_at
+        finally:
+            connection.close()
+        return watermarks
+
+    def get_job(self, query: ScheduledQuery) -> ScrapeJob:
+        """Return job of the next run of query, incremental query asks only for news after its high-water mark"""
+        scraper = self.scrapers[query.provider]
+        params = {'q': query.q} if query.q else {}
+        newest_published_at = self._watermarks.get(query)
+        if newest_published_at:
+            params.update(scraper.get_watermark_params(newest_published_at))
+        return ScrapeJob(scraper, query.count, params=params, path=query.path)
+
+    async def wants_more_pages(self, job: ScrapeJob) -> bool:
+        query_run = self._runs[id(job)]
+        if not query_run.query.incremental:
+            return True
+        await query_run.first_page_saved.wait()
+        return not query_run.caught_up
+
+    async def fetch(self, job: ScrapeJob, executor: ThreadPoolExecutor, session: requests.Session, page: int) -> dict:
+        async with self._limits[job.scraper.name]:
+            return await super().fetch(job, executor, session, page)
+
+    def save(self, job: ScrapeJob, data: Union[dict, RunEnd]):
+        """Save page or finish run, called in writer thread"""
+        if isinstance(data, RunEnd):
+            self.finish(self._runs.pop(id(job)), data.error)
+            return
+
+        query_run = self._runs[id(job)]
+        if query_run.error:
+            return
+        try:
+            # savepoint keeps writer transaction usable, if page can't be saved,
+            # broken connection still stops writer on commit
+            with transaction.atomic():
+                result = job.scraper._save_page(data)
+        except Exception as e:
+            query = query_run.query
+            logger.exception(f'Page of {query.provider} {query.path} {query.q} can\'t be saved')
+            query_run.error = f'{type(e).__name__}: {e}'
+            # the rest of run is not downloaded
+            query_run.caught_up = True
+            self._loop.call_soon_threadsafe(query_run.first_page_saved.set)
+            return
+
+        query_run.received += result.received
+        query_run.created += result.created
+        query_run.newest_published_at = max(filter(None, (query_run.newest_published_at,
+                                                          result.newest_published_at)), default=None)
+        if not result.created:
+            query_run.caught_up = True
+        # writer thread wakes up producer waiting in event loop
+        self._loop.call_soon_threadsafe(query_run.first_page_saved.set)
+
+    def finish(self, query_run: QueryRun, error: str=''):
+        """Store high-water mark of successful run in writer transaction and count its stats"""
+        error = error or query_run.error
+        query = query_run.query
+        newest_published_at = query_run.newest_published_at
+        if query.incremental and newest_published_at and not error:
+            state, _ = FetchStateModel.objects.get_or_create(provider=query.provider, theme=query.path, q=query.q)
+            if not state.newest_published_at or newest_published_at > state.newest_published_at:
+                state.newest_published_at = newest_published_at
+                state.save()
+            self._watermarks[query] = state.newest_published_at
+
+        latency = time.monotonic() - query_run.started_at
+        stats = self.stats[query]
+        stats.runs += 1
+        stats.received += query_run.received
+        stats.created += query_run.created
+        stats.seconds += latency
+        stats.last_latency = latency
+        stats.last_articles_per_second = query_run.received / latency if latency else None
+        stats.last_error = error
+        if error:
+            stats.failures += 1
+
+        if self.on_run:
+            self.on_run(query, stats)
@@ -0,0 +1,79 @@
+from typing import Any, Dict, Optional, Sequence, Tuple, Type
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.forms.utils import ErrorDict, ErrorList
+
+
+class ModelValidator:
+    """
+    Fast replacement of ModelForm validation for creating model instances from site data
+
+    Validation schema is compiled once from model fields: every editable field gets form field
+    that ModelForm would use for it, so constraints, cleaning and error messages are the same,
+    but there is no form, bound fields and model full_clean construction for every item.
+    Related fields are not checked in db, they have to receive already found instances.
+
+    Attributes
+    ----------
+    model
+        Model class of created instances
+
+    Methods
+    -------
+    validate(data: Dict[str, Any])
+        Return model instance and errors
+    """
+
+    def __init__(self, model: Type[models.Model], exclude: Sequence[str]=(),
+                 form_fields: Dict[str, forms.Field]=None):
+        """
+        Parameters
+        ----------
+        model
+            Model class of created instances
+        exclude
+            Model fields names that won't be validated and set
+        form_fields
+            Form fields that should be used instead of default model form fields
+        """
+        self.model = model
+        form_fields = form_fields or {}
+
+        self._schema = []
+        for field in model._meta.concrete_fields:
+            if not field.editable or isinstance(field, models.AutoField) or field.name in exclude:
+                continue
+
+            if field.is_relation:
+                form_field = forms.Field(required=not field.blank)
+            else:
+                form_field = form_fields.get(field.name) or field.formfield()
+            self._schema.append((field.name, form_field.clean))
+
+    def validate(self, data: Dict[str, Any]) -> Tuple[Optional[models.Model], ErrorDict]:
+        """Validate data and create model instance
+
+        Parameters
+        ----------
+        data
+            Dict with model fields names as keys, missed fields are considered empty
+
+        Returns
+        -------
+        tuple[Optional[models.Model], ErrorDict]
+            Not saved model instance or None and errors in the same format as form.errors
+        """
+        cleaned_data = {}
+        errors = ErrorDict()
+        for name, clean in self._schema:
+            try:
+                cleaned_data[name] = clean(data.get(name))
+            except ValidationError as e:
+                errors[name] = ErrorList(e.error_list)
+
+        if errors:
+            return None, errors
+
+        return self.model(**cleaned_data), errors
@@ -1,3 +1,6 @@
+from typing import Sequence, Tuple
+
+from django.db.models import QuerySet
 from django.forms import model_to_dict
 
 from news.models import NewsModel
@@ -7,12 +10,33 @@ class BaseSerializer:
     """
     Base class for python -> json supported form
 
+    Attributes
+    ----------
+    fields : Sequence[str]
+        Serialized model fields, when they are declared querysets are serialized from
+        values_list rows without building model instances
+    default_fields : Sequence[str]
+        Fields serialized when fields are not requested, all fields by default
+
     Methods
     -------
     serialize
         Return python object that can be serialize to json
+    serialize_queryset
+        Return list of python objects that can be serialize to json
+    get_fields
+        Return requested fields
     """
 
+    fields: Sequence[str] = ()
+    default_fields: Sequence[str] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # prepared once for class, every row is only zipped with it
+        cls.fields = tuple(cls.fields)
+        cls.default_fields = cls.fields if cls.default_fields is None else tuple(cls.default_fields)
+
     def serialize(self, obj):
         """Make serializable object
 
@@ -27,10 +51,66 @@ class BaseSerializer:
         """
         raise NotImplementedError()
 
+    def serialize_queryset(self, queryset: QuerySet, fields: Sequence[str]=None) -> list:
+        """Make list of serializable objects
+
+        Only serialized fields are fetched from db, model instances are not created
+
+        Parameters
+        ----------
+        queryset
+        fields
+            Serialized fields, default_fields if not set
+
+        Returns
+        -------
+        list
+            List of json serializable objects
+        """
+        if not self.fields:
+            return [self.serialize(o) for o in queryset]
+
+        fields = self.default_fields if fields is None else fields
+        return [dict(zip(fields, row)) for row in queryset.values_list(*fields)]
+
+    def get_fields(self, requested: str=None) -> Tuple[str, ...]:
+        """Return fields from comma separated string
+
+        Parameters
+        ----------
+        requested
+            Comma separated fields names, default_fields if empty
+
+        Returns
+        -------
+        tuple
+            Fields names
+
+        Raises
+        ------
+        ValueError
+            If some of fields are unknown
+        """
+        if not requested:
+            return self.default_fields
+
+        fields = tuple(dict.fromkeys(f.strip() for f in requested.split(',') if f.strip()))
+        unknown = [f for f in fields if f not in self.fields]
+        if unknown:
+            raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+        return fields
+
 
 class NewsSerializer(BaseSerializer):
     """News serializer"""
 
+    # the same fields as model_to_dict returns
+    fields = ('id', 'source', 'url', 'normalized_path', 'title', 'published_at', 'author', 'description',
+              'image_url', 'content')
+    # content is unbounded and rarely needed in lists, so it is returned only on request
+    default_fields = ('id', 'source', 'url', 'normalized_path', 'title', 'published_at', 'author', 'description',
+                      'image_url')
+
     def serialize(self, obj: NewsModel):
         """
 
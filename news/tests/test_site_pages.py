@@ -2,17 +2,22 @@ import json
 from http import HTTPStatus
 
 from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
 from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils.timezone import now
 
 from news.models import NewsSourceModel, NewsModel
+from news_project.throttling_middleware import RateLimit, SlidingWindowLimiter, get_throttling_policies
 
 
 class MainNewsPage(TestCase):
     maxDiff = None
 
     def setUp(self):
+        # cached values are not rolled back with db
+        cache.clear()
+
         source = NewsSourceModel.objects.create(domain='news.com')
 
         self.news_count = 340
@@ -52,6 +57,32 @@ class MainNewsPage(TestCase):
         resp = self.client.get(reverse('news:news-list') + '-123/')
         self.assertEqual(HTTPStatus.NOT_FOUND, resp.status_code, resp.content)
 
+    def test_main_page_cursor(self):
+        expected = list(NewsModel.objects.order_by('-published_at', '-id'))
+
+        resp = self.client.get(reverse('news:news-list'), data={'cursor': ''})
+        self.assertEqual(HTTPStatus.OK, resp.status_code, resp.content)
+        self.assertEqual(expected[:20], resp.context['page_obj'].object_list)
+        self.assertFalse(resp.context['page_obj'].has_previous())
+
+        resp = self.client.get(reverse('news:news-list'), data={'cursor': resp.context['page_obj'].next_cursor})
+        self.assertEqual(HTTPStatus.OK, resp.status_code, resp.content)
+        self.assertEqual(expected[20:40], resp.context['page_obj'].object_list)
+        self.assertContains(resp, '?cursor=')
+
+        resp = self.client.get(reverse('news:news-list'), data={'cursor': 'asdf'})
+        self.assertEqual(HTTPStatus.NOT_FOUND, resp.status_code, resp.content)
+
+    def test_main_page_conditional_get(self):
+        resp = self.client.get(reverse('news:news-list', kwargs={'page': 2}))
+        self.assertEqual(HTTPStatus.OK, resp.status_code)
+
+        resp = self.client.get(reverse('news:news-list', kwargs={'page': 2}), HTTP_IF_NONE_MATCH=resp['ETag'])
+        self.assertEqual(HTTPStatus.NOT_MODIFIED, resp.status_code)
+
+        resp = self.client.get(reverse('news:news-list', kwargs={'page': 3}), HTTP_IF_NONE_MATCH=resp['ETag'])
+        self.assertEqual(HTTPStatus.OK, resp.status_code)
+
     @override_settings(IP_REQUESTS_IN_HOUR_LIMIT=5)
     def test_throttling(self):
         cache.clear()
@@ -64,4 +95,115 @@ class MainNewsPage(TestCase):
         self.assertIn('error', json.loads(resp.content))
 
         resp = self.client.get(reverse('news:news-list'))
-        self.assertEqual(HTTPStatus.TOO_MANY_REQUESTS, resp.status_code)
\ No newline at end of file
+        self.assertEqual(HTTPStatus.TOO_MANY_REQUESTS, resp.status_code)
+        self.assertEqual('5', resp['X-RateLimit-Limit'])
+        self.assertEqual('0', resp['X-RateLimit-Remaining'])
+        self.assertLessEqual(int(resp['X-RateLimit-Reset']), int(resp['Retry-After']))
+
+    @override_settings(IP_REQUESTS_IN_HOUR_LIMIT=5)
+    def test_throttling_headers(self):
+        for remaining in (4, 3):
+            resp = self.client.get(reverse('api:news'))
+            self.assertEqual(str(remaining), resp['X-RateLimit-Remaining'])
+            self.assertNotIn('Retry-After', resp)
+
+    @override_settings(IP_REQUESTS_IN_HOUR_LIMIT=2, THROTTLING_POLICIES=[
+        {'prefix': '/api/v1/news/export/', 'budget': 'export', 'limit': 1, 'json': True},
+        {'prefix': '/api/', 'budget': 'default', 'json': True},
+        {'prefix': '/', 'budget': 'default'},
+    ])
+    def test_throttling_policies(self):
+        # exempt paths are not counted and have no rate limit headers
+        for i in range(3):
+            resp = self.client.get('/static/style.css')
+            self.assertNotIn('X-RateLimit-Limit', resp)
+
+        resp = self.client.get(reverse('api:news-export'))
+        self.assertEqual(HTTPStatus.OK, resp.status_code)
+        self.assertEqual('1', resp['X-RateLimit-Limit'])
+        resp = self.client.get(reverse('api:news-export'))
+        self.assertEqual(HTTPStatus.TOO_MANY_REQUESTS, resp.status_code)
+        self.assertIn('error', json.loads(resp.content))
+
+        # export has its own budget
+        for i in range(2):
+            resp = self.client.get(reverse('api:news'))
+            self.assertEqual(HTTPStatus.OK, resp.status_code)
+        resp = self.client.get(reverse('news:news-list'))
+        self.assertEqual(HTTPStatus.TOO_MANY_REQUESTS, resp.status_code)
+        self.assertEqual(b'Too many requests', resp.content)
+
+    @override_settings(THROTTLING_POLICIES=[
+        {'prefix': '/api/', 'budget': 'default', 'limit': 10},
+        {'prefix': '/', 'budget': 'default', 'limit': 20},
+    ])
+    def test_throttling_policies_conflict(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_throttling_policies()
+
+    @override_settings(IP_REQUESTS_IN_HOUR_LIMIT=5, THROTTLING_POLICIES=[
+        {'prefix': '/api/', 'budget': 'blocked', 'limit': 0, 'json': True},
+        {'prefix': '/', 'budget': 'default'},
+    ])
+    def test_throttling_policies_zero_limit(self):
+        self.assertEqual([0, 5], [p.limiter.limit for p in get_throttling_policies()])
+        resp = self.client.get(reverse('api:news'))
+        self.assertEqual(HTTPStatus.TOO_MANY_REQUESTS, resp.status_code)
+        resp = self.client.get(reverse('news:news-list'))
+        self.assertEqual(HTTPStatus.OK, resp.status_code)
+
+    def test_sliding_window_limiter(self):
+        limiter = SlidingWindowLimiter(10, window=100)
+        start = 1000 * 100
+
+        for i in range(10):
+            self.assertTrue(limiter.hit('1.1.1.1', start + 50).allowed)
+        for i in range(3):
+            rate_limit = limiter.hit('1.1.1.1', start + 50)
+            self.assertFalse(rate_limit.allowed)
+            self.assertEqual(50, rate_limit.reset)
+            self.assertEqual(60, rate_limit.retry_after)
+        # rejected requests are not counted
+        self.assertEqual(10, cache.get('throttling:1.1.1.1:1000'))
+        # other clients have own limits
+        self.assertTrue(limiter.hit('2.2.2.2', start + 50).allowed)
+
+        # 10 requests of previous window are still in sliding window
+        rate_limit = limiter.hit('1.1.1.1', start + 100)
+        self.assertFalse(rate_limit.allowed)
+        self.assertEqual(10, rate_limit.retry_after)
+        # client retrying after Retry-After is allowed, counter isn't reset like fixed window counter with ttl
+        rate_limit = limiter.hit('1.1.1.1', start + 110)
+        self.assertEqual(RateLimit(True, 10, 0, 90, 0), rate_limit)
+        self.assertTrue(limiter.hit('1.1.1.1', start + 190).allowed)
+
+    def test_sliding_window_limiter_local_batch(self):
+        limiter = SlidingWindowLimiter(10, window=100, local_batch=4, prefix='batch')
+        start = 1000 * 100
+        for i in range(3):
+            self.assertEqual(10 - i - 1, limiter.hit('1.1.1.1', start).remaining)
+        self.assertIsNone(cache.get('batch:1.1.1.1:1000'))
+
+        limiter.hit('1.1.1.1', start)
+        self.assertEqual(4, cache.get('batch:1.1.1.1:1000'))
+
+        # requests not yet added to shared counter are added at the start of the next window
+        limiter.hit('1.1.1.1', start)
+        limiter.hit('1.1.1.1', start + 100)
+        self.assertEqual(5, cache.get('batch:1.1.1.1:1000'))
+    def test_sliding_window_limiter_max_clients(self):
+        limiter = SlidingWindowLimiter(10, window=100, local_batch=4, prefix='clients', max_clients=2)
+        start = 1000 * 100
+        for i in range(100):
+            limiter.hit(f'10.0.0.{i}', start)
+            limiter.hit(f'10.0.0.{i}', start)
+        self.assertEqual(2, len(limiter._current))
+        self.assertEqual(2, len(limiter._previous))
+        # not yet shared count of evicted client is added to cache
+        self.assertEqual(2, cache.get('clients:10.0.0.0:1000'))
+
+        # recently seen client is kept
+        limiter.hit('10.0.0.98', start)
+        limiter.hit('10.0.0.100', start)
+        self.assertEqual(['10.0.0.98', '10.0.0.100'], list(limiter._current))
+        self.assertEqual(2, cache.get('clients:10.0.0.99:1000'))
@@ -1,17 +1,42 @@
 import json
+import multiprocessing
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from http import HTTPStatus
 
 from django.utils.timezone import now
 
 from news.models import NewsSourceModel, NewsModel
-from news.views_api import NewsAPIView
+from news.scrapers.newsapi_org import NewsApiOrgScraper
+from news.serializers import NewsSerializer
+from news.tests.tests_scrapers import sample_data
+from news.utils.conditional import VALIDATORS_CHECK_INTERVAL
+from news.utils.response_cache import bump_news_version, get_news_version, response_cache_stats
+from news.views_api import NewsAPIView, NewsExportView
+
+
+def change_news_in_other_process():
+    bump_news_version()
+    response_cache_stats.hit()
+    response_cache_stats.flush()
 
 
 class ApiTestCase(TestCase):
 
+    def setUp(self):
+        # cached values are not rolled back with db
+        cache.clear()
+
     def test_empty_db(self):
         resp = self.client.get(reverse('api:news'))
         self.assertEqual(HTTPStatus.OK, resp.status_code, resp.content)
@@ -60,3 +85,278 @@ class ApiTestCase(TestCase):
         resp_data = json.loads(resp.content)
         self.assertEqual(news_count, resp_data['count'])
         self.assertEqual(news_count % NewsAPIView.paginate_by, len(resp_data['objects']))
+
+    def test_cursor_pagination(self):
+        source = NewsSourceModel.objects.create(domain='news.com')
+
+        news_count = 340
+        published_at = now()
+        NewsModel.objects.bulk_create([
+            NewsModel(source=source, url=f'http://some.domain.com/path/{i}', title=f'some title {i}',
+                      published_at=published_at - timedelta(minutes=i // 3))
+            for i in range(news_count)
+        ])
+        expected_ids = list(NewsModel.objects.order_by('-published_at', '-id').values_list('id', flat=True))
+
+        ids, cursors, cursor = [], [], ''
+        while cursor is not None:
+            resp = self.client.get(reverse('api:news'), data={'cursor': cursor})
+            self.assertEqual(HTTPStatus.OK, resp.status_code, resp.content)
+
+            resp_data = json.loads(resp.content)
+            self.assertNotIn('count', resp_data)
+            ids.extend(o['id'] for o in resp_data['objects'])
+            cursors.append(cursor)
+            cursor = resp_data['next']
+
+        self.assertSequenceEqual(expected_ids, ids)
+        self.assertEqual(news_count // NewsAPIView.paginate_by + 1, len(cursors))
+
+        # go back from the last page
+        resp_data = json.loads(self.client.get(reverse('api:news'), data={'cursor': cursors[-1]}).content)
+        resp_data = json.loads(self.client.get(reverse('api:news'), data={'cursor': resp_data['prev']}).content)
+        self.assertSequenceEqual(expected_ids[200:300], [o['id'] for o in resp_data['objects']])
+        resp_data = json.loads(self.client.get(reverse('api:news'), data={'cursor': resp_data['prev']}).content)
+        resp_data = json.loads(self.client.get(reverse('api:news'), data={'cursor': resp_data['prev']}).content)
+        self.assertSequenceEqual(expected_ids[:100], [o['id'] for o in resp_data['objects']])
+        self.assertIsNone(resp_data['prev'])
+
+    def test_invalid_cursor(self):
+        for cursor in ['asdf', 'W10', 'WyJuIiwgImFzZGYiLCAxXQ']:
+            with self.subTest(cursor):
+                resp = self.client.get(reverse('api:news'), data={'cursor': cursor})
+                self.assertEqual(HTTPStatus.BAD_REQUEST, resp.status_code, resp.content)
+                self.assertIn('cursor', json.loads(resp.content)['error'].lower())
+
+    def test_cached_count(self):
+        source = NewsSourceModel.objects.create(domain='news.com')
+        NewsModel.objects.create(source=source, url='http://some.domain.com/path/', title='title', published_at=now())
+
+        # validators for conditional get, count and page
+        with self.assertNumQueries(3):
+            resp_data = json.loads(self.client.get(reverse('api:news')).content)
+        self.assertEqual(1, resp_data['count'])
+
+        # count is cached and updated on insert
+        NewsModel.objects.bulk_create([NewsModel(source=source, url=f'http://some.domain.com/path/{i}',
+                                                 title=f'some title {i}', published_at=now()) for i in range(3)])
+        # news changed, so there are validators and page, but not count
+        with self.assertNumQueries(2):
+            resp_data = json.loads(self.client.get(reverse('api:news')).content)
+        self.assertEqual(4, resp_data['count'])
+
+        NewsModel.objects.filter(title='title').delete()
+        resp_data = json.loads(self.client.get(reverse('api:news')).content)
+        self.assertEqual(3, resp_data['count'])
+
+    @override_settings(APPROXIMATE_COUNT_THRESHOLD=2)
+    def test_approximate_count(self):
+        source = NewsSourceModel.objects.create(domain='news.com')
+        news = NewsModel.objects.bulk_create([NewsModel(source=source, url=f'http://some.domain.com/path/{i}',
+                                                        title=f'some title {i}', published_at=now()) for i in range(5)])
+        NewsModel.objects.filter(id=news[0].id).delete()
+
+        # estimation is the biggest id
+        resp_data = json.loads(self.client.get(reverse('api:news')).content)
+        self.assertEqual(NewsModel.objects.order_by('-id').first().id, resp_data['count'])
+
+    def test_serialize_queryset(self):
+        source = NewsSourceModel.objects.create(domain='news.com')
+        NewsModel.objects.bulk_create([NewsModel(source=source, url=f'http://some.domain.com/path/{i}',
+                                                 title=f'some title {i}', published_at=now(), content='content')
+                                       for i in range(3)])
+
+        serializer = NewsSerializer()
+        qs = NewsModel.objects.order_by('id')
+        with self.assertNumQueries(1):
+            data = serializer.serialize_queryset(qs, serializer.fields)
+        self.assertEqual([serializer.serialize(o) for o in qs], data)
+
+    def test_fields(self):
+        source = NewsSourceModel.objects.create(domain='news.com')
+        NewsModel.objects.bulk_create([NewsModel(source=source, url=f'http://some.domain.com/path/{i}',
+                                                 title=f'some title {i}', published_at=now(), content='content')
+                                       for i in range(3)])
+
+        # content is not returned by default
+        with CaptureQueriesContext(connection) as queries:
+            resp_data = json.loads(self.client.get(reverse('api:news')).content)
+        self.assertNotIn('content', resp_data['objects'][0])
+        self.assertIn('title', resp_data['objects'][0])
+        self.assertNotIn('content', queries[-1]['sql'])
+
+        for data in ({'fields': 'title,url'}, {'fields': 'title, url', 'cursor': ''}):
+            with self.subTest(data):
+                with CaptureQueriesContext(connection) as queries:
+                    resp_data = json.loads(self.client.get(reverse('api:news'), data=data).content)
+                self.assertEqual([{'title', 'url'}] * 3, [o.keys() for o in resp_data['objects']])
+                self.assertNotIn('description', queries[-1]['sql'])
+
+        resp_data = json.loads(self.client.get(reverse('api:news'), data={'fields': 'id,content'}).content)
+        self.assertEqual({'id': NewsModel.objects.last().id, 'content': 'content'}, resp_data['objects'][0])
+
+        resp = self.client.get(reverse('api:news'), data={'fields': 'title,unique_hash'})
+        self.assertEqual(HTTPStatus.BAD_REQUEST, resp.status_code, resp.content)
+        self.assertIn('unique_hash', json.loads(resp.content)['error'])
+
+    @override_settings(RESPONSE_CACHE_STATS_BATCH=1)
+    def test_response_cache(self):
+        response_cache_stats.reset()
+
+        resp = self.client.get(reverse('api:news'), data={'fields': 'title'})
+        self.assertEqual('MISS', resp['X-Cache'])
+        self.assertEqual(0, json.loads(resp.content)['count'])
+
+        with self.assertNumQueries(0):
+            resp = self.client.get(reverse('api:news'), data={'fields': 'title'})
+        self.assertEqual('HIT', resp['X-Cache'])
+        self.assertEqual(0, json.loads(resp.content)['count'])
+
+        # another url
+        resp = self.client.get(reverse('api:news'))
+        self.assertEqual('MISS', resp['X-Cache'])
+
+        # scraper changes news version
+        NewsApiOrgScraper()._save_data(sample_data)
+        resp = self.client.get(reverse('api:news'), data={'fields': 'title'})
+        self.assertEqual('MISS', resp['X-Cache'])
+        self.assertEqual(1, json.loads(resp.content)['count'])
+
+        # already saved news don't change version
+        NewsApiOrgScraper()._save_data(sample_data)
+        resp = self.client.get(reverse('api:news'), data={'fields': 'title'})
+        self.assertEqual('HIT', resp['X-Cache'])
+
+        # errors are not cached
+        self.client.get(reverse('api:news'), data={'page': 'asdf'})
+        resp = self.client.get(reverse('api:news'), data={'page': 'asdf'})
+        self.assertEqual(HTTPStatus.BAD_REQUEST, resp.status_code)
+        self.assertEqual('MISS', resp['X-Cache'])
+
+        self.assertEqual({'hits': 2, 'misses': 5, 'hit_ratio': 2 / 7}, response_cache_stats.get())
+
+    def test_cache_shared_by_processes(self):
+        response_cache_stats.reset()
+        version = get_news_version()
+
+        # like fetch_news or response_cache_stats command running beside web server
+        process = multiprocessing.get_context('fork').Process(target=change_news_in_other_process)
+        process.start()
+        process.join()
+        self.assertEqual(0, process.exitcode)
+
+        self.assertNotEqual(version, get_news_version())
+        self.assertEqual(1, response_cache_stats.get()['hits'])
+
+    def test_conditional_get(self):
+        resp = self.client.get(reverse('api:news'))
+        self.assertEqual(HTTPStatus.OK, resp.status_code)
+        etag, last_modified = resp['ETag'], resp['Last-Modified']
+
+        with self.assertNumQueries(0):
+            resp = self.client.get(reverse('api:news'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(HTTPStatus.NOT_MODIFIED, resp.status_code)
+        self.assertEqual(b'', resp.content)
+
+        resp = self.client.get(reverse('api:news'), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(HTTPStatus.NOT_MODIFIED, resp.status_code)
+
+        # another page has another etag
+        resp = self.client.get(reverse('api:news'), data={'page': 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertNotEqual(HTTPStatus.NOT_MODIFIED, resp.status_code)
+
+        NewsApiOrgScraper()._save_data(sample_data)
+        resp = self.client.get(reverse('api:news'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(HTTPStatus.OK, resp.status_code)
+        self.assertEqual(1, json.loads(resp.content)['count'])
+        self.assertNotEqual(etag, resp['ETag'])
+
+    def test_conditional_get_without_version_bump(self):
+        source = NewsSourceModel.objects.create(domain='news.com')
+        etag = self.client.get(reverse('api:news'))['ETag']
+
+        # news saved by process, whose version bump is lost
+        with mock.patch('news.models.bump_news_version'):
+            NewsModel.objects.bulk_create([NewsModel(source=source, url='http://some.domain.com/path/',
+                                                     title='title', published_at=now())])
+        resp = self.client.get(reverse('api:news'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(HTTPStatus.NOT_MODIFIED, resp.status_code)
+
+        with mock.patch('news.utils.conditional.time.time', return_value=time.time() + VALIDATORS_CHECK_INTERVAL + 1):
+            resp = self.client.get(reverse('api:news'), HTTP_IF_NONE_MATCH=etag)
+            self.assertNotEqual(HTTPStatus.NOT_MODIFIED, resp.status_code)
+            self.assertNotEqual(etag, resp['ETag'])
+            new_last_modified = resp['Last-Modified']
+
+        # the same news are checked again later, modified time stays
+        with mock.patch('news.utils.conditional.time.time', return_value=time.time() + 2 * VALIDATORS_CHECK_INTERVAL + 2):
+            resp = self.client.get(reverse('api:news'), HTTP_IF_MODIFIED_SINCE=new_last_modified)
+            self.assertEqual(HTTPStatus.NOT_MODIFIED, resp.status_code)
+
+    def test_export(self):
+        sources = [NewsSourceModel.objects.create(domain=domain) for domain in ('a.com', 'b.com')]
+        published_at = now()
+        NewsModel.objects.bulk_create([
+            NewsModel(source=sources[i % 2], url=f'http://some.domain.com/path/{i}', title=f'some title {i}',
+                      published_at=published_at - timedelta(days=i), content='content')
+            for i in range(25)
+        ])
+        expected = NewsSerializer().serialize_queryset(NewsModel.objects.order_by('-published_at', '-id'),
+                                                       NewsSerializer.fields)
+
+        with mock.patch.object(NewsExportView, 'chunk_size', 10):
+            resp = self.client.get(reverse('api:news-export'))
+        self.assertEqual(HTTPStatus.OK, resp.status_code)
+        self.assertEqual('application/x-ndjson', resp['Content-Type'])
+
+        lines = b''.join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(json.loads(json.dumps(expected, cls=DjangoJSONEncoder)), list(map(json.loads, lines)))
+
+        since = (published_at - timedelta(days=10)).isoformat()
+        resp = self.client.get(reverse('api:news-export'), data={'since': since, 'source': 'a.com',
+                                                                 'fields': 'title'})
+        lines = b''.join(resp.streaming_content).decode().splitlines()
+        self.assertEqual([{'title': f'some title {i}'} for i in range(0, 11, 2)], list(map(json.loads, lines)))
+
+        resp = self.client.get(reverse('api:news-export'), data={'since': 'asdf'})
+        self.assertEqual(HTTPStatus.BAD_REQUEST, resp.status_code)
+
+        out = StringIO()
+        call_command('export_news', since=since, sources=['b.com'], fields='id,title', chunk_size=2, stdout=out)
+        self.assertEqual([o['title'] for o in expected[1:11:2]],
+                         [json.loads(line)['title'] for line in out.getvalue().splitlines()])
+
+    def test_search(self):
+        source = NewsSourceModel.objects.create(domain='news.com')
+        NewsModel.objects.bulk_create([
+            NewsModel(source=source, url='http://news.com/1', title='Django release', published_at=now(),
+                      description='New version of web framework'),
+            NewsModel(source=source, url='http://news.com/2', title='Python and Django', published_at=now(),
+                      description='Django, Django and Django again', content='About django'),
+            NewsModel(source=source, url='http://news.com/3', title='Python news', published_at=now()),
+        ])
+
+        resp = self.client.get(reverse('api:news-search'), data={'q': 'django'})
+        self.assertEqual(HTTPStatus.OK, resp.status_code, resp.content)
+        resp_data = json.loads(resp.content)
+        self.assertEqual(2, resp_data['count'])
+        # more matches give higher rank
+        self.assertEqual(['Python and Django', 'Django release'], [o['title'] for o in resp_data['objects']])
+
+        resp = self.client.get(reverse('api:news-search'), data={'q': 'PYTHON django'})
+        self.assertEqual(['Python and Django'], [o['title'] for o in json.loads(resp.content)['objects']])
+
+        # index follows updates and deletes made by triggers
+        NewsModel.objects.filter(url='http://news.com/3').update(content='Django inside')
+        NewsModel.objects.filter(url='http://news.com/1').delete()
+        resp = self.client.get(reverse('api:news-search'), data={'q': 'django', 'fields': 'title'})
+        self.assertEqual([{'title': 'Python and Django'}, {'title': 'Python news'}],
+                         json.loads(resp.content)['objects'])
+
+        # query syntax characters are searched as words
+        resp = self.client.get(reverse('api:news-search'), data={'q': 'django" OR NEAR(*'})
+        self.assertEqual(HTTPStatus.OK, resp.status_code, resp.content)
+        self.assertEqual(0, json.loads(resp.content)['count'])
+
+        resp = self.client.get(reverse('api:news-search'), data={'q': ' '})
+        self.assertEqual(HTTPStatus.BAD_REQUEST, resp.status_code, resp.content)
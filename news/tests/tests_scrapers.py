@@ -1,10 +1,34 @@
+import io
+import json
+import os
+import tempfile
+import threading
 from datetime import datetime
+from http import HTTPStatus
+from importlib import import_module
+from unittest import mock
 
-from django.test import TestCase
+import requests
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, TransactionTestCase
+from django.utils.timezone import now
 from pytz import utc
 
-from news.models import NewsModel, NewsSourceModel
-from news.scrapers.newsapi_org import NewsApiOrgScraper
+from news.benchmarks.fake_newsapi import FakeNewsApiConfig, FakeNewsApiServer, load_recorded_responses
+from news.models import FetchStateModel, NewsModel, NewsSourceModel, ProviderQuotaModel, get_unique_hash
+from news.scrapers.async_base import AsyncScraperEngine, ScrapeJob
+from news.scrapers.base import BaseScraper
+from news.scrapers.limits import QuotaExceeded, RetryPolicy, ScraperError, parse_retry_after
+from news.scrapers.newsapi_org import NewsApiOrgScraper, NewsForm
+from news.scrapers.registry import get_scraper_class
+from news.scrapers.scheduler import ScheduledQuery, ScraperScheduler
+from news.utils.cached_count import get_cached_count
+from news.utils.json_stream import iter_object_array
+from news.utils.upsert import bulk_upsert
+from news.utils.url_normalizer import NormalizedUrl, get_url_cache_stats, normalize_url, remove_dot_segments
 
 sample_item = {
     "source": {"id": None, "name": "Makeuseof.com"},
@@ -25,6 +49,38 @@ sample_data = {
 }
 
 
+def make_page(page, page_size, total_results, q=''):
+    """Generate newsapi.org like response for page"""
+    first = (page - 1) * page_size
+    articles = [
+        {**sample_item, 'title': f'Title {q}{i}', 'url': f'https://www.makeuseof.com/tag/{q}{i}/'}
+        for i in range(first, min(first + page_size, total_results))
+    ]
+    return {'status': 'ok', 'totalResults': total_results, 'articles': articles}
+
+
+class FakeSession:
+    """Replacement for requests.Session which generate pages"""
+
+    def __init__(self, page_size=20, total_results=100):
+        self.page_size = page_size
+        self.total_results = total_results
+        self.requested_pages = []
+        self.requested_params = []
+
+    def get(self, url, params=None):
+        self.requested_pages.append(params['page'])
+        self.requested_params.append(params)
+        data = make_page(params['page'], self.page_size, self.total_results, params.get('q', ''))
+        return mock.Mock(status_code=HTTPStatus.OK, json=mock.Mock(return_value=data))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
 class FetchNewsTest(TestCase):
     # def test_fetch_news(self):
     #     from django.core.management import call_command
@@ -105,3 +161,619 @@ class FetchNewsTest(TestCase):
         sample_copy['articles'] = [{**small_sample, **{'urlToImage': 'asdf'}}]
         NewsApiOrgScraper()._save_data(sample_copy)
         self.assertEqual(0, NewsModel.objects.count())
+
+    def test_start(self):
+        for concurrency in (1, 4):
+            with self.subTest(concurrency):
+                NewsModel.objects.all().delete()
+
+                scraper = NewsApiOrgScraper()
+                session = FakeSession(page_size=20, total_results=90)
+                with mock.patch.object(scraper, 'get_session', return_value=session):
+                    downloaded_news = scraper.start(60, concurrency=concurrency)
+
+                self.assertEqual(60, downloaded_news)
+                self.assertEqual([1, 2, 3], sorted(session.requested_pages))
+                self.assertEqual(60, NewsModel.objects.count())
+
+                NewsModel.objects.all().delete()
+                session = FakeSession(page_size=20, total_results=90)
+                with mock.patch.object(scraper, 'get_session', return_value=session):
+                    downloaded_news = scraper.start(1000, concurrency=concurrency)
+
+                self.assertEqual(90, downloaded_news)
+                self.assertEqual([1, 2, 3, 4, 5], sorted(session.requested_pages))
+                self.assertEqual(90, NewsModel.objects.count())
+
+    def test_start_error(self):
+        scraper = NewsApiOrgScraper()
+        session = FakeSession()
+        session.get = mock.Mock(return_value=mock.Mock(
+            status_code=HTTPStatus.UNAUTHORIZED, reason='Unauthorized',
+            json=mock.Mock(return_value={'status': 'error', 'message': 'Your API key is invalid'})
+        ))
+        with mock.patch.object(scraper, 'get_session', return_value=session):
+            with self.assertRaisesRegex(ValueError, 'Your API key is invalid'):
+                scraper.start(100, concurrency=4)
+
+    def test_start_batch_pages(self):
+        scraper = NewsApiOrgScraper()
+        session = FakeSession(page_size=20, total_results=200)
+        get = session.get
+
+        def fail_on_fifth_page(url, params=None):
+            if params['page'] == 5:
+                raise ValueError('Connection lost')
+            return get(url, params)
+
+        session.get = fail_on_fifth_page
+        with mock.patch.object(scraper, 'get_session', return_value=session):
+            with self.assertRaisesMessage(ValueError, 'Connection lost'):
+                scraper.start(1000, batch_pages=3)
+
+        # the first batch is committed, the fourth page is rolled back with its batch
+        self.assertEqual(60, NewsModel.objects.count())
+
+    def test_sqlite_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(1, cursor.fetchone()[0])
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(settings.SQLITE_PRAGMAS['cache_size'], cursor.fetchone()[0])
+
+    def test_validator_matches_forms(self):
+        source = NewsSourceModel.objects.create(domain='makeuseof.com', name='Makeuseof.com')
+        valid_data = {
+            'author': 'Ian Buckley', 'title': 'Title', 'description': 'Description',
+            'url': 'https://www.makeuseof.com/tag/python/', 'image_url': None,
+            'published_at': '2018-10-04T09:00:00Z', 'content': None, 'source': source
+        }
+        invalid_values = [
+            {}, {'url': 'asdf'}, {'url': None}, {'url': 'makeuseof.com/path'}, {'image_url': 'asdf'},
+            {'published_at': 'asdf'}, {'published_at': '2018-10-04 09:00:00'}, {'published_at': None},
+            {'title': ''}, {'title': '   '}, {'title': 'a' * 513}, {'author': 'a' * 129}, {'author': ' name '},
+            {'description': 'a' * 513}, {'url': 'https://a.com/' + 'a' * 1024}, {'source': None},
+            {'title': None, 'published_at': 'asdf', 'image_url': 'asdf'},
+        ]
+        for values in invalid_values:
+            with self.subTest(values):
+                data = {**valid_data, **values}
+                form = NewsForm(data=data, validate_unique=False)
+                news, errors = NewsApiOrgScraper.news_validator.validate(data)
+
+                self.assertEqual(form.errors.as_json(), errors.as_json())
+                if form.is_valid():
+                    form_news = form.save(commit=False)
+                    for field in NewsModel._meta.concrete_fields:
+                        self.assertEqual(getattr(form_news, field.attname), getattr(news, field.attname))
+                else:
+                    self.assertIsNone(news)
+
+    def test_save_news_with_forms(self):
+        NewsApiOrgScraper(use_forms=True)._save_data(sample_data)
+        self.assertEqual(1, NewsModel.objects.count())
+        self.assertEqual(1, NewsSourceModel.objects.count())
+
+        sample_copy = {**sample_data, 'articles': [{**sample_item, 'publishedAt': 'asdf', 'title': 'Title'}]}
+        NewsApiOrgScraper(use_forms=True)._save_data(sample_copy)
+        self.assertEqual(1, NewsModel.objects.count())
+
+    def test_unique_hash(self):
+        NewsApiOrgScraper()._save_data(sample_data)
+
+        news = NewsModel.objects.get()
+        self.assertEqual(40, len(news.unique_hash))
+        self.assertEqual(news.get_unique_hash(), news.unique_hash)
+
+        # the same article with another title is another news
+        sample_copy = {**sample_data, 'articles': [sample_item, {**sample_item, 'title': 'Another title'}]}
+        NewsApiOrgScraper()._save_data(sample_copy)
+        self.assertEqual(2, NewsModel.objects.count())
+        self.assertEqual(2, NewsModel.objects.values('unique_hash').distinct().count())
+
+    def test_normalize_url(self):
+        normalized = normalize_url('HTTPS://WWW.Example.COM:443/%7euser/a/./b/../c%2f?utm_source=rss&id=1&fbclid=x#top')
+        self.assertEqual(NormalizedUrl('example.com', '/~user/a/c%2F', 'https://www.example.com/~user/a/c%2F?id=1'),
+                         normalized)
+        self.assertEqual(NormalizedUrl('example.com:8080', '/', 'http://example.com:8080/'),
+                         normalize_url('http://example.com:8080'))
+        for path, result in [('/a/b/c/./../../g', '/a/g'), ('mid/content=5/../6', 'mid/6'), ('/a/..', '/'),
+                             ('/a/b/.', '/a/b/'), ('/a.b/c.d', '/a.b/c.d')]:
+            with self.subTest(path):
+                self.assertEqual(result, remove_dot_segments(path))
+
+        hits = get_url_cache_stats()['hits']
+        normalize_url('http://example.com:8080')
+        self.assertEqual(hits + 1, get_url_cache_stats()['hits'])
+
+    def test_renormalize_migration(self):
+        renormalize_news_urls = import_module('news.migrations.0006_renormalize_news_urls').renormalize_news_urls
+        NewsSourceModel.objects.bulk_create([NewsSourceModel(domain=domain, name=name) for domain, name in [
+            ('Example.com', 'Example'), ('example.com', 'example'), ('Other.com:443', 'Other'),
+            ('www.double.com', 'Double'),
+        ]])
+        # source, url, title and path of old urlparse normalization
+        rows = [
+            ('Example.com', 'http://Example.com/x;p', 'T', '/x'),
+            # the old key of this news is the new key of the first one
+            ('example.com', 'http://example.com/x;p;q', 'T', '/x;p'),
+            # duplicate of the first news after normalization
+            ('example.com', 'http://example.com/x;p', 'T', '/x'),
+            ('Other.com:443', 'https://Other.com:443/a/./b', 'A', '/a/./b'),
+            ('www.double.com', 'http://www.www.double.com/b', 'B', '/b'),
+        ]
+        NewsModel.objects.bulk_create([
+            NewsModel(source_id=source, url=url, title=title, normalized_path=path, published_at=now(),
+                      unique_hash=get_unique_hash(source, path, title))
+            for source, url, title, path in rows
+        ])
+        ids = list(NewsModel.objects.order_by('id').values_list('id', flat=True))
+
+        renormalize_news_urls(django_apps, None)
+
+        self.assertEqual([('example.com', 'example'), ('other.com', 'Other'), ('www.double.com', 'Double')],
+                         list(NewsSourceModel.objects.order_by('domain').values_list('domain', 'name')))
+        expected = [(ids[0], 'example.com', '/x;p'), (ids[1], 'example.com', '/x;p;q'),
+                    (ids[3], 'other.com', '/a/b'), (ids[4], 'www.double.com', '/b')]
+        self.assertEqual(expected, list(NewsModel.objects.order_by('id').values_list('id', 'source_id',
+                                                                                      'normalized_path')))
+        for item in NewsModel.objects.all():
+            self.assertEqual(item.get_unique_hash(), item.unique_hash)
+
+    def test_save_news_normalized_url(self):
+        # the same article with another host case, dot segments and tracking parameters
+        url = 'HTTPS://MakeUseOf.com:443/tag/./python-programming-language-downsides/?utm_source=rss'
+        sample_copy = {**sample_data, 'articles': [sample_item, {**sample_item, 'url': url}]}
+        NewsApiOrgScraper()._save_data(sample_copy)
+
+        news = NewsModel.objects.get()
+        self.assertEqual('/tag/python-programming-language-downsides/', news.normalized_path)
+
+    def test_save_news_without_upsert(self):
+        with mock.patch('news.scrapers.base.supports_upsert', return_value=False):
+            NewsApiOrgScraper()._save_data(sample_data)
+            NewsApiOrgScraper()._save_data(sample_data)
+
+        self.assertEqual(1, NewsModel.objects.count())
+        self.assertEqual(1, NewsSourceModel.objects.count())
+
+    def test_save_news_overwrite(self):
+        NewsApiOrgScraper()._save_data(sample_data)
+
+        changed_item = {**sample_item, 'description': 'new description', 'content': 'new content'}
+        changed_data = {**sample_data, 'articles': [changed_item]}
+
+        NewsApiOrgScraper()._save_data(changed_data)
+        news = NewsModel.objects.get()
+        self.assertEqual(sample_item['description'], news.description)
+        self.assertEqual(sample_item['content'], news.content)
+
+        NewsApiOrgScraper(update_fields=['description'])._save_data(changed_data)
+        news = NewsModel.objects.get()
+        self.assertEqual(changed_item['description'], news.description)
+        self.assertEqual(sample_item['content'], news.content)
+
+    def test_bulk_upsert(self):
+        sources = [NewsSourceModel(domain='a.com', name='A'), NewsSourceModel(domain='b.com', name='B')]
+        self.assertEqual((2, 0), bulk_upsert(NewsSourceModel, sources, ['domain']))
+
+        sources = [NewsSourceModel(domain='a.com', name='A'), NewsSourceModel(domain='b.com', name='New B'),
+                   NewsSourceModel(domain='c.com', name='C'), NewsSourceModel(domain='c.com', name='New C')]
+        self.assertEqual((1, 1), bulk_upsert(NewsSourceModel, sources, ['domain'], ['name'], batch_size=2))
+        self.assertEqual(['A', 'New B', 'New C'], list(NewsSourceModel.objects.order_by('domain')
+                                                       .values_list('name', flat=True)))
+
+    def test_start_incremental(self):
+        for concurrency in (1, 4):
+            with self.subTest(concurrency):
+                NewsModel.objects.all().delete()
+                FetchStateModel.objects.all().delete()
+
+                scraper = NewsApiOrgScraper()
+                session = FakeSession(page_size=20, total_results=90)
+                with mock.patch.object(scraper, 'get_session', return_value=session):
+                    downloaded_news = scraper.start(1000, params={'q': 'python'}, path='everything',
+                                                    concurrency=concurrency, incremental=True)
+
+                self.assertEqual(90, downloaded_news)
+                self.assertNotIn('from', session.requested_params[0])
+
+                state = FetchStateModel.objects.get(provider='newsapi_org', theme='everything', q='python')
+                self.assertEqual(datetime(2018, 10, 4, 9, tzinfo=utc), state.newest_published_at)
+
+                # the first page already saved, so there is no reason to continue
+                session = FakeSession(page_size=20, total_results=90)
+                with mock.patch.object(scraper, 'get_session', return_value=session):
+                    downloaded_news = scraper.start(1000, params={'q': 'python'}, path='everything',
+                                                    concurrency=concurrency, incremental=True)
+
+                self.assertEqual(20, downloaded_news)
+                self.assertEqual([1], session.requested_pages)
+                self.assertEqual('2018-10-04T09:00:00', session.requested_params[0]['from'])
+
+    def test_import_news(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_path = os.path.join(tmp_dir, 'pages.json')
+            with open(json_path, 'w') as f:
+                json.dump([make_page(1, 20, 50), make_page(2, 20, 50)], f)
+            ndjson_path = os.path.join(tmp_dir, 'pages.ndjson')
+            with open(ndjson_path, 'w') as f:
+                # the second page repeats news of json file
+                f.writelines(f'{json.dumps(make_page(page, 20, 50))}\n' for page in (2, 3))
+
+            out = io.StringIO()
+            with mock.patch('news.management.commands.import_news.get_scraper_class',
+                            wraps=get_scraper_class) as get_class:
+                call_command('import_news', json_path, ndjson_path, batch_size=30, provider='newsapi_org',
+                             stdout=out)
+            get_class.assert_called_once_with('newsapi_org')
+            self.assertEqual(50, NewsModel.objects.count())
+            self.assertIn('received 70 articles, created 50 news', out.getvalue())
+
+            with self.assertRaisesMessage(CommandError, 'Unknown scraper unknown'):
+                call_command('import_news', json_path, provider='unknown', stdout=io.StringIO())
+
+            with open(ndjson_path, 'a') as f:
+                f.write('{"articles": \n')
+            with self.assertRaisesMessage(CommandError, f'{ndjson_path}:3'):
+                call_command('import_news', ndjson_path, workers=2, stdout=io.StringIO())
+
+    def test_fake_newsapi(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            record_path = os.path.join(tmp_dir, 'responses.ndjson')
+            config = FakeNewsApiConfig(total_results=95, page_size=20)
+            with FakeNewsApiServer(config=config) as server:
+                scraper = NewsApiOrgScraper(api_key='secret', base_url=server.base_url, record_to=record_path)
+                downloaded_news = scraper.start(1000, params={'q': 'python'}, path='everything', concurrency=3)
+
+            self.assertEqual(95, downloaded_news)
+            self.assertEqual(95, NewsModel.objects.count())
+            with open(record_path) as f:
+                self.assertNotIn('secret', f.read())
+
+            # recorded responses are served again without site
+            NewsModel.objects.all().delete()
+            with FakeNewsApiServer(recorded=load_recorded_responses([record_path])) as server:
+                scraper = NewsApiOrgScraper(base_url=server.base_url)
+                downloaded_news = scraper.start(1000, params={'q': 'python'}, path='everything')
+                self.assertEqual(5, server.requests_count)
+
+            self.assertEqual(95, downloaded_news)
+            self.assertEqual(95, NewsModel.objects.count())
+
+    def test_fake_newsapi_faults(self):
+        config = FakeNewsApiConfig(total_results=100, page_size=20, malformed_rate=0.3)
+        with FakeNewsApiServer(config=config) as server:
+            downloaded_news = NewsApiOrgScraper(base_url=server.base_url).start(1000, path='everything')
+
+        self.assertEqual(100, downloaded_news)
+        self.assertLess(NewsModel.objects.count(), 100)
+
+        # every third request is rejected
+        config = FakeNewsApiConfig(total_results=100, page_size=20, error_every=3, retry_after=0)
+        with FakeNewsApiServer(config=config) as server:
+            with self.assertRaisesMessage(ScraperError, 'too many requests'):
+                NewsApiOrgScraper(base_url=server.base_url, retry_policy=RetryPolicy(retries=0)).start(1000)
+            self.assertEqual(3, server.requests_count)
+
+        for status in (HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE):
+            with self.subTest(status):
+                NewsModel.objects.all().delete()
+                config = FakeNewsApiConfig(total_results=100, page_size=20, error_every=3, error_status=status,
+                                           retry_after=0)
+                with FakeNewsApiServer(config=config) as server:
+                    scraper = NewsApiOrgScraper(base_url=server.base_url, retry_policy=RetryPolicy(backoff=0))
+                    downloaded_news = scraper.start(1000, path='everything', concurrency=2)
+                    self.assertEqual(100, downloaded_news)
+                    self.assertEqual(100, NewsModel.objects.count())
+                    self.assertGreater(server.requests_count, 5)
+
+    def test_retry_after(self):
+        scraper = NewsApiOrgScraper()
+        session = FakeSession(page_size=20, total_results=40)
+        get = session.get
+        responses = [
+            mock.Mock(status_code=HTTPStatus.TOO_MANY_REQUESTS, reason='Too Many Requests',
+                      headers={'Retry-After': '7'}, json=mock.Mock(return_value={'message': 'Slow down'})),
+            mock.Mock(status_code=HTTPStatus.BAD_GATEWAY, reason='Bad Gateway', headers={},
+                      json=mock.Mock(side_effect=ValueError('Expecting value'))),
+        ]
+        session.get = lambda url, params=None: responses.pop(0) if responses else get(url, params)
+
+        with mock.patch.object(scraper, 'get_session', return_value=session), \
+                mock.patch('news.scrapers.base.time.sleep') as sleep:
+            self.assertEqual(40, scraper.start(1000))
+
+        self.assertEqual([1, 2], session.requested_pages)
+        delays = [call[0][0] for call in sleep.call_args_list]
+        self.assertGreaterEqual(delays[0], 7)
+        self.assertLessEqual(min(delays), RetryPolicy().backoff * 2)
+
+        self.assertEqual(120, parse_retry_after('120'))
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertEqual(0, parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'))
+
+        # site asks to wait too long
+        policy = RetryPolicy(max_retry_after=60)
+        self.assertIsNone(policy.get_delay(0, retry_after=3600))
+        self.assertIsNone(policy.get_delay(policy.retries))
+
+    def test_daily_quota(self):
+        scraper = NewsApiOrgScraper(daily_quota=3)
+        session = FakeSession(page_size=20, total_results=100)
+        with mock.patch.object(scraper, 'get_session', return_value=session):
+            with self.assertRaises(QuotaExceeded):
+                scraper.start(1000)
+
+        self.assertEqual(60, NewsModel.objects.count())
+        self.assertEqual(3, ProviderQuotaModel.objects.get(provider='newsapi_org').requests)
+
+        # quota is shared by all runs of the day
+        scraper = NewsApiOrgScraper(daily_quota=3)
+        session = FakeSession(page_size=20, total_results=100)
+        with mock.patch.object(scraper, 'get_session', return_value=session):
+            with self.assertRaises(QuotaExceeded):
+                scraper.start(1000)
+        self.assertEqual([], session.requested_pages)
+
+    def test_start_resume(self):
+        for concurrency in (1, 4):
+            with self.subTest(concurrency):
+                NewsModel.objects.all().delete()
+                FetchStateModel.objects.all().delete()
+                get_cached_count(NewsModel)
+
+                scraper = NewsApiOrgScraper(retry_policy=RetryPolicy(retries=0))
+                session = FakeSession(page_size=20, total_results=200)
+                get = session.get
+
+                def fail_on_fifth_page(url, params=None):
+                    if params['page'] == 5:
+                        raise requests.ConnectionError('Connection lost')
+                    return get(url, params)
+
+                session.get = fail_on_fifth_page
+                with mock.patch.object(scraper, 'get_session', return_value=session):
+                    with self.assertRaises(requests.ConnectionError):
+                        scraper.start(180, params={'q': 'python'}, concurrency=concurrency, batch_pages=3,
+                                      resume=True)
+
+                # progress of the first batch is committed with its pages
+                state = FetchStateModel.objects.get(provider='newsapi_org', theme='', q='python')
+                self.assertEqual((4, 60), (state.resume_page, state.resume_received))
+                self.assertEqual(60, NewsModel.objects.count())
+                # cached count doesn't keep news of rolled back batch
+                self.assertEqual(60, get_cached_count(NewsModel))
+
+                session = FakeSession(page_size=20, total_results=200)
+                with mock.patch.object(scraper, 'get_session', return_value=session):
+                    downloaded_news = scraper.start(180, params={'q': 'python'}, concurrency=concurrency,
+                                                    resume=True)
+
+                self.assertEqual(180, downloaded_news)
+                self.assertEqual([4, 5, 6, 7, 8, 9], sorted(session.requested_pages))
+                self.assertEqual(180, NewsModel.objects.count())
+                state.refresh_from_db()
+                self.assertEqual((0, 0), (state.resume_page, state.resume_received))
+
+    def test_json_stream(self):
+        data = {'status': 'ok', 'totalResults': 12345, 'articles': [
+            {'title': 'Python ist schön', 'count': 1234567, 'tags': ['a', 'б']}, {}, [], 'text', 1.5e3, None
+        ], 'after': True}
+        encoded = json.dumps(data, ensure_ascii=False, indent=1).encode()
+        for size in (1, 2, 7, len(encoded)):
+            with self.subTest(size):
+                fields = {}
+                chunks = (encoded[i:i + size] for i in range(0, len(encoded), size))
+                self.assertEqual(data['articles'], list(iter_object_array(chunks, 'articles', fields)))
+                self.assertEqual({'status': 'ok', 'totalResults': 12345, 'after': True}, fields)
+
+        self.assertEqual([], list(iter_object_array([b'{"articles": [', b']}'], 'articles', {})))
+        for wrong in (b'{"articles": [{"a": 1}', b'{"articles": [1 2]}', b'{"a": 1} {}', b'[]'):
+            with self.subTest(wrong), self.assertRaises(ValueError):
+                list(iter_object_array([wrong], 'articles', {}))
+
+    def test_start_stream(self):
+        for concurrency in (1, 3):
+            with self.subTest(concurrency):
+                NewsModel.objects.all().delete()
+                config = FakeNewsApiConfig(total_results=95, page_size=20)
+                with FakeNewsApiServer(config=config) as server:
+                    scraper = NewsApiOrgScraper(base_url=server.base_url, stream=True, stream_chunk=7)
+                    with mock.patch.object(scraper, '_save_articles', wraps=scraper._save_articles) as save:
+                        downloaded_news = scraper.start(1000, path='everything', concurrency=concurrency)
+
+                self.assertEqual(95, downloaded_news)
+                self.assertEqual(95, NewsModel.objects.count())
+                self.assertEqual(7, max(len(call[0][0]) for call in save.call_args_list))
+
+        with self.assertRaises(ValueError):
+            NewsApiOrgScraper(stream=True, record_to='responses.ndjson')
+
+    def test_scraper_registry(self):
+        self.assertIs(NewsApiOrgScraper, get_scraper_class('newsapi_org'))
+        with self.assertRaisesMessage(ValueError, 'Unknown scraper unknown, available: newsapi_org'):
+            get_scraper_class('unknown')
+        with self.assertRaisesMessage(ValueError, 'Scraper name newsapi_org is already used'):
+            type('OtherScraper', (BaseScraper,), {'name': 'newsapi_org'})
+
+    def test_parallel_validation(self):
+        articles = make_page(1, 600, 600)['articles']
+        for i in range(0, 600, 7):
+            articles[i] = {**articles[i], 'source': {'id': None, 'name': f'Makeuseof {i}'}}
+        # invalid source of the first shard is replaced by valid source of the second one
+        articles[0] = {**articles[0], 'source': {'id': None, 'name': 'x' * 200}}
+        articles[100] = {**articles[100], 'publishedAt': 'yesterday'}
+        articles[500] = {**articles[500], 'title': articles[10]['title'], 'url': articles[10]['url']}
+
+        def dump(sources_dict, news_dict):
+            return ([(s.domain, s.name) for s in sources_dict.values()],
+                    [(k, n.source.name, n.title, n.url, n.published_at) for k, n in news_dict.items()])
+
+        serial = NewsApiOrgScraper()
+        serial_sources = serial._create_sources_dict(articles)
+        expected = dump(serial_sources, serial._create_news_dict(serial_sources, articles))
+
+        scraper = NewsApiOrgScraper(validation_workers=2)
+        try:
+            sources_dict = scraper._create_sources_dict(articles)
+            news_dict = scraper._create_news_dict(sources_dict, articles)
+            self.assertEqual(expected, dump(sources_dict, news_dict))
+            self.assertTrue(all(n.source is sources_dict[n.source_id] for n in news_dict.values()))
+            self.assertEqual(598, len(news_dict))
+
+            self.assertEqual(598, scraper._save_articles(articles).created)
+            self.assertEqual(598, NewsModel.objects.count())
+        finally:
+            scraper.close()
+
+        with self.assertRaises(ValueError):
+            NewsApiOrgScraper(use_forms=True, validation_workers=2)
+
+
+class AsyncScraperEngineTest(TransactionTestCase):
+    """Engine saves pages in writer thread, so its tests can't run in TestCase transaction"""
+
+    def test_async_engine(self):
+        scraper = NewsApiOrgScraper()
+        jobs = [
+            ScrapeJob(scraper, 60, params={'q': 'python'}),
+            ScrapeJob(scraper, 1000, params={'q': 'django'}),
+        ]
+        session = FakeSession(page_size=20, total_results=90)
+        with mock.patch('news.scrapers.async_base.create_session', return_value=session):
+            downloaded_news = AsyncScraperEngine(concurrency=3, queue_size=2).run(jobs)
+
+        self.assertEqual([60, 90], downloaded_news)
+        self.assertEqual(8, len(session.requested_pages))
+        self.assertEqual(150, NewsModel.objects.count())
+        self.assertEqual(60, NewsModel.objects.filter(title__startswith='Title python').count())
+
+    def test_async_engine_error(self):
+        session = FakeSession()
+        session.get = mock.Mock(return_value=mock.Mock(
+            status_code=HTTPStatus.UNAUTHORIZED, reason='Unauthorized',
+            json=mock.Mock(return_value={'status': 'error', 'message': 'Your API key is invalid'})
+        ))
+        with mock.patch('news.scrapers.async_base.create_session', return_value=session):
+            with self.assertRaisesRegex(ValueError, 'Your API key is invalid'):
+                AsyncScraperEngine().run([ScrapeJob(NewsApiOrgScraper())])
+
+
+    def test_async_engine_stop(self):
+        class StoppingEngine(AsyncScraperEngine):
+            checks = 0
+            save_threads = set()
+
+            async def wants_more_pages(self, job):
+                self.checks += 1
+                return self.checks < 2
+
+            def save(self, job, data):
+                self.save_threads.add(threading.current_thread())
+                super().save(job, data)
+
+        session = FakeSession(page_size=20, total_results=200)
+        engine = StoppingEngine(concurrency=1)
+        with mock.patch('news.scrapers.async_base.create_session', return_value=session):
+            downloaded_news = engine.run([ScrapeJob(NewsApiOrgScraper(), 200)])
+
+        # the page received before stop is saved
+        self.assertEqual([40], downloaded_news)
+        self.assertEqual(40, NewsModel.objects.count())
+        # db writes don't block event loop
+        self.assertNotIn(threading.main_thread(), engine.save_threads)
+
+
+class ScraperSchedulerTest(TransactionTestCase):
+    """Scheduler reads db from executor thread, so its tests can't run in TestCase transaction"""
+
+    def test_scheduler(self):
+        queries = [ScheduledQuery('newsapi_org', 0, path='everything', q=q) for q in ('python', 'django')]
+        config = FakeNewsApiConfig(total_results=60, page_size=10)
+        with FakeNewsApiServer(config=config) as server:
+            scraper = NewsApiOrgScraper(base_url=server.base_url)
+            fetch_page = scraper._fetch_page
+            in_flight, max_in_flight, lock = [0], [0], threading.Lock()
+
+            def counted_fetch_page(*args):
+                with lock:
+                    in_flight[0] += 1
+                    max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+                try:
+                    return fetch_page(*args)
+                finally:
+                    with lock:
+                        in_flight[0] -= 1
+
+            scraper._fetch_page = counted_fetch_page
+            runs = []
+            scheduler = ScraperScheduler(queries, {'newsapi_org': scraper}, concurrency=4,
+                                         provider_concurrency={'newsapi_org': 2},
+                                         on_run=lambda query, stats: runs.append(query.q))
+            scheduler.run(runs=2)
+
+        self.assertEqual(4, len(runs))
+        self.assertLessEqual(max_in_flight[0], 2)
+        self.assertEqual(120, NewsModel.objects.count())
+        for query in queries:
+            stats = scheduler.stats[query]
+            # the second run stops at its first page, that has no new news
+            self.assertEqual((2, 0, 70, 60), (stats.runs, stats.failures, stats.received, stats.created))
+            self.assertGreater(stats.last_articles_per_second, 0)
+            state = FetchStateModel.objects.get(provider='newsapi_org', theme='everything', q=query.q)
+            self.assertEqual(datetime(2018, 10, 1, tzinfo=utc), state.newest_published_at)
+
+    def test_scheduler_failures(self):
+        # not incremental runs request all pages every time
+        query = ScheduledQuery('newsapi_org', 0, path='everything', q='python', incremental=False)
+        # failed runs are counted and repeated
+        config = FakeNewsApiConfig(total_results=60, page_size=10, error_every=4)
+        with FakeNewsApiServer(config=config) as server:
+            scraper = NewsApiOrgScraper(base_url=server.base_url, retry_policy=RetryPolicy(retries=0))
+            scheduler = ScraperScheduler([query], {'newsapi_org': scraper}, concurrency=1)
+            scheduler.run(runs=3)
+
+        stats = scheduler.stats[query]
+        self.assertEqual((3, 3), (stats.runs, stats.failures))
+        self.assertIn('Too Many Requests', stats.last_error)
+
+    def test_scheduler_unexpected_error(self):
+        query = ScheduledQuery('newsapi_org', 0, path='everything', q='python')
+        scraper = NewsApiOrgScraper()
+        # response without totalResults
+        with mock.patch.object(scraper, '_fetch_page', return_value={'status': 'ok', 'articles': []}):
+            scheduler = ScraperScheduler([query], {'newsapi_org': scraper}, concurrency=1)
+            scheduler.run(runs=2)
+
+        stats = scheduler.stats[query]
+        self.assertEqual((2, 2), (stats.runs, stats.failures))
+        self.assertIn('KeyError', stats.last_error)
+        self.assertFalse(FetchStateModel.objects.exists())
+
+        # page that can't be saved fails only its run
+        with FakeNewsApiServer(config=FakeNewsApiConfig(total_results=20, page_size=10)) as server:
+            scraper = NewsApiOrgScraper(base_url=server.base_url)
+            scraper._save_page = mock.Mock(side_effect=IntegrityError('broken page'))
+            scheduler = ScraperScheduler([query], {'newsapi_org': scraper}, concurrency=1)
+            scheduler.run(runs=2)
+
+        stats = scheduler.stats[query]
+        self.assertEqual((2, 2), (stats.runs, stats.failures))
+        self.assertIn('broken page', stats.last_error)
+
+    def test_scheduler_failed_run_keeps_watermark(self):
+        query = ScheduledQuery('newsapi_org', 0, path='everything', q='python')
+        # the first page is saved, the second one fails
+        config = FakeNewsApiConfig(total_results=60, page_size=10, error_every=2)
+        with FakeNewsApiServer(config=config) as server:
+            scraper = NewsApiOrgScraper(base_url=server.base_url, retry_policy=RetryPolicy(retries=0))
+            scheduler = ScraperScheduler([query], {'newsapi_org': scraper}, concurrency=1)
+            scheduler.run(runs=1)
+
+        stats = scheduler.stats[query]
+        self.assertEqual((1, 1, 10), (stats.runs, stats.failures, stats.created))
+        self.assertEqual(10, NewsModel.objects.count())
+        # the next run asks for older pages again
+        self.assertFalse(FetchStateModel.objects.filter(provider='newsapi_org', q='python').exists())
+        self.assertNotIn('from', scheduler.get_job(query).params)
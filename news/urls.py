@@ -1,10 +1,12 @@
 from django.urls import path
 
 from news.views import NewsListView
-from news.views_api import NewsAPIView
+from news.views_api import NewsAPIView, NewsExportView, NewsSearchAPIView
 
 api_urls = [
-    path('news/', NewsAPIView.as_view(), name='news')
+    path('news/', NewsAPIView.as_view(), name='news'),
+    path('news/export/', NewsExportView.as_view(), name='news-export'),
+    path('news/search/', NewsSearchAPIView.as_view(), name='news-search')
 ]
 
 app_name = 'news'
@@ -0,0 +1,92 @@
+from typing import Optional, Type
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections, models
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+
+def _get_count_key(model: Type[models.Model]) -> str:
+    return f'count:{model._meta.label_lower}'
+
+
+def get_cached_count(model: Type[models.Model]) -> int:
+    """Return number of model rows from cache
+
+    On cache miss rows are counted and cached for COUNT_CACHE_TIMEOUT seconds.
+    If APPROXIMATE_COUNT_THRESHOLD is set and estimated number of rows is greater,
+    estimation is cached instead of count.
+
+    Parameters
+    ----------
+    model
+
+    Returns
+    -------
+    int
+    """
+    key = _get_count_key(model)
+    count = cache.get(key)
+    if count is None:
+        if settings.APPROXIMATE_COUNT_THRESHOLD is not None:
+            estimation = estimate_count(model)
+            if estimation is not None and estimation > settings.APPROXIMATE_COUNT_THRESHOLD:
+                count = estimation
+
+        if count is None:
+            count = model._default_manager.count()
+
+        cache.set(key, count, settings.COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def increment_cached_count(model: Type[models.Model], delta: int):
+    """Add delta to cached number of model rows, if it is cached"""
+    if delta:
+        try:
+            cache.incr(_get_count_key(model), delta)
+        except ValueError:
+            # not cached, will be counted on next request
+            pass
+
+
+def invalidate_cached_count(model: Type[models.Model]):
+    """Remove cached number of model rows"""
+    cache.delete(_get_count_key(model))
+
+
+def estimate_count(model: Type[models.Model]) -> Optional[int]:
+    """Return estimated number of model rows without full scan
+
+    For postgresql it is planner statistics, for other databases it is the biggest integer primary key,
+    that is precise enough for tables where rows are rarely deleted
+
+    Returns
+    -------
+    Optional[int]
+        Estimation or None if it isn't available
+    """
+    manager = model._default_manager
+    connection = connections[manager.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+            row = cursor.fetchone()
+        return row[0] if row and row[0] >= 0 else None
+
+    if isinstance(model._meta.pk, models.AutoField):
+        return manager.aggregate(max_pk=Max('pk'))['max_pk'] or 0
+    return None
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that takes number of objects from get_cached_count for not filtered querysets"""
+
+    @cached_property
+    def count(self):
+        object_list = self.object_list
+        if isinstance(object_list, models.QuerySet) and not object_list.query.has_filters():
+            return get_cached_count(object_list.model)
+        return super().count
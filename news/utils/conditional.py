@@ -0,0 +1,72 @@
+import hashlib
+import time
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from news.models import NewsModel
+from news.utils.response_cache import get_news_version
+
+VALIDATORS_KEY = 'news:validators'
+VALIDATORS_CACHE_TIMEOUT = 24 * 3600
+# validators are recalculated after this number of seconds even if news version is the same,
+# so news saved without version bump (lost cache increment, not shared cache) are seen soon
+VALIDATORS_CHECK_INTERVAL = 5
+
+
+class NewsValidators(NamedTuple):
+    """Values that change every time news change"""
+
+    version: int
+    max_id: Optional[int]
+    newest_published_at: Optional[datetime]
+    modified_at: datetime
+    # timestamp of calculation
+    checked_at: float
+
+
+def get_news_validators() -> NewsValidators:
+    """Return validators of current news version
+
+    They are calculated once for every news version and then every VALIDATORS_CHECK_INTERVAL seconds,
+    so usually it costs two cache requests.
+    modified_at is time of calculation, that found changes, it is never earlier than the last change of news.
+    Publish date can't be used for it, because old news can be saved after new ones.
+
+    Returns
+    -------
+    NewsValidators
+    """
+    version = get_news_version()
+    validators = cache.get(VALIDATORS_KEY)
+    if (validators is None or validators.version != version
+            or time.time() - validators.checked_at > VALIDATORS_CHECK_INTERVAL):
+        data = NewsModel.objects.aggregate(max_id=Max('id'), newest_published_at=Max('published_at'))
+        modified_at = timezone.now()
+        if (validators is not None and validators.version == version
+                and (validators.max_id, validators.newest_published_at) == (data['max_id'],
+                                                                            data['newest_published_at'])):
+            modified_at = validators.modified_at
+        validators = NewsValidators(version, data['max_id'], data['newest_published_at'], modified_at, time.time())
+        cache.set(VALIDATORS_KEY, validators, VALIDATORS_CACHE_TIMEOUT)
+    return validators
+
+
+def news_etag(request, *args, **kwargs) -> str:
+    """Return ETag of news page, it depends on news validators and full url of request"""
+    validators = get_news_validators()
+    key = f'{validators.version}:{validators.max_id}:{validators.newest_published_at}:{request.get_full_path()}'
+    return f'"{hashlib.md5(key.encode()).hexdigest()}"'
+
+
+def news_last_modified(request, *args, **kwargs) -> datetime:
+    """Return Last-Modified of news page"""
+    return get_news_validators().modified_at
+
+
+# answer If-None-Match/If-Modified-Since with 304 before view does any work
+news_condition = condition(etag_func=news_etag, last_modified_func=news_last_modified)
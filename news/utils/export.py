@@ -0,0 +1,90 @@
+from datetime import datetime, time
+from typing import Iterator, Optional, Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from news.models import NewsModel
+from news.pagination import CursorPaginator
+from news.serializers import BaseSerializer
+
+
+def parse_since(value: str) -> datetime:
+    """Parse date or datetime in ISO 8601 format, naive values are considered in current timezone
+
+    Raises
+    ------
+    ValueError
+        If value has wrong format
+    """
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f'Wrong since format: {value}, use ISO 8601 date or datetime')
+        since = datetime.combine(date, time())
+
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def get_export_queryset(since: Optional[datetime]=None, sources: Sequence[str]=()) -> QuerySet:
+    """Return news published since date from sources
+
+    Parameters
+    ----------
+    since
+        Minimal publish date
+    sources
+        Sources domains, all sources if empty
+    """
+    qs = NewsModel.objects.all()
+    if since:
+        qs = qs.filter(published_at__gte=since)
+    if sources:
+        qs = qs.filter(source_id__in=sources)
+    return qs
+
+
+def iter_ndjson(queryset: QuerySet, serializer: BaseSerializer, fields: Sequence[str],
+                chunk_size: int=2000) -> Iterator[str]:
+    """Yield serialized objects of queryset in NDJSON format from the newest to the oldest
+
+    Queryset is read by keyset chunks, so memory doesn't depend on number of objects,
+    and every chunk is a cheap index seek without long running db cursor
+
+    Parameters
+    ----------
+    queryset
+        News queryset
+    serializer
+    fields
+        Serialized fields
+    chunk_size
+        Number of objects in one db request
+
+    Returns
+    -------
+    Iterator[str]
+        Chunks of NDJSON lines
+    """
+    cursor_fields = ('published_at', 'id')
+    extra_fields = tuple(f for f in cursor_fields if f not in fields)
+    paginator = CursorPaginator(queryset, chunk_size, cursor_fields,
+                                lambda q: serializer.serialize_queryset(q, tuple(fields) + extra_fields))
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    cursor = ''
+    while cursor is not None:
+        page = paginator.page(cursor)
+        objects = page.object_list
+        if extra_fields:
+            objects = ({f: o[f] for f in fields} for o in objects)
+
+        lines = ''.join(f'{encoder.encode(o)}\n' for o in objects)
+        if lines:
+            yield lines
+        cursor = page.next_cursor
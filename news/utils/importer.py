@@ -0,0 +1,77 @@
+import json
+import os
+from itertools import islice
+from multiprocessing import Pool
+from typing import Iterable, Iterator, List, Tuple
+
+
+def iter_dump_units(paths: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """Yield independently parsed parts of site responses dumps
+
+    .ndjson and .jsonl files are split by lines, other files are parsed as whole json
+
+    Parameters
+    ----------
+    paths
+        Dumps files paths
+
+    Returns
+    -------
+    Iterator[Tuple[str, str]]
+        Position of part for error messages and part text
+    """
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            if os.path.splitext(path)[1] in ('.ndjson', '.jsonl'):
+                for line_number, line in enumerate(f, 1):
+                    if line.strip():
+                        yield f'{path}:{line_number}', line
+            else:
+                yield path, f.read()
+
+
+def parse_unit(unit: Tuple[str, str]) -> List[dict]:
+    """Parse part of dump with one site response or list of them and return list of articles
+
+    Raises
+    ------
+    ValueError
+        If part is not valid json or has wrong format
+    """
+    position, text = unit
+    try:
+        data = json.loads(text)
+        responses = data if isinstance(data, list) else [data]
+        return [article for response in responses for article in response['articles']]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f'Wrong site response in {position}: {e!r}')
+
+
+def iter_dump_articles(paths: Iterable[str], workers: int=1, window: int=256) -> Iterator[List[dict]]:
+    """Yield articles of dumps, parsing can be done by several processes
+
+    Parameters
+    ----------
+    paths
+        Dumps files paths
+    workers
+        Number of parsing processes, parsing is done in current process if it is 1
+    window
+        Max number of dumps parts sent to processes at once, limits memory usage
+
+    Returns
+    -------
+    Iterator[List[dict]]
+        Articles of every dump part in files order
+    """
+    units = iter_dump_units(paths)
+    if workers <= 1:
+        yield from map(parse_unit, units)
+        return
+
+    with Pool(workers) as pool:
+        while True:
+            chunk = list(islice(units, window))
+            if not chunk:
+                break
+            yield from pool.map(parse_unit, chunk, chunksize=max(1, len(chunk) // (workers * 4)))
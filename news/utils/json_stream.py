@@ -0,0 +1,193 @@
+import codecs
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+WHITESPACE = ' \t\n\r'
+# characters that can follow value inside object or array
+VALUE_END = WHITESPACE + ',:]}'
+
+
+class JsonStreamReader:
+    """
+    Decode json values from chunks of utf-8 bytes while they are received
+
+    Values are decoded by json.JSONDecoder.raw_decode from buffer, that keeps only not decoded rest
+    of received chunks, so memory is bounded by chunk size and size of one decoded value.
+    Value is accepted only if it is followed by separator or stream ended, so numbers and literals
+    split between chunks are never decoded partially.
+
+    Methods
+    -------
+    value()
+        Decode next value
+    next_char()
+        Return next not whitespace character, '' at the end of stream
+    peek()
+        Return next not whitespace character without consuming it
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+        self._ended = False
+
+    def value(self) -> Any:
+        """Decode next value
+
+        Raises
+        ------
+        ValueError
+            If stream has not valid json value
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+
+            if (end < len(self._buffer) and self._buffer[end] in VALUE_END) or not self._fill():
+                self._position = end
+                return value
+
+    def next_char(self) -> str:
+        char = self.peek()
+        self._position += len(char)
+        return char
+
+    def peek(self) -> str:
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        """Consume next character, that must be char
+
+        Raises
+        ------
+        ValueError
+            If stream has another character
+        """
+        found = self.next_char()
+        if found != char:
+            raise ValueError(f'Expecting {char!r}, found {found or "end of data"!r}')
+
+    def _fill(self) -> bool:
+        """Add next chunk to buffer, dropping already decoded part, return False at the end of stream"""
+        if self._ended:
+            return False
+
+        text = ''
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                break
+        else:
+            self._ended = True
+            text = self._utf8.decode(b'', final=True)
+
+        self._buffer = self._buffer[self._position:] + text
+        self._position = 0
+        return bool(text)
+
+
+def iter_object_array(chunks: Iterable[bytes], array_key: str, fields: Dict[str, Any]) -> Iterator[Any]:
+    """Yield items of array_key array of json object one by one, while object is received
+
+    Other keys of object are decoded whole and put to fields, all of them are there only
+    when generator is exhausted, because they can follow array.
+
+    Parameters
+    ----------
+    chunks
+        Utf-8 encoded json object in chunks of any size
+    array_key
+        Key of streamed array, its value is decoded whole if it isn't array
+    fields
+        Dict for other keys of object
+
+    Raises
+    ------
+    ValueError
+        If data is not valid json object
+    """
+    reader = JsonStreamReader(chunks)
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.expect('}')
+    else:
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise ValueError(f'Expecting object key, found {key!r}')
+            reader.expect(':')
+
+            if key == array_key and reader.peek() == '[':
+                yield from _iter_array(reader)
+            else:
+                fields[key] = reader.value()
+
+            separator = reader.next_char()
+            if separator == '}':
+                break
+            if separator != ',':
+                raise ValueError(f'Expecting \',\' or \'}}\', found {separator or "end of data"!r}')
+
+    if reader.peek():
+        raise ValueError('Extra data after json object')
+
+
+def _iter_array(reader: JsonStreamReader) -> Iterator[Any]:
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.expect(']')
+        return
+
+    while True:
+        yield reader.value()
+
+        separator = reader.next_char()
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ValueError(f'Expecting \',\' or \']\', found {separator or "end of data"!r}')
+
+
+class StreamedObject:
+    """
+    Json object, whose array is read from stream item by item
+
+    Attributes
+    ----------
+    fields : Dict[str, Any]
+        Keys of object except streamed array, complete only after items are read
+
+    Methods
+    -------
+    items()
+        Iterator over array items, can be used once
+    close()
+        Release stream
+    """
+
+    def __init__(self, chunks: Iterable[bytes], array_key: str, close: Optional[Callable[[], None]]=None):
+        self.fields = {}
+        self._items = iter_object_array(chunks, array_key, self.fields)
+        self._close = close
+
+    def items(self) -> Iterator[Any]:
+        return self._items
+
+    def close(self):
+        self._items.close()
+        if self._close:
+            self._close()
@@ -0,0 +1,12 @@
+import django
+from django.apps import apps
+
+
+def setup_django_process():
+    """Initializer of worker processes, that use models
+
+    Processes started by fork have configured django of parent, started by spawn have not.
+    This module doesn't import models, so it can be imported by spawned process before setup.
+    """
+    if not apps.ready:
+        django.setup()
@@ -0,0 +1,106 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+NEWS_VERSION_KEY = 'news:version'
+STATS_KEY_PREFIX = 'response_cache:'
+
+
+def get_news_version() -> int:
+    """Return current version of news data, it changes every time news are changed
+
+    Returns
+    -------
+    int
+    """
+    version = cache.get(NEWS_VERSION_KEY)
+    if version is None:
+        # start from current time, so lost version never repeats values of previous one
+        cache.add(NEWS_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(NEWS_VERSION_KEY)
+    return version
+
+
+def bump_news_version():
+    """Change news version, all responses cached for previous version won't be used anymore"""
+    try:
+        cache.incr(NEWS_VERSION_KEY)
+    except ValueError:
+        get_news_version()
+
+
+def get_response_cache_key(version: int, path: str) -> str:
+    """Return cache key of response for full path with query string"""
+    return f'response:{version}:{hashlib.md5(path.encode()).hexdigest()}'
+
+
+class ResponseCacheStats:
+    """
+    Hits and misses counters of response cache
+
+    Counters are collected in process and added to shared cache in batches of
+    RESPONSE_CACHE_STATS_BATCH events, so counting doesn't add cache requests to every response
+
+    Methods
+    -------
+    hit()
+    miss()
+    get()
+        Return counters of all processes
+    """
+
+    def __init__(self):
+        self._counter = Counter()
+        self._lock = threading.Lock()
+
+    def hit(self):
+        self._add('hits')
+
+    def miss(self):
+        self._add('misses')
+
+    def get(self) -> dict:
+        """Return hits, misses and hit ratio
+
+        Returns
+        -------
+        dict
+        """
+        self.flush()
+        stats = {name: cache.get(f'{STATS_KEY_PREFIX}{name}') or 0 for name in ('hits', 'misses')}
+        total = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / total if total else 0.0
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._counter.clear()
+        cache.delete_many([f'{STATS_KEY_PREFIX}{name}' for name in ('hits', 'misses')])
+
+    def flush(self):
+        """Add process counters to shared cache"""
+        with self._lock:
+            counter, self._counter = self._counter, Counter()
+
+        for name, value in counter.items():
+            key = f'{STATS_KEY_PREFIX}{name}'
+            cache.add(key, 0, None)
+            try:
+                cache.incr(key, value)
+            except ValueError:
+                cache.set(key, value, None)
+
+    def _add(self, name: str):
+        with self._lock:
+            self._counter[name] += 1
+            full = sum(self._counter.values()) >= settings.RESPONSE_CACHE_STATS_BATCH
+
+        if full:
+            self.flush()
+
+
+response_cache_stats = ResponseCacheStats()
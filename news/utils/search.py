@@ -0,0 +1,152 @@
+import logging
+
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger()
+
+NEWS_TABLE = 'news_newsmodel'
+FTS_TABLE = 'news_newsmodel_fts'
+PG_SEARCH_INDEX = 'news_newsmodel_search_idx'
+# postgresql uses expression index, so queries must have exactly the same expression
+PG_SEARCH_VECTOR = (f"to_tsvector('english', coalesce({NEWS_TABLE}.title, '') || ' ' || "
+                    f"coalesce({NEWS_TABLE}.description, '') || ' ' || coalesce({NEWS_TABLE}.content, ''))")
+
+SQLITE_CREATE_SQL = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    f"title, description, content, content='{NEWS_TABLE}', content_rowid='id')",
+    f"CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON {NEWS_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description, content) "
+    f"VALUES (new.id, new.title, new.description, new.content); END",
+    f"CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON {NEWS_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, content) "
+    f"VALUES ('delete', old.id, old.title, old.description, old.content); END",
+    f"CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF title, description, content ON {NEWS_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, content) "
+    f"VALUES ('delete', old.id, old.title, old.description, old.content); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description, content) "
+    f"VALUES (new.id, new.title, new.description, new.content); END",
+    # matches in title are more relevant than in description and much more than in content
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_DROP_SQL = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+PG_CREATE_SQL = [f'CREATE INDEX {PG_SEARCH_INDEX} ON {NEWS_TABLE} USING GIN (({PG_SEARCH_VECTOR}))']
+PG_DROP_SQL = [f'DROP INDEX IF EXISTS {PG_SEARCH_INDEX}']
+
+# connection alias: FTS table exists, resolved once per process by _has_fts_table
+_fts_tables = {}
+
+
+def create_search_index(connection):
+    """Create full text index of news title, description and content
+
+    For sqlite it is FTS5 table with external content, that is kept in sync with news table by triggers,
+    so any insert, upsert or update of news is indexed. For postgresql it is GIN index of tsvector.
+    Other databases and sqlite without FTS5 are left as is, search works by full scan there.
+    """
+    if connection.vendor == 'sqlite':
+        if not _has_fts5(connection):
+            logger.warning('Sqlite is built without FTS5, news search will use full scan')
+            return
+        statements = SQLITE_CREATE_SQL
+    elif connection.vendor == 'postgresql':
+        statements = PG_CREATE_SQL
+    else:
+        return
+
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+    _fts_tables.pop(connection.alias, None)
+
+
+def drop_search_index(connection):
+    """Remove everything created by create_search_index"""
+    statements = {'sqlite': SQLITE_DROP_SQL, 'postgresql': PG_DROP_SQL}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+    _fts_tables.pop(connection.alias, None)
+
+
+def to_fts5_query(query: str) -> str:
+    """Convert user query to FTS5 query, where every word is a quoted string
+
+    So FTS5 syntax characters in user query are searched as is and never make query invalid.
+    All words must be found in news.
+
+    Raises
+    ------
+    ValueError
+        If query has no words
+    """
+    words = query.split()
+    if not words:
+        raise ValueError('Search query is empty')
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def search_news(queryset: QuerySet, query: str) -> QuerySet:
+    """Filter news by full text query and order them from the most relevant
+
+    Parameters
+    ----------
+    queryset
+        News queryset
+    query
+        Words that must be found in title, description or content
+
+    Returns
+    -------
+    QuerySet
+
+    Raises
+    ------
+    ValueError
+        If query has no words
+    """
+    if not query.split():
+        raise ValueError('Search query is empty')
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite' and _has_fts_table(connection):
+        # bm25 rank of FTS5 is negative, the best match has the least rank.
+        # Ordering only by rank is done by FTS5 itself, any additional ordering adds sort of all matches
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {NEWS_TABLE}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[to_fts5_query(query)]
+        ).order_by(RawSQL(f'{FTS_TABLE}.rank', []).asc())
+
+    if connection.vendor == 'postgresql':
+        ts_query = "plainto_tsquery('english', %s)"
+        return queryset.extra(
+            where=[f'{PG_SEARCH_VECTOR} @@ {ts_query}'], params=[query]
+        ).order_by(RawSQL(f'ts_rank({PG_SEARCH_VECTOR}, {ts_query})', [query]).desc(), '-published_at', '-id')
+
+    condition = Q()
+    for word in query.split():
+        condition &= Q(title__icontains=word) | Q(description__icontains=word) | Q(content__icontains=word)
+    return queryset.filter(condition).order_by('-published_at', '-id')
+
+
+def _has_fts5(connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        options = {row[0] for row in cursor.fetchall()}
+    return 'ENABLE_FTS5' in options
+
+
+def _has_fts_table(connection) -> bool:
+    """Check FTS table of connection once, so search requests don't query db catalog"""
+    exists = _fts_tables.get(connection.alias)
+    if exists is None:
+        exists = _fts_tables[connection.alias] = FTS_TABLE in connection.introspection.table_names()
+    return exists
@@ -0,0 +1,72 @@
+from typing import Callable, Optional
+
+from django.db import transaction
+
+
+class TransactionBatch:
+    """
+    Group several writes in one transaction
+
+    Use as context manager and call step() after every write, transaction is committed
+    after every `size` steps and on exit. Exception rolls back only the current transaction,
+    already committed batches stay saved.
+
+    Attributes
+    ----------
+    size : int
+        Number of steps in one transaction
+    using : Optional[str]
+        Database alias
+    on_commit : Optional[Callable[[], None]]
+        Called after every commit of not empty transaction
+    on_rollback : Optional[Callable[[], None]]
+        Called after transaction is rolled back by exception, to drop state changed outside of db
+
+    Methods
+    -------
+    step()
+        Count one write and commit transaction if batch is full
+    commit()
+        Commit current transaction and start new one
+    """
+
+    def __init__(self, size: int=1, using: Optional[str]=None, on_commit: Optional[Callable[[], None]]=None,
+                 on_rollback: Optional[Callable[[], None]]=None):
+        self.size = max(size, 1)
+        self.using = using
+        self.on_commit = on_commit
+        self.on_rollback = on_rollback
+
+        self._atomic = None
+        self._steps = 0
+
+    def __enter__(self):
+        self._begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        atomic, self._atomic = self._atomic, None
+        atomic.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self._committed()
+        elif self.on_rollback:
+            self.on_rollback()
+
+    def step(self):
+        self._steps += 1
+        if self._steps >= self.size:
+            self.commit()
+
+    def commit(self):
+        self._atomic.__exit__(None, None, None)
+        self._committed()
+        self._begin()
+
+    def _begin(self):
+        self._atomic = transaction.atomic(using=self.using)
+        self._atomic.__enter__()
+
+    def _committed(self):
+        if self._steps and self.on_commit:
+            self.on_commit()
+        self._steps = 0
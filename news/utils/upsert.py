@@ -0,0 +1,108 @@
+from typing import Iterable, NamedTuple, Sequence, Type
+
+from django.db import connections, models, transaction
+
+
+class UpsertResult(NamedTuple):
+    """Number of inserted and updated rows"""
+
+    inserted: int
+    updated: int
+
+
+def supports_upsert(using: str='default') -> bool:
+    """Check that database supports INSERT ... ON CONFLICT
+
+    Parameters
+    ----------
+    using : str
+        Database alias
+
+    Returns
+    -------
+    bool
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 24, 0)
+    return False
+
+
+def bulk_upsert(model: Type[models.Model], objs: Iterable[models.Model], conflict_fields: Sequence[str],
+                update_fields: Sequence[str]=(), batch_size: int=500, using: str='default') -> UpsertResult:
+    """Insert objects skipping or updating the ones that conflict with existing rows
+
+    Every batch is inserted by one INSERT ... ON CONFLICT statement, that is safe for concurrent inserts.
+    Without update_fields conflicting rows are left as is. With update_fields they are updated
+    by second statement, but only if some of update_fields really changed, so updated count
+    shows only changed rows.
+    Objects with the same conflict fields values are inserted once, last one wins.
+
+    Parameters
+    ----------
+    model
+        Model class of objects
+    objs
+        Not saved model instances
+    conflict_fields
+        Fields names of unique constraint or index used for conflict detection
+    update_fields
+        Fields names that will be overwritten in existing rows
+    batch_size : int
+        Max number of objects in one statement
+    using : str
+        Database alias
+
+    Returns
+    -------
+    UpsertResult
+        Number of inserted and updated rows
+    """
+    connection = connections[using]
+    meta = model._meta
+    fields = [f for f in meta.concrete_fields if not isinstance(f, models.AutoField)]
+
+    unique_objs = {}
+    for obj in objs:
+        unique_objs[tuple(getattr(obj, meta.get_field(f).attname) for f in conflict_fields)] = obj
+    objs = list(unique_objs.values())
+
+    if not objs:
+        return UpsertResult(0, 0)
+
+    qn = connection.ops.quote_name
+    table = qn(meta.db_table)
+    columns = ', '.join(qn(f.column) for f in fields)
+    conflict = ', '.join(qn(meta.get_field(f).column) for f in conflict_fields)
+    insert_sql = f'INSERT INTO {table} ({columns}) VALUES {{values}} ON CONFLICT ({conflict}) DO NOTHING'
+
+    update_sql = None
+    if update_fields:
+        update_columns = [qn(meta.get_field(f).column) for f in update_fields]
+        distinct = 'IS DISTINCT FROM' if connection.vendor == 'postgresql' else 'IS NOT'
+        update_sql = (
+            f'INSERT INTO {table} ({columns}) VALUES {{values}} ON CONFLICT ({conflict}) DO UPDATE SET '
+            + ', '.join(f'{c} = excluded.{c}' for c in update_columns)
+            + ' WHERE ' + ' OR '.join(f'{table}.{c} {distinct} excluded.{c}' for c in update_columns)
+        )
+
+    batch_size = min(batch_size, connection.ops.bulk_batch_size(fields, objs) or batch_size)
+    placeholders = f'({", ".join(["%s"] * len(fields))})'
+
+    inserted = updated = 0
+    with transaction.atomic(using=using, savepoint=False), connection.cursor() as cursor:
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start:start + batch_size]
+            values = ', '.join([placeholders] * len(batch))
+            params = [f.get_db_prep_save(f.pre_save(obj, True), connection) for obj in batch for f in fields]
+
+            cursor.execute(insert_sql.format(values=values), params)
+            inserted += cursor.rowcount
+
+            if update_sql:
+                cursor.execute(update_sql.format(values=values), params)
+                updated += cursor.rowcount
+
+    return UpsertResult(inserted, updated)
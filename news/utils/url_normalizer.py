@@ -1,11 +1,133 @@
-from urllib.parse import urlparse
+import re
+from functools import lru_cache
+from typing import NamedTuple
+from urllib.parse import urlsplit, urlunsplit
 
+URL_CACHE_SIZE = 4096
 
-def get_normalize_url(url: str) -> str:
-    """Url normalizer
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+# query parameters which only track source of visit and don't change page
+TRACKING_PARAMS = frozenset(['fbclid', 'gclid', 'dclid', 'yclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid',
+                             '_hsenc', '_hsmi', '_ga'])
+TRACKING_PARAM_PREFIXES = ('utm_',)
+
+UNRESERVED_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+PERCENT_ENCODED_RE = re.compile('%([0-9A-Fa-f]{2})')
+
+
+class NormalizedUrl(NamedTuple):
+    """Result of url normalization"""
+
+    # host without 'www.' and default port
+    domain: str
+    # path without parameters
+    path: str
+    # full normalized url
+    url: str
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def normalize_url(url: str) -> NormalizedUrl:
+    """Normalize url by RFC 3986 and return its domain, path and full url from one parse
+
+    Scheme and host are lowercased, default port is removed, percent-encoded unreserved characters
+    are decoded and other percent-encodings are uppercased, dot segments are removed, empty path becomes '/'.
+    Tracking query parameters like utm_source and fragment are removed too,
+    they don't change page, but break deduplication of news.
+
+    Results of the last URL_CACHE_SIZE urls are cached, get_url_cache_stats returns cache stats.
+
+    Parameters
+    ----------
+    url: str
 
-    For more careful normalization check
-    https://en.wikipedia.org/wiki/URL_normalization
+    Returns
+    -------
+    NormalizedUrl
+    """
+    parsed_url = urlsplit(url.strip())
+    scheme = parsed_url.scheme.lower()
+
+    host = (parsed_url.hostname or '').rstrip('.')
+    if ':' in host:
+        # ipv6 address
+        host = f'[{host}]'
+    try:
+        port = parsed_url.port
+    except ValueError:
+        port = None
+    netloc = host if port is None or port == DEFAULT_PORTS.get(scheme) else f'{host}:{port}'
+    if parsed_url.username is not None:
+        userinfo = parsed_url.username if parsed_url.password is None else \
+            f'{parsed_url.username}:{parsed_url.password}'
+        netloc = f'{userinfo}@{netloc}'
+
+    path = remove_dot_segments(normalize_percent_encoding(parsed_url.path))
+    if not path and netloc:
+        path = '/'
+
+    query = '&'.join(param for param in normalize_percent_encoding(parsed_url.query).split('&')
+                     if param and not _is_tracking_param(param))
+
+    domain = host[4:] if host.startswith('www.') else host
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        domain = f'{domain}:{port}'
+
+    return NormalizedUrl(domain, path, urlunsplit((scheme, netloc, path, query, '')))
+
+
+def get_url_cache_stats() -> dict:
+    """Return hits, misses, maxsize and currsize of normalize_url cache"""
+    return normalize_url.cache_info()._asdict()
+
+
+def normalize_percent_encoding(value: str) -> str:
+    """Decode percent-encoded unreserved characters and uppercase hex digits of other ones"""
+    if '%' not in value:
+        return value
+
+    def replace(match):
+        char = chr(int(match.group(1), 16))
+        return char if char in UNRESERVED_CHARS else match.group(0).upper()
+
+    return PERCENT_ENCODED_RE.sub(replace, value)
+
+
+def remove_dot_segments(path: str) -> str:
+    """Remove '.' and '..' segments of path by RFC 3986 section 5.2.4"""
+    if '.' not in path:
+        return path
+
+    output = []
+    while path:
+        if path.startswith('../'):
+            path = path[3:]
+        elif path.startswith('./') or path.startswith('/./'):
+            path = path[2:]
+        elif path == '/.':
+            path = '/'
+        elif path.startswith('/../') or path == '/..':
+            path = '/' + path[4:]
+            if output:
+                output.pop()
+        elif path in ('.', '..'):
+            path = ''
+        else:
+            end = path.find('/', 1)
+            if end == -1:
+                end = len(path)
+            output.append(path[:end])
+            path = path[end:]
+    return ''.join(output)
+
+
+def _is_tracking_param(param: str) -> bool:
+    name = param.split('=', 1)[0].lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def get_normalize_url(url: str) -> str:
+    """Url normalizer, see normalize_url
 
     Parameters
     ----------
@@ -16,9 +138,7 @@ def get_normalize_url(url: str) -> str:
     str
         Normalized url
     """
-
-    parsed_url = urlparse(url)
-    return parsed_url.geturl()
+    return normalize_url(url).url
 
 
 def get_normalized_url_path(url: str) -> str:
@@ -34,8 +154,7 @@ def get_normalized_url_path(url: str) -> str:
         Normalized path
 
     """
-    parsed_url = urlparse(url)
-    return parsed_url.path
+    return normalize_url(url).path
 
 
 def get_normalized_domain_name(url: str) -> str:
@@ -53,9 +172,4 @@ def get_normalized_domain_name(url: str) -> str:
     str
         Normalized domain name
     """
-    parsed_url = urlparse(url)
-    normalized_domain_name = parsed_url.netloc
-    if normalized_domain_name.startswith('www.'):
-        normalized_domain_name = normalized_domain_name[4:]
-
-    return normalized_domain_name
+    return normalize_url(url).domain
@@ -1,12 +1,33 @@
+from django.http import Http404
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView
 
 from news.models import NewsModel
+from news.pagination import CursorPaginator, InvalidCursor
+from news.utils.cached_count import CachedCountPaginator
+from news.utils.conditional import news_condition
 
 
+@method_decorator(news_condition, name='get')
 class NewsListView(ListView):
-    """News list html representation"""
+    """News list html representation
+
+    Pages are selected by page number or by 'cursor' get parameter for keyset pagination
+    """
 
     model = NewsModel
     paginate_by = 20
+    paginator_class = CachedCountPaginator
     template_name = 'news_list.html'
     ordering = '-published_at'
+    cursor_fields = ('published_at', 'id')
+
+    def paginate_queryset(self, queryset, page_size):
+        if 'cursor' not in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+
+        try:
+            page = CursorPaginator(queryset, page_size, self.cursor_fields).page(self.request.GET['cursor'])
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+        return None, page, page.object_list, True
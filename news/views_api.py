@@ -1,12 +1,21 @@
 from http import HTTPStatus
 
-from django.http import JsonResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
 
 from django.views import View
 from django.views.generic.list import MultipleObjectMixin
 
 from news.models import NewsModel
+from news.pagination import CursorPaginator
 from news.serializers import NewsSerializer
+from news.utils.cached_count import CachedCountPaginator
+from news.utils.conditional import news_condition
+from news.utils.export import get_export_queryset, iter_ndjson, parse_since
+from news.utils.response_cache import get_news_version, get_response_cache_key, response_cache_stats
+from news.utils.search import search_news
 
 
 class ApiErrorResponse(JsonResponse):
@@ -30,16 +39,71 @@ class ApiResponse(JsonResponse):
         super().__init__(data, **kwargs)
 
 
+class ApiCursorResponse(JsonResponse):
+    """Api response for cursor pagination"""
+
+    def __init__(self, objects, next_cursor, previous_cursor, **kwargs):
+        data = {
+            'next': next_cursor,
+            'prev': previous_cursor,
+            'objects': objects
+        }
+        super().__init__(data, **kwargs)
+
+
 class BaseAPIView(View, MultipleObjectMixin):
     """Base class for api views
 
-    It uses MultipleObjectMixin api for work
+    It uses MultipleObjectMixin api for work.
+    Pages are selected by 'page' parameter or, if view has cursor_fields, by opaque 'cursor' parameter.
+    Cursor pagination doesn't count objects and its deep pages are as fast as the first one,
+    empty cursor means the first page.
+    Comma separated 'fields' parameter selects serialized fields, only they are fetched from db.
+
+    If get_cache_version returns version, successful responses are cached for full url and version,
+    data changes must change the version.
     """
 
     serializer = None
     paginate_by = 100
+    paginator_class = CachedCountPaginator
+    cursor_fields = None
 
     def get(self, request):
+        """Make Json response for api requests or return it from cache
+
+        Parameters
+        ----------
+        request
+
+        Returns
+        -------
+        HttpResponse
+        """
+        version = self.get_cache_version()
+        if version is None:
+            return self.make_response(request)
+
+        key = get_response_cache_key(version, request.get_full_path())
+        content = cache.get(key)
+        if content is not None:
+            response_cache_stats.hit()
+            resp = HttpResponse(content, content_type='application/json')
+            resp['X-Cache'] = 'HIT'
+            return resp
+
+        response_cache_stats.miss()
+        resp = self.make_response(request)
+        if resp.status_code == HTTPStatus.OK:
+            cache.set(key, resp.content, settings.RESPONSE_CACHE_TIMEOUT)
+        resp['X-Cache'] = 'MISS'
+        return resp
+
+    def get_cache_version(self):
+        """Return version of data for response cache, None disables cache"""
+        return None
+
+    def make_response(self, request):
         """Make Json response for api requests
 
         Parameters
@@ -52,18 +116,74 @@ class BaseAPIView(View, MultipleObjectMixin):
         """
         try:
             qs = self.get_queryset()
-            paginator, page, queryset, is_paginated = self.paginate_queryset(qs, self.paginate_by)
             serializer = self.serializer()
-            resp = ApiResponse([serializer.serialize(o) for o in page.object_list], paginator.count)
+            fields = serializer.get_fields(request.GET.get('fields'))
+            if self.cursor_fields and 'cursor' in request.GET:
+                # cursor is made from serialized objects, so cursor fields are always fetched
+                extra_fields = tuple(f for f in self.cursor_fields if f not in fields)
+                paginator = CursorPaginator(qs, self.paginate_by, self.cursor_fields,
+                                            lambda q: serializer.serialize_queryset(q, fields + extra_fields))
+                page = paginator.page(request.GET['cursor'])
+
+                objects = page.object_list
+                if extra_fields:
+                    objects = [{f: o[f] for f in fields} for o in objects]
+                resp = ApiCursorResponse(objects, page.next_cursor, page.previous_cursor)
+            else:
+                paginator, page, queryset, is_paginated = self.paginate_queryset(qs, self.paginate_by)
+                resp = ApiResponse(serializer.serialize_queryset(page.object_list, fields), paginator.count)
         except Exception as e:
             resp = ApiErrorResponse(str(e))
 
         return resp
 
 
+@method_decorator(news_condition, name='get')
 class NewsAPIView(BaseAPIView):
     """News api view"""
 
     serializer = NewsSerializer
     model = NewsModel
     ordering = '-published_at'
+    cursor_fields = ('published_at', 'id')
+
+    def get_cache_version(self):
+        if settings.RESPONSE_CACHE_TIMEOUT:
+            return get_news_version()
+        return None
+
+
+class NewsSearchAPIView(NewsAPIView):
+    """Full text search of news by 'q' parameter, the most relevant news first
+
+    Relevance order can't be used for keyset pagination, so pages are selected only by 'page' parameter
+    """
+
+    cursor_fields = None
+
+    def get_queryset(self):
+        return search_news(super().get_queryset(), self.request.GET.get('q', ''))
+
+
+class NewsExportView(View):
+    """Stream all news in NDJSON format from the newest to the oldest
+
+    Optional parameters: 'since' - minimal publish date in ISO 8601, 'source' - comma separated sources domains,
+    'fields' - comma separated fields, all fields by default
+    """
+
+    serializer = NewsSerializer
+    chunk_size = 2000
+
+    def get(self, request):
+        try:
+            serializer = self.serializer()
+            fields = serializer.get_fields(request.GET.get('fields') or ','.join(serializer.fields))
+            since = parse_since(request.GET['since']) if request.GET.get('since') else None
+            sources = [s for s in request.GET.get('source', '').split(',') if s]
+        except ValueError as e:
+            return ApiErrorResponse(str(e))
+
+        qs = get_export_queryset(since, sources)
+        return StreamingHttpResponse(iter_ndjson(qs, serializer, fields, self.chunk_size),
+                                     content_type='application/x-ndjson')
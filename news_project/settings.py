@@ -41,6 +41,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Prevent throttling, it is the first, so rejected requests don't pass other middlewares
+    'news_project.throttling_middleware.ThrottlingMiddleware',
+
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -48,9 +51,6 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-
-    # Prevent throttling
-    'news_project.throttling_middleware.ThrottlingMiddleware'
 ]
 
 ROOT_URLCONF = 'news_project.urls'
@@ -129,3 +129,66 @@ STATICFILES_DIRS = [
 
 # Throttling settings
 IP_REQUESTS_IN_HOUR_LIMIT = 1000
+
+# Max number of requests to provider in UTC day by scraper name, for example {'newsapi_org': 100}
+# for newsapi.org developer plan, scrapers without quota are not limited
+SCRAPER_DAILY_QUOTAS = {}
+# Modules with scrapers, every BaseScraper subclass with name is available by its name
+SCRAPER_MODULES = ['news.scrapers.newsapi_org']
+# Scrapers of run_scrapers: options of scraper and max number of its requests at the same time
+SCRAPERS = {
+    'newsapi_org': {'options': {'api_key': os.environ.get('NEWSAPI_ORG_API_KEY', '')}, 'concurrency': 2},
+}
+# Queries of run_scrapers, every query is downloaded again after interval seconds from the start of its last run
+SCRAPER_SCHEDULE = [
+    {'provider': 'newsapi_org', 'path': 'everything', 'q': 'python', 'interval': 900, 'count': 100},
+]
+
+# Cache must be shared by all processes: web workers see news version bumped by fetch_news, import_news
+# and run_scrapers, throttling counters and response cache stats are global. File cache is enough for one host,
+# use memcached or redis in production, their increments are atomic and don't touch disk
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+# Tests run with empty temporary cache
+TEST_RUNNER = 'news_project.test_runner.NewsTestRunner'
+
+# Paginated lists take number of rows from cache, it is updated on inserts and recounted after timeout
+COUNT_CACHE_TIMEOUT = 300
+# Return estimated number of rows instead of counting, when estimation is greater than threshold, None to disable
+APPROXIMATE_COUNT_THRESHOLD = None
+
+# News api responses are cached for this number of seconds or until news change, 0 to disable
+RESPONSE_CACHE_TIMEOUT = 600
+# Response cache hits and misses are added to shared counters in batches of this size
+RESPONSE_CACHE_STATS_BATCH = 100
+
+# Pragmas executed on every new sqlite connection: WAL lets readers work while news are saved,
+# NORMAL synchronous is safe in WAL mode and doesn't fsync on every commit, negative cache_size is in KiB
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,
+}
+
+# Requests are limited in sliding window of this number of seconds
+THROTTLING_WINDOW = 3600
+# Requests are counted in process and added to shared counter in batches of this size,
+# every process can exceed the limit by up to batch size, 1 to count every request in shared counter
+THROTTLING_LOCAL_BATCH = 1
+# Max number of clients with request counters kept in every process for every budget,
+# counters of the least recently seen clients are moved to shared cache
+THROTTLING_MAX_CLIENTS = 10000
+# Requests with these path prefixes are never throttled
+THROTTLING_EXEMPT_PREFIXES = [STATIC_URL, '/health']
+# Policies for request path prefixes, the longest matching prefix is used, requests without policy aren't throttled.
+# Policies with the same budget share one limit, limit is IP_REQUESTS_IN_HOUR_LIMIT if it isn't set, 0 blocks prefix,
+# json sets format of rejected response
+THROTTLING_POLICIES = [
+    {'prefix': '/api/', 'budget': 'default', 'json': True},
+    {'prefix': '/', 'budget': 'default'},
+]
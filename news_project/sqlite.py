@@ -0,0 +1,14 @@
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created handler, that sets SQLITE_PRAGMAS for every new sqlite connection
+
+    In WAL journal mode readers don't wait for writer, so site keeps working while news are downloaded
+    """
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
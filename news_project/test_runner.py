@@ -0,0 +1,33 @@
+import tempfile
+from contextlib import contextmanager
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+@contextmanager
+def temporary_cache():
+    """Replace configured caches by empty file cache in temporary directory
+
+    File cache is shared by processes forked inside context, but never sees entries of working cache,
+    that outlive test and benchmark databases
+    """
+    with tempfile.TemporaryDirectory(prefix='news_cache_') as location:
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        }}):
+            yield
+
+
+class NewsTestRunner(DiscoverRunner):
+    """Test runner, whose tests use temporary_cache"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_context = temporary_cache()
+        self._cache_context.__enter__()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_context.__exit__(None, None, None)
+        super().teardown_test_environment(**kwargs)
@@ -1,28 +1,252 @@
+import math
+import threading
+import time
+from collections import OrderedDict
 from http import HTTPStatus
+from typing import List, NamedTuple
 
 from django.conf import settings
 from django.core.cache import cache
-from django.http import JsonResponse, HttpResponse
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
 
 from news.views_api import ApiErrorResponse
 
 
+class RateLimit(NamedTuple):
+    """Result of counting request by SlidingWindowLimiter"""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    # seconds until the current window ends
+    reset: int
+    # seconds until a request will be allowed again, 0 if it is allowed now
+    retry_after: int
+
+
+class SlidingWindowLimiter:
+    """
+    Limit number of requests of every client in sliding window
+
+    Requests are counted in fixed windows by atomic cache.incr, number of requests in sliding window
+    is estimated as count of current window plus count of previous window weighted by the part
+    of previous window that is still inside sliding window. Only allowed requests are counted,
+    rejected request is taken back from counter, so client retrying after Retry-After is allowed.
+
+    Count of previous window never changes, so it is requested from cache once per window and kept in process.
+    With local_batch > 1 increments are collected in process and added to cache by one incr for
+    every local_batch requests, so every process can exceed the limit by up to local_batch requests.
+    Increments left in process at the end of window are added to its counter by the first request
+    of the next window, processes that already read that counter as previous don't see them.
+
+    Process keeps counters of at most max_clients clients of every window, when a new client comes,
+    the least recently seen one is evicted, its not yet shared count is added to cache at once,
+    so many clients in one window never grow process memory without bound.
+
+    Attributes
+    ----------
+    limit : int
+        Max number of requests in window
+    window : int
+        Window size in seconds
+    local_batch : int
+        Number of requests counted in process before they are added to shared counter
+    max_clients : int
+        Max number of clients with counters kept in process
+
+    Methods
+    -------
+    hit(client: str)
+        Count client request and return RateLimit
+    """
+
+    def __init__(self, limit: int, window: int=3600, local_batch: int=1, prefix: str='throttling',
+                 max_clients: int=10000):
+        self.limit = limit
+        self.window = window
+        self.local_batch = max(local_batch, 1)
+        self.prefix = prefix
+        self.max_clients = max(max_clients, 1)
+
+        self._lock = threading.Lock()
+        self._window_index = None
+        # client: [last known shared count, not yet shared count] of current window, from least recently seen
+        self._current = OrderedDict()
+        # client: count of previous window, from least recently seen
+        self._previous = OrderedDict()
+
+    def hit(self, client: str, now: float=None) -> RateLimit:
+        """Count client request in current window
+
+        Parameters
+        ----------
+        client
+            Client identifier, for example ip address
+        now
+            Current timestamp, current time by default
+
+        Returns
+        -------
+        RateLimit
+        """
+        now = time.time() if now is None else now
+        index, elapsed = divmod(now, self.window)
+        index = int(index)
+
+        key = self._get_key(client, index)
+        unshared = []
+        with self._lock:
+            if index != self._window_index:
+                unshared = [(self._get_key(c, self._window_index), counter[1])
+                            for c, counter in self._current.items() if counter[1]]
+                self._window_index = index
+                self._current.clear()
+                self._previous.clear()
+
+            counter = self._current.get(client)
+            if counter is None:
+                if len(self._current) >= self.max_clients:
+                    evicted, evicted_counter = self._current.popitem(last=False)
+                    if evicted_counter[1]:
+                        unshared.append((self._get_key(evicted, index), evicted_counter[1]))
+                counter = self._current[client] = [0, 0]
+            else:
+                self._current.move_to_end(client)
+            counter[1] += 1
+            pending = 0
+            if counter[1] >= self.local_batch:
+                pending, counter[1] = counter[1], 0
+            current = counter[0] + counter[1] + pending
+            previous = self._previous.get(client)
+            if previous is not None:
+                self._previous.move_to_end(client)
+
+        # cache is requested without lock, so slow cache doesn't serialize threads
+        for unshared_key, delta in unshared:
+            self._incr(unshared_key, delta)
+        if pending:
+            current = self._incr(key, pending)
+            with self._lock:
+                counter[0] = max(counter[0], current)
+        if previous is None:
+            previous = cache.get(self._get_key(client, index - 1)) or 0
+            with self._lock:
+                if index == self._window_index:
+                    if client not in self._previous and len(self._previous) >= self.max_clients:
+                        self._previous.popitem(last=False)
+                    self._previous[client] = previous
+
+        previous_weight = 1 - elapsed / self.window
+        estimation = previous * previous_weight + current
+        reset = math.ceil(self.window - elapsed)
+
+        if estimation <= self.limit:
+            return RateLimit(True, self.limit, int(self.limit - estimation), reset, 0)
+
+        # rejected request is not counted
+        if pending:
+            cache.decr(key)
+            with self._lock:
+                counter[0] = max(counter[0] - 1, 0)
+        else:
+            with self._lock:
+                counter[1] = max(counter[1] - 1, 0)
+        counted = current - 1
+
+        if counted >= self.limit:
+            # only the next window can have place for request
+            retry_after = reset + math.ceil(self.window * (1 - (self.limit - 1) / max(counted, 1)))
+        else:
+            # wait until previous window requests leave sliding window, so there is place for this request
+            retry_after = math.ceil((estimation - self.limit) / previous * self.window)
+        return RateLimit(False, self.limit, 0, reset, max(retry_after, 1))
+
+    def _get_key(self, client: str, index: int) -> str:
+        return f'{self.prefix}:{client}:{index}'
+
+    def _incr(self, key: str, delta: int) -> int:
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            # the first request of window, keep counter until the end of the next window
+            if cache.add(key, delta, self.window * 2):
+                return delta
+            return cache.incr(key, delta)
+
+
+class ThrottlingPolicy(NamedTuple):
+    """Throttling of requests with path prefix, policies with the same budget share one limiter"""
+
+    prefix: str
+    budget: str
+    limiter: SlidingWindowLimiter
+    json_response: bool
+
+
+def get_throttling_policies() -> List[ThrottlingPolicy]:
+    """Make policies from THROTTLING_POLICIES setting sorted from the longest prefix
+
+    Raises
+    ------
+    ImproperlyConfigured
+        If policies of one budget have different limits
+    """
+    limiters = {}
+    policies = []
+    for policy in settings.THROTTLING_POLICIES:
+        budget = policy.get('budget', policy['prefix'])
+        limit = policy.get('limit', settings.IP_REQUESTS_IN_HOUR_LIMIT)
+        limiter = limiters.get(budget)
+        if limiter is None:
+            limiter = limiters[budget] = SlidingWindowLimiter(limit, settings.THROTTLING_WINDOW,
+                                                              settings.THROTTLING_LOCAL_BATCH,
+                                                              prefix=f'throttling:{budget}',
+                                                              max_clients=settings.THROTTLING_MAX_CLIENTS)
+        elif limiter.limit != limit:
+            raise ImproperlyConfigured(f'Throttling budget {budget} has different limits')
+
+        policies.append(ThrottlingPolicy(policy['prefix'], budget, limiter, policy.get('json', False)))
+
+    return sorted(policies, key=lambda p: len(p.prefix), reverse=True)
+
+
 class ThrottlingMiddleware:
+    """Reject requests of clients which exceeded limit of request path policy in sliding THROTTLING_WINDOW
+
+    Policies and exempt prefixes are resolved once from THROTTLING_POLICIES and THROTTLING_EXEMPT_PREFIXES,
+    every request is checked by a few prefix comparisons. Middleware is the first in MIDDLEWARE,
+    so rejected requests don't pass other middlewares.
+
+    Every counted response has X-RateLimit-Limit, X-RateLimit-Remaining and X-RateLimit-Reset headers,
+    rejected responses also have Retry-After
+    """
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.exempt_prefixes = tuple(settings.THROTTLING_EXEMPT_PREFIXES)
+        self.policies = get_throttling_policies()
 
     def __call__(self, request):
-        addr = request.META['REMOTE_ADDR']
+        path = request.path_info
+        policy = None
+        if not path.startswith(self.exempt_prefixes):
+            policy = next((p for p in self.policies if path.startswith(p.prefix)), None)
+        if policy is None:
+            return self.get_response(request)
 
-        request_in_last_our = cache.get(addr) or 0
+        rate_limit = policy.limiter.hit(request.META['REMOTE_ADDR'])
 
-        if request_in_last_our >= settings.IP_REQUESTS_IN_HOUR_LIMIT:
-            if 'api/' in request.path:
+        if rate_limit.allowed:
+            response = self.get_response(request)
+        else:
+            if policy.json_response:
                 response = ApiErrorResponse('Too many request', status=HTTPStatus.TOO_MANY_REQUESTS)
             else:
                 response = HttpResponse(b'Too many requests', status=HTTPStatus.TOO_MANY_REQUESTS)
-        else:
-            cache.set(addr, request_in_last_our + 1, 3600)
-            response = self.get_response(request)
+            response['Retry-After'] = str(rate_limit.retry_after)
 
+        response['X-RateLimit-Limit'] = str(rate_limit.limit)
+        response['X-RateLimit-Remaining'] = str(rate_limit.remaining)
+        response['X-RateLimit-Reset'] = str(rate_limit.reset)
         return response